@@ -4,6 +4,8 @@ import os
 
 # Add the project root to the path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from utils.theme import apply_theme
+from utils.courses import course_selector, course_context
 
 st.set_page_config(
     page_title="AI-Enhanced Teaching Assistant Dashboard",
@@ -12,58 +14,14 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 3rem;
-        font-weight: bold;
-        color: #1f77b4;
-        text-align: center;
-        margin-bottom: 2rem;
-        background: linear-gradient(90deg, #1f77b4, #2ecc71);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-    }
-    .subtitle {
-        font-size: 1.3rem;
-        text-align: center;
-        color: #666;
-        margin-bottom: 3rem;
-    }
-    .feature-card {
-        background-color: #ffffff;
-        padding: 2rem;
-        border-radius: 15px;
-        box-shadow: 0 4px 12px rgba(0,0,0,0.1);
-        margin: 1rem 0;
-        border-left: 5px solid #1f77b4;
-        transition: transform 0.3s ease;
-    }
-    .feature-card:hover {
-        transform: translateY(-5px);
-        box-shadow: 0 8px 20px rgba(0,0,0,0.15);
-    }
-    .page-link {
-        text-decoration: none;
-        color: inherit;
-    }
-    .page-link:hover {
-        text-decoration: none;
-        color: inherit;
-    }
-    .navigation-grid {
-        display: grid;
-        grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-        gap: 2rem;
-        margin: 2rem 0;
-    }
-</style>
-""", unsafe_allow_html=True)
+# Shared stylesheet (static/theme.css)
+apply_theme()
+
+# Course section this session works on; every table below is loaded from it
+course_selector()
 
 def main():
-    st.markdown('<h1 class="main-header">🎓 AI-Enhanced Teaching Assistant Dashboard</h1>', unsafe_allow_html=True)
+    st.markdown('<h1 class="main-header hero">🎓 AI-Enhanced Teaching Assistant Dashboard</h1>', unsafe_allow_html=True)
     st.markdown('<p class="subtitle">Enhancing Collaborative Learning Through Evidence-Based AI Solutions</p>', unsafe_allow_html=True)
     
     # Introduction
@@ -131,13 +89,14 @@ def main():
         """)
     
     # Course context
-    st.markdown("""
+    course = course_context()
+    st.markdown(f"""
     ---
     
-    ### 📚 Course Context: Columbia University Introduction to Machine Learning
+    ### 📚 Course Context: {course['institution']} {course['name']} (Section {course['section']})
     
-    - **👥 Class Size**: 80 students organized into 20 groups of 4
-    - **⏱️ Duration**: 8-week collaborative ML pipeline development project
+    - **👥 Class Size**: {course['n_students']} students organized into {course['n_groups']} groups
+    - **⏱️ Duration**: {course['weeks']}-week collaborative ML pipeline development project
     - **🎯 Focus Areas**: Data preprocessing, feature engineering, model selection, training, and evaluation
     - **🧠 Group Dynamics**: Addressing personality diversity, trust building, and equal participation
     - **📈 Success Metrics**: Individual learning outcomes + collaborative effectiveness
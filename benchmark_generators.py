@@ -0,0 +1,303 @@
+"""
+Benchmark harness for the synthetic data generators.
+
+Times every generator in generate_data.py and generate_enhanced_data.py at
+several class sizes, records rows per second and peak memory, and compares
+the run against a saved JSON baseline so generator slowdowns are caught.
+Each generator runs in a child process that is stopped once it exceeds the
+time budget, and runs that are predicted to exceed it are not started.
+
+Usage:
+    python benchmark_generators.py                      # compare with baseline
+    python benchmark_generators.py --update-baseline    # record a new baseline
+    python benchmark_generators.py --scales 80 8000 --threshold 0.5
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import generate_data
+import generate_enhanced_data
+from constants import PROJECT_ROOT
+
+DEFAULT_SCALES = [80, 8_000, 800_000]
+DEFAULT_BASELINE = PROJECT_ROOT / "benchmark_baseline.json"
+
+# Event volumes per student, matching the 80-student defaults
+# (e.g. 1000 tutoring interactions / 80 students)
+PER_STUDENT = {
+    'interactions': 500 / 80,
+    'tutoring': 1000 / 80,
+    'motivation': 500 / 80,
+    'gamification': 300 / 80,
+    'conflicts': 150 / 80
+}
+
+def _group_ids(students_df):
+    return np.sort(students_df['group_id'].unique())
+
+def _scaled(kind, n_students):
+    return max(1, int(round(PER_STUDENT[kind] * n_students)))
+
+# name -> callable(students_df, n_students) returning a DataFrame
+GENERATORS = {
+    'groups': lambda s, n: generate_data.generate_group_data(s),
+    'interactions': lambda s, n: generate_data.generate_interaction_data(s, _scaled('interactions', n)),
+    'team_formation': lambda s, n: generate_enhanced_data.generate_team_formation_data(),
+    'monitoring': lambda s, n: generate_enhanced_data.generate_monitoring_data(_group_ids(s)),
+    'monitoring_events': lambda s, n: generate_enhanced_data.generate_session_monitoring_data(
+        _group_ids(s)),
+    'tutoring': lambda s, n: generate_enhanced_data.generate_tutoring_data(s, _scaled('tutoring', n)),
+    'participation': lambda s, n: generate_enhanced_data.generate_participation_data(s),
+    'motivation': lambda s, n: generate_enhanced_data.generate_motivation_data(s, _scaled('motivation', n)),
+    'gamification': lambda s, n: generate_enhanced_data.generate_gamification_data(s, _scaled('gamification', n)),
+    'conflicts': lambda s, n: generate_enhanced_data.generate_conflict_resolution_data(
+        _group_ids(s), _scaled('conflicts', n))
+}
+
+def _reseed():
+    """Reset both RNGs so every measurement generates identical data"""
+    np.random.seed(42)
+    random.seed(42)
+
+def measure(func, *args, track_memory=True):
+    """Time one generator call and optionally measure its peak memory.
+
+    Timing and memory are taken in separate calls because tracemalloc
+    slows down the Python-level loops the generators rely on.
+    """
+    _reseed()
+    start = time.perf_counter()
+    df = func(*args)
+    seconds = time.perf_counter() - start
+
+    peak_mb = peak_memory_mb(func, *args) if track_memory else None
+
+    return df, {
+        'rows': len(df),
+        'seconds': round(seconds, 4),
+        'rows_per_second': round(len(df) / seconds, 1) if seconds > 0 else None,
+        'peak_memory_mb': round(peak_mb, 2) if peak_mb is not None else None
+    }
+
+def peak_memory_mb(func, *args):
+    """Peak traced memory of one generator call, in MB"""
+    _reseed()
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024 ** 2
+
+def _measure_child(conn, name, students_df, n_students, track_memory):
+    """Child process body: send the timed stats, then the peak memory"""
+    args = (students_df, n_students)
+    _, stats = measure(GENERATORS[name], *args, track_memory=False)
+    conn.send(stats)
+    if track_memory:
+        conn.send(round(peak_memory_mb(GENERATORS[name], *args), 2))
+    conn.close()
+
+def measure_with_timeout(name, students_df, n_students, timeout, track_memory=True):
+    """``measure`` one generator in a child process that is stopped after ``timeout`` seconds.
+
+    The memory pass gets its own ``timeout``; if it runs out, the timing is
+    kept and the peak memory is left empty.
+
+    Returns:
+        The stats, or None if the timed run did not finish in time
+    """
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=_measure_child,
+                                      args=(sender, name, students_df, n_students, track_memory))
+    process.start()
+    sender.close()
+    try:
+        if not receiver.poll(timeout):
+            return None
+        stats = receiver.recv()
+        if track_memory and receiver.poll(timeout):
+            stats['peak_memory_mb'] = receiver.recv()
+        return stats
+    finally:
+        process.terminate()
+        process.join()
+
+def run_benchmarks(scales, generators, budget_seconds, track_memory=True):
+    """Run every selected generator at every scale.
+
+    A generator is skipped at a scale when its runtime, extrapolated with the
+    growth exponent fitted over its last two scales, exceeds
+    ``budget_seconds``; the loop-based generators would otherwise run for
+    hours at 800k students. Generators run in a child process that is
+    stopped once it exceeds the budget, which also covers the first
+    extrapolation, made from a single scale. A generator that was stopped
+    is skipped at every larger scale. Skipped runs are recorded with the
+    reason.
+    """
+    results = {}
+    history = {}
+    # Generators stopped at a smaller scale
+    stopped = set()
+
+    for n_students in sorted(scales):
+        print(f"\n=== {n_students:,} students ===")
+
+        key = f"students@{n_students}"
+        predicted = _predict(history.get('students'), n_students)
+        if predicted is not None and predicted > budget_seconds:
+            print(f"students: skipped (predicted {predicted:.0f}s > budget); skipping this scale")
+            results[key] = _skipped(n_students, f"predicted {predicted:.0f}s > {budget_seconds:.0f}s budget",
+                                    predicted)
+            continue
+
+        students_df, stats = measure(generate_data.generate_student_data, n_students,
+                                     track_memory=track_memory)
+        results[key] = {'students': n_students, **stats}
+        history.setdefault('students', []).append((n_students, stats['seconds']))
+        _report('students', stats)
+
+        for name in generators:
+            key = f"{name}@{n_students}"
+            if name in stopped:
+                print(f"{name}: skipped (exceeded the budget at a smaller scale)")
+                results[key] = _skipped(n_students, "exceeded the budget at a smaller scale")
+                continue
+            predicted = _predict(history.get(name), n_students)
+            if predicted is not None and predicted > budget_seconds:
+                print(f"{name}: skipped (predicted {predicted:.0f}s > {budget_seconds:.0f}s budget)")
+                results[key] = _skipped(n_students, f"predicted {predicted:.0f}s > {budget_seconds:.0f}s budget",
+                                        predicted)
+                continue
+
+            stats = measure_with_timeout(name, students_df, n_students, budget_seconds,
+                                         track_memory=track_memory)
+            if stats is None:
+                print(f"{name}: stopped after the {budget_seconds:.0f}s budget")
+                results[key] = {**_skipped(n_students, f"stopped after the {budget_seconds:.0f}s budget"),
+                                'stopped': True}
+                stopped.add(name)
+                continue
+            results[key] = {'students': n_students, **stats}
+            history.setdefault(name, []).append((n_students, stats['seconds']))
+            _report(name, stats)
+
+    return results
+
+def _skipped(n_students, reason, predicted=None):
+    entry = {'students': n_students, 'skipped': True, 'reason': reason}
+    if predicted is not None:
+        entry['predicted_seconds'] = round(predicted, 1)
+    return entry
+
+def _predict(history, n_students):
+    """Runtime at ``n_students`` extrapolated from the measured ``(students, seconds)`` history.
+
+    The exponent of ``seconds ~ students ** k`` is fitted over the last two
+    scales and never taken below linear, since fixed overhead dominates the
+    small scales. With a single scale the growth is assumed linear.
+    """
+    if not history:
+        return None
+    prev_students, prev_seconds = history[-1]
+    exponent = 1.0
+    if len(history) >= 2:
+        first_students, first_seconds = history[-2]
+        if first_seconds > 0 and prev_seconds > 0:
+            exponent = max(1.0, math.log(prev_seconds / first_seconds) / math.log(prev_students / first_students))
+    return prev_seconds * (n_students / prev_students) ** exponent
+
+def _report(name, stats):
+    memory = f", peak {stats['peak_memory_mb']:.1f} MB" if stats['peak_memory_mb'] is not None else ""
+    print(f"{name}: {stats['rows']:,} rows in {stats['seconds']:.3f}s "
+          f"({stats['rows_per_second'] or 0:,.0f} rows/s{memory})")
+
+def compare_to_baseline(results, baseline, threshold):
+    """Return (key, baseline_seconds, current_seconds) for every slowdown beyond threshold"""
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get('results', {}).get(key)
+        if not previous or previous.get('skipped'):
+            continue
+        if current.get('skipped'):
+            # A run the baseline finished but this one had to stop is a slowdown
+            if current.get('stopped') and previous['seconds'] >= 0.01:
+                regressions.append((key, previous['seconds'], float('inf')))
+            continue
+        # Ignore sub-10ms timings; they are dominated by noise
+        if previous['seconds'] < 0.01:
+            continue
+        if current['seconds'] > previous['seconds'] * (1 + threshold):
+            regressions.append((key, previous['seconds'], current['seconds']))
+    return regressions
+
+def main():
+    """Run the generator benchmarks and check them against the baseline"""
+    parser = argparse.ArgumentParser(description="Benchmark the synthetic data generators")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES,
+                        help="Class sizes (number of students) to benchmark")
+    parser.add_argument("--generators", nargs="+", choices=list(GENERATORS), default=list(GENERATORS),
+                        help="Subset of generators to run (students always runs)")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE),
+                        help="Path of the JSON baseline file")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Write this run's results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Flag runs slower than baseline by more than this fraction")
+    parser.add_argument("--budget", type=float, default=120.0,
+                        help="Skip a generator when its predicted runtime exceeds this many seconds, "
+                             "and stop it once it runs longer")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="Skip the peak-memory pass")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.scales, args.generators, args.budget,
+                             track_memory=not args.no_memory)
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'budget_seconds': args.budget,
+        'skipped': {key: entry['reason'] for key, entry in results.items() if entry.get('skipped')},
+        'results': results
+    }
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print(f"\nNo baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+
+    regressions = compare_to_baseline(results, baseline, args.threshold)
+    if not regressions:
+        print(f"\nNo slowdowns beyond {args.threshold:.0%} of baseline")
+        return 0
+
+    print(f"\n⚠️ {len(regressions)} slowdown(s) beyond {args.threshold:.0%} of baseline:")
+    for key, before, after in regressions:
+        if math.isinf(after):
+            print(f"  {key}: {before:.3f}s -> stopped after the {args.budget:.0f}s budget")
+        else:
+            print(f"  {key}: {before:.3f}s -> {after:.3f}s ({after / before - 1:+.0%})")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""
+Pre-render the default state of the analysis pages (1-8).
+
+Renders every page of a course section once with all filters at their
+defaults and stores each figure under ``<section data dir>/snapshots/``,
+so the first visit after a server restart reads the figures instead of
+building them. Re-run it after regenerating the section's data; snapshots
+of an older data version are never served.
+
+Usage:
+    python build_snapshots.py                               # default section
+    python build_snapshots.py --course intro-ml --section 002
+"""
+import argparse
+import os
+import sys
+import time
+
+from constants import COURSES, DEFAULT_COURSE, DEFAULT_SECTION
+from utils.partitions import partition_key
+from utils.snapshots import SNAPSHOT_PAGES, build_snapshots, snapshot_dir
+
+def main():
+    """Build the snapshots of one course section"""
+    parser = argparse.ArgumentParser(description="Pre-render the default state of the analysis pages")
+    parser.add_argument("--course", default=DEFAULT_COURSE, choices=list(COURSES),
+                        help="Course whose section is rendered")
+    parser.add_argument("--section", default=DEFAULT_SECTION,
+                        help="Section of the course (must be listed in constants.COURSES)")
+    parser.add_argument("--pages", nargs="+", metavar="PAGE",
+                        help="Render only pages whose file name contains one of these strings")
+    args = parser.parse_args()
+    if args.section not in COURSES[args.course]['sections']:
+        parser.error(f"section {args.section} is not registered for {args.course} in constants.COURSES")
+    partition = (args.course, args.section)
+    pages = [page for page in SNAPSHOT_PAGES
+             if not args.pages or any(name in os.path.basename(page) for name in args.pages)]
+
+    print(f"Rendering {len(pages)} pages of {partition_key(partition)}...")
+    start = time.perf_counter()
+    results = build_snapshots(partition, pages)
+    for page, errors in results.items():
+        print(f"  {'FAILED' if errors else 'ok':6} {os.path.basename(page)}")
+        for error in errors:
+            print(f"         {error}")
+
+    snapshots = list(snapshot_dir(partition).glob("*.json"))
+    print(f"\n{len(snapshots)} figures written to {snapshot_dir(partition)}/ "
+          f"in {time.perf_counter() - start:.1f}s")
+    return 1 if any(results.values()) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
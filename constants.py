@@ -16,6 +16,7 @@ DATA_PATHS = {
     'groups': DATA_DIR / "groups.csv",
     'interactions': DATA_DIR / "interactions.csv",
     'monitoring': DATA_DIR / "monitoring.csv",
+    'monitoring_events': DATA_DIR / "monitoring_events.csv",
     'tutoring': DATA_DIR / "tutoring.csv",
     'participation': DATA_DIR / "participation.csv",
     'motivation': DATA_DIR / "motivation.csv",
@@ -24,18 +25,31 @@ DATA_PATHS = {
     'team_formation': DATA_DIR / "team_formation.csv"
 }
 
+# Per-table content/row/schema versions, written by the generators
+DATA_MANIFEST_PATH = DATA_DIR / "manifest.json"
+
 # Convert to strings for compatibility
 DATA_PATHS_STR = {k: str(v) for k, v in DATA_PATHS.items()}
 
-# Course configuration
-COURSE_CONFIG = {
-    'name': 'Introduction to Machine Learning',
-    'institution': 'Columbia University',
-    'total_students': 80,
-    'groups_count': 20,
-    'students_per_group': 4,
-    'project_duration_weeks': 8
+# Courses and their sections. Every section is a partition with its own
+# copy of the DATA_PATHS tables under COURSES_DIR/<course>/<section>/; the
+# default section keeps the original flat layout directly in DATA_DIR.
+# Class size and group count are read from each section's own roster.
+COURSES = {
+    'intro-ml': {
+        'name': 'Introduction to Machine Learning',
+        'institution': 'Columbia University',
+        'sections': ['001'],
+        'students_per_group': 4,
+        'project_duration_weeks': 8
+    }
 }
+DEFAULT_COURSE = 'intro-ml'
+DEFAULT_SECTION = '001'
+COURSES_DIR = DATA_DIR / "courses"
+
+# Configuration of the default course
+COURSE_CONFIG = COURSES[DEFAULT_COURSE]
 
 # User roles
 USER_ROLES = ['Student', 'TA', 'Professor']
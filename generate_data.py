@@ -3,6 +3,13 @@ import numpy as np
 import random
 from datetime import datetime, timedelta
 import json
+import argparse
+import os
+
+from constants import COURSES, DEFAULT_COURSE, DEFAULT_SECTION
+from utils.data_versions import write_manifest
+from utils.partitions import partition_dir, table_paths
+from utils.sql_engine import export_parquet
 
 # Set random seed for reproducibility
 np.random.seed(42)
@@ -237,11 +244,25 @@ def generate_interaction_data(students_df, n_interactions=500):
 
 def main():
     """Generate all synthetic data files"""
+    parser = argparse.ArgumentParser(description="Generate the roster, groups and interactions of a course section")
+    parser.add_argument("--course", default=DEFAULT_COURSE, choices=list(COURSES),
+                        help="Course whose section is generated")
+    parser.add_argument("--section", default=DEFAULT_SECTION,
+                        help="Section of the course (must be listed in constants.COURSES)")
+    parser.add_argument("--students", type=int, default=80,
+                        help="Number of students in the section")
+    args = parser.parse_args()
+    if args.section not in COURSES[args.course]['sections']:
+        parser.error(f"section {args.section} is not registered for {args.course} in constants.COURSES")
+    partition = (args.course, args.section)
+    paths = table_paths(partition)
+    os.makedirs(partition_dir(partition), exist_ok=True)
+    
     print("Generating synthetic data for AI-Enhanced Teaching Assistant Dashboard...")
     
     # Generate data
     print("Creating student profiles...")
-    students_df = generate_student_data(80)
+    students_df = generate_student_data(args.students)
     
     print("Creating group compositions...")
     groups_df = generate_group_data(students_df)
@@ -251,9 +272,11 @@ def main():
     
     # Save to CSV files
     print("Saving data files...")
-    students_df.to_csv('/Users/jacksonzhao/Desktop/Intelligent_Teaching_Product/data/students.csv', index=False)
-    groups_df.to_csv('/Users/jacksonzhao/Desktop/Intelligent_Teaching_Product/data/groups.csv', index=False)
-    interactions_df.to_csv('/Users/jacksonzhao/Desktop/Intelligent_Teaching_Product/data/interactions.csv', index=False)
+    students_df.to_csv(paths['students'], index=False)
+    groups_df.to_csv(paths['groups'], index=False)
+    interactions_df.to_csv(paths['interactions'], index=False)
+    write_manifest(['students', 'groups', 'interactions'], partition)
+    export_parquet(['students', 'groups', 'interactions'], partition)
     
     # Generate summary statistics
     print("\n=== DATA SUMMARY ===")
@@ -271,7 +294,7 @@ def main():
     print(students_df['preferred_role'].value_counts())
     
     print("\nData generation completed successfully!")
-    print("Files saved to /Users/jacksonzhao/Desktop/Intelligent_Teaching_Product/data/")
+    print(f"Files saved to {partition_dir(partition)}/")
 
 if __name__ == "__main__":
     main()
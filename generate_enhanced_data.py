@@ -1,13 +1,28 @@
 import pandas as pd
 import numpy as np
 import random
+import argparse
 from datetime import datetime, timedelta
 import json
 
+from constants import COURSES, DEFAULT_COURSE, DEFAULT_SECTION
+from utils.data_versions import write_manifest
+from utils.partitions import DEFAULT_PARTITION, partition_dir, table_paths
+from utils.sql_engine import export_parquet
+
 # Set random seed for reproducibility
 np.random.seed(42)
 random.seed(42)
 
+def sample_roster(students_df, n):
+    """Sample n students from the roster and look up their groups.
+
+    Returns aligned ``(student_ids, group_ids)`` arrays so every generated
+    event references a real student in the group they belong to.
+    """
+    idx = np.random.randint(0, len(students_df), n)
+    return students_df['student_id'].to_numpy()[idx], students_df['group_id'].to_numpy()[idx]
+
 def generate_team_formation_data():
     """Generate data for team formation analysis"""
     formation_methods = ['Random', 'Self-Selected', 'AI-Optimized']
@@ -44,13 +59,14 @@ def generate_team_formation_data():
     
     return pd.DataFrame(data)
 
-def generate_monitoring_data():
+def generate_monitoring_data(group_ids, weeks=range(1, 9), end_time=None):
     """Generate real-time monitoring data"""
+    end_time = end_time or datetime.now()
+    last_week = weeks[-1]
     data = []
-    group_ids = [f"GRP{i:03d}" for i in range(1, 21)]
     
     for group_id in group_ids:
-        for week in range(1, 9):  # 8 weeks of data
+        for week in weeks:  # 8 weeks of data by default
             for day in range(1, 8):  # Daily monitoring
                 # Simulate engagement patterns
                 base_engagement = np.random.normal(7.5, 1.2)
@@ -67,7 +83,7 @@ def generate_monitoring_data():
                     'group_id': group_id,
                     'week': week,
                     'day': day,
-                    'timestamp': datetime.now() - timedelta(days=(8-week)*7 + (7-day)),
+                    'timestamp': end_time - timedelta(days=(last_week-week)*7 + (7-day)),
                     'avg_engagement': max(1, min(10, base_engagement + engagement_boost)),
                     'participation_equality': max(1, min(10, participation_equality)),
                     'ai_intervention': ai_intervention,
@@ -79,25 +95,118 @@ def generate_monitoring_data():
     
     return pd.DataFrame(data)
 
-def generate_tutoring_data():
+def generate_session_monitoring_data(group_ids, n_weeks=8, sessions_per_week=3,
+                                     students_per_group=4, max_minutes=150):
+    """Generate minute-level monitoring events for every group meeting.
+
+    Each session is simulated as an AR(1) engagement process around a
+    per-group baseline. When engagement dips below the alert threshold the
+    AI may intervene once per session, lifting engagement with an effect
+    that decays over the following minutes. All sessions are stepped
+    together, so the only Python loop runs over the minutes of a meeting.
+    """
+    intervention_types = np.array(['Prompt quiet member', 'Redirect discussion',
+                                   'Suggest break', 'Encourage idea sharing'])
+
+    group_ids = np.asarray(group_ids)
+    n_groups = len(group_ids)
+    n_sessions = n_groups * n_weeks * sessions_per_week
+    group_idx = np.repeat(np.arange(n_groups), n_weeks * sessions_per_week)
+    week = np.tile(np.repeat(np.arange(1, n_weeks + 1), sessions_per_week), n_groups)
+    # Meetings spread over the week: e.g. Mon/Wed/Fri for three sessions
+    day = np.tile(np.tile(1 + (np.arange(sessions_per_week) * 7) // sessions_per_week, n_weeks), n_groups)
+    duration = np.clip(np.random.normal(90, 20, n_sessions), 30, max_minutes).round().astype(int)
+
+    # Per-group baselines persist across sessions; sessions drift around them
+    group_baseline = np.clip(np.random.normal(7.2, 0.8, n_groups), 4, 9.5)
+    session_mean = np.clip(group_baseline[group_idx] + np.random.normal(0, 0.5, n_sessions), 3, 9.8)
+    equality_mean = np.clip(np.random.normal(7.0, 1.0, n_groups)[group_idx], 3, 9.5)
+
+    phi = 0.85  # minute-to-minute autocorrelation
+    threshold = 6.0
+    boost_size = np.random.normal(1.5, 0.4, n_sessions).clip(0.3)
+    boost_decay = 0.92
+
+    engagement = np.empty((n_sessions, max_minutes))
+    equality = np.empty((n_sessions, max_minutes))
+    intervened_now = np.zeros((n_sessions, max_minutes), dtype=bool)
+
+    level = session_mean + np.random.normal(0, 0.8, n_sessions)
+    eq_level = equality_mean + np.random.normal(0, 0.8, n_sessions)
+    boost = np.zeros(n_sessions)
+    has_intervened = np.zeros(n_sessions, dtype=bool)
+    for minute in range(max_minutes):
+        level = session_mean + phi * (level - session_mean) + np.random.normal(0, 0.45, n_sessions)
+        trigger = (~has_intervened) & (level + boost < threshold) & (np.random.random(n_sessions) < 0.6)
+        boost = boost * boost_decay + np.where(trigger, boost_size, 0.0)
+        has_intervened |= trigger
+        intervened_now[:, minute] = trigger
+        engagement[:, minute] = level + boost
+
+        eq_level = equality_mean + phi * (eq_level - equality_mean) + np.random.normal(0, 0.35, n_sessions)
+        equality[:, minute] = eq_level + 0.8 * boost
+
+    engagement = np.clip(engagement, 1, 10)
+    equality = np.clip(equality, 1, 10)
+
+    # Flatten to one row per in-session minute
+    minutes = np.arange(max_minutes)
+    in_session = minutes[None, :] < duration[:, None]
+    session_of_row, minute_of_row = np.nonzero(in_session)
+    row_engagement = engagement[in_session]
+    n_rows = len(session_of_row)
+
+    speak_prob = np.clip((row_engagement - 1) / 9, 0.05, 0.95)
+    active_speakers = np.random.binomial(students_per_group, speak_prob)
+    off_topic = np.random.random(n_rows) < np.clip(0.35 - 0.03 * row_engagement, 0.01, 0.3)
+    ai_intervention = intervened_now[in_session]
+    chosen_type = intervention_types[np.random.randint(0, len(intervention_types), n_rows)]
+
+    # Sessions start at 18:00 on their meeting day; the last week ends today
+    today = np.datetime64(datetime.now().date(), 'm')
+    session_start = (today
+                     - ((n_weeks - week) * 7 + (7 - day)).astype('timedelta64[D]')
+                     + np.timedelta64(18 * 60, 'm'))
+    timestamp = session_start[session_of_row] + minute_of_row.astype('timedelta64[m]')
+
+    return pd.DataFrame({
+        'group_id': group_ids[group_idx[session_of_row]],
+        'session_id': session_of_row + 1,
+        'week': week[session_of_row],
+        'day': day[session_of_row],
+        'minute': minute_of_row,
+        'timestamp': timestamp,
+        'avg_engagement': row_engagement,
+        'participation_equality': equality[in_session],
+        'active_speakers': active_speakers,
+        'off_topic': off_topic,
+        'ai_intervention': ai_intervention,
+        'intervention_type': np.where(ai_intervention, chosen_type, None)
+    })
+
+def generate_tutoring_data(students_df, n_interactions=1000, start_index=0,
+                           end_time=None, window_minutes=10080):
     """Generate AI tutoring and Q&A data"""
+    end_time = end_time or datetime.now()
     question_types = [
         'Data Preprocessing', 'Feature Engineering', 'Model Selection', 
         'Hyperparameter Tuning', 'Model Evaluation', 'Code Debugging',
         'Project Planning', 'Documentation', 'Presentation'
     ]
     
+    student_ids, group_ids = sample_roster(students_df, n_interactions)
+    
     data = []
-    for i in range(1000):  # 1000 tutoring interactions
+    for i in range(n_interactions):
         response_quality = np.random.normal(8.2, 1.1)  # AI typically performs well
         resolution_time = np.random.exponential(15)  # Fast response times
         
         data.append({
-            'interaction_id': f"TUT{i+1:04d}",
-            'student_id': f"STU{random.randint(1, 80):03d}",
-            'group_id': f"GRP{random.randint(1, 20):03d}",
+            'interaction_id': f"TUT{start_index+i+1:04d}",
+            'student_id': student_ids[i],
+            'group_id': group_ids[i],
             'question_type': random.choice(question_types),
-            'timestamp': datetime.now() - timedelta(minutes=random.randint(0, 10080)),  # Last week
+            'timestamp': end_time - timedelta(minutes=random.randint(0, window_minutes)),  # Last week by default
             'response_time_minutes': max(0.5, resolution_time),
             'response_quality': max(1, min(10, response_quality)),
             'student_satisfaction': max(1, min(10, response_quality + np.random.normal(0, 0.5))),
@@ -108,10 +217,8 @@ def generate_tutoring_data():
     
     return pd.DataFrame(data)
 
-def generate_participation_data():
+def generate_participation_data(students_df):
     """Generate equal participation tracking data"""
-    students_df = pd.read_csv('/Users/jacksonzhao/Desktop/Intelligent_Teaching_Product/data/students.csv')
-    
     data = []
     for _, student in students_df.iterrows():
         for week in range(1, 9):
@@ -143,21 +250,25 @@ def generate_participation_data():
     
     return pd.DataFrame(data)
 
-def generate_motivation_data():
+def generate_motivation_data(students_df, n_events=500, start_index=0,
+                             end_time=None, window_hours=336):
     """Generate motivation and positive reinforcement data"""
+    end_time = end_time or datetime.now()
     reinforcement_types = [
         'Achievement Badge', 'Progress Celebration', 'Peer Recognition', 
         'Skill Improvement Note', 'Team Contribution Highlight', 'Goal Achievement'
     ]
     
+    student_ids, group_ids = sample_roster(students_df, n_events)
+    
     data = []
-    for i in range(500):
+    for i in range(n_events):
         data.append({
-            'reinforcement_id': f"MOT{i+1:04d}",
-            'student_id': f"STU{random.randint(1, 80):03d}",
-            'group_id': f"GRP{random.randint(1, 20):03d}",
+            'reinforcement_id': f"MOT{start_index+i+1:04d}",
+            'student_id': student_ids[i],
+            'group_id': group_ids[i],
             'reinforcement_type': random.choice(reinforcement_types),
-            'timestamp': datetime.now() - timedelta(hours=random.randint(0, 336)),  # Last 2 weeks
+            'timestamp': end_time - timedelta(hours=random.randint(0, window_hours)),  # Last 2 weeks by default
             'engagement_before': np.random.normal(6.5, 1.5),
             'engagement_after': np.random.normal(7.8, 1.2),
             'motivation_boost': np.random.normal(1.3, 0.8),
@@ -168,22 +279,26 @@ def generate_motivation_data():
     
     return pd.DataFrame(data)
 
-def generate_gamification_data():
+def generate_gamification_data(students_df, n_achievements=300, start_index=0,
+                               end_time=None, window_hours=504):
     """Generate gamification and engagement incentive data"""
+    end_time = end_time or datetime.now()
     achievement_types = [
         'Data Detective', 'Code Collaborator', 'Model Master', 'Team Player',
         'Documentation Champion', 'Innovation Leader', 'Debugging Hero', 'Presentation Pro'
     ]
     
+    student_ids, group_ids = sample_roster(students_df, n_achievements)
+    
     data = []
-    for i in range(300):
+    for i in range(n_achievements):
         data.append({
-            'achievement_id': f"GAM{i+1:04d}",
-            'student_id': f"STU{random.randint(1, 80):03d}",
-            'group_id': f"GRP{random.randint(1, 20):03d}",
+            'achievement_id': f"GAM{start_index+i+1:04d}",
+            'student_id': student_ids[i],
+            'group_id': group_ids[i],
             'achievement_type': random.choice(achievement_types),
             'points_earned': random.randint(10, 100),
-            'timestamp': datetime.now() - timedelta(hours=random.randint(0, 504)),  # Last 3 weeks
+            'timestamp': end_time - timedelta(hours=random.randint(0, window_hours)),  # Last 3 weeks by default
             'difficulty_level': random.choice(['Bronze', 'Silver', 'Gold', 'Platinum']),
             'team_bonus': random.choice([True, False]),
             'engagement_increase': np.random.normal(12, 4),  # Percentage increase
@@ -193,8 +308,10 @@ def generate_gamification_data():
     
     return pd.DataFrame(data)
 
-def generate_conflict_resolution_data():
+def generate_conflict_resolution_data(group_ids, n_conflicts=150, start_index=0,
+                                      end_time=None, window_hours=672):
     """Generate conflict mediation and resolution data"""
+    end_time = end_time or datetime.now()
     conflict_types = [
         'Unequal Contribution', 'Communication Style Clash', 'Technical Disagreement',
         'Scheduling Conflict', 'Leadership Dispute', 'Quality Standards Disagreement'
@@ -205,17 +322,19 @@ def generate_conflict_resolution_data():
         'Skill-Based Task Assignment', 'Communication Training', 'Goal Realignment'
     ]
     
+    conflict_groups = np.asarray(group_ids)[np.random.randint(0, len(group_ids), n_conflicts)]
+    
     data = []
-    for i in range(150):
+    for i in range(n_conflicts):
         intervention_time = np.random.exponential(2)  # AI detects conflicts quickly
         resolution_success = random.choices([True, False], weights=[0.85, 0.15])[0]
         
         data.append({
-            'conflict_id': f"CON{i+1:04d}",
-            'group_id': f"GRP{random.randint(1, 20):03d}",
+            'conflict_id': f"CON{start_index+i+1:04d}",
+            'group_id': conflict_groups[i],
             'conflict_type': random.choice(conflict_types),
             'detection_method': random.choice(['Communication Analysis', 'Participation Metrics', 'Student Report']),
-            'timestamp': datetime.now() - timedelta(hours=random.randint(0, 672)),  # Last 4 weeks
+            'timestamp': end_time - timedelta(hours=random.randint(0, window_hours)),  # Last 4 weeks by default
             'severity_level': random.choice(['Low', 'Medium', 'High']),
             'intervention_time_hours': max(0.5, intervention_time),
             'resolution_strategy': random.choice(resolution_strategies),
@@ -228,42 +347,137 @@ def generate_conflict_resolution_data():
     
     return pd.DataFrame(data)
 
+# Expected new events per simulated week, matching the full generator's
+# volumes (e.g. 500 motivation events over 2 weeks)
+WEEKLY_EVENT_COUNTS = {
+    'tutoring': 1000,
+    'motivation': 250,
+    'gamification': 100,
+    'conflicts': 38
+}
+
+def _last_recorded(table, columns, partition=DEFAULT_PARTITION):
+    """Read only the bookkeeping columns of an existing event table"""
+    df = pd.read_csv(table_paths(partition)[table], usecols=columns)
+    return df, pd.to_datetime(df['timestamp']).max()
+
+def append_event_data(students_df, n_weeks=1, partition=DEFAULT_PARTITION):
+    """Append n_weeks of new events after the last recorded week/timestamp of a course section.
+
+    Only monitoring, tutoring, motivation, gamification and conflicts grow
+    over a semester; their existing rows are left untouched and the new rows
+    are appended to the end of each CSV.
+    """
+    group_ids = np.sort(students_df['group_id'].unique())
+    span = timedelta(days=7 * n_weeks)
+    appended = {}
+    
+    monitoring, last_ts = _last_recorded('monitoring', ['week', 'timestamp'], partition)
+    last_week = int(monitoring['week'].max())
+    appended['monitoring'] = generate_monitoring_data(
+        group_ids, weeks=range(last_week + 1, last_week + 1 + n_weeks), end_time=last_ts + span)
+    
+    # Timestamps fall in (last_ts, last_ts + span]; ids continue the sequence
+    for table, id_column, generator, window_unit in [
+        ('tutoring', 'interaction_id', generate_tutoring_data, 'minutes'),
+        ('motivation', 'reinforcement_id', generate_motivation_data, 'hours'),
+        ('gamification', 'achievement_id', generate_gamification_data, 'hours'),
+        ('conflicts', 'conflict_id', generate_conflict_resolution_data, 'hours'),
+    ]:
+        existing, last_ts = _last_recorded(table, [id_column, 'timestamp'], partition)
+        window = int(span / timedelta(**{window_unit: 1})) - 1
+        population = group_ids if table == 'conflicts' else students_df
+        appended[table] = generator(
+            population, WEEKLY_EVENT_COUNTS[table] * n_weeks, start_index=len(existing),
+            end_time=last_ts + span, **{f"window_{window_unit}": window})
+    
+    paths = table_paths(partition)
+    for table, df in appended.items():
+        df.to_csv(paths[table], mode='a', header=False, index=False)
+    write_manifest(appended.keys(), partition)
+    export_parquet(appended.keys(), partition)
+    
+    return appended
+
 def main():
     """Generate all enhanced datasets"""
+    parser = argparse.ArgumentParser(description="Generate enhanced datasets for AI TA analysis")
+    parser.add_argument("--minute-level", action="store_true",
+                        help="Also generate per-minute session monitoring events")
+    parser.add_argument("--append", action="store_true",
+                        help="Append new events after the last recorded week instead of regenerating")
+    parser.add_argument("--weeks", type=int, default=1,
+                        help="Number of weeks to simulate in --append mode")
+    parser.add_argument("--course", default=DEFAULT_COURSE, choices=list(COURSES),
+                        help="Course whose section is generated")
+    parser.add_argument("--section", default=DEFAULT_SECTION,
+                        help="Section of the course (its roster must exist, see generate_data.py)")
+    args = parser.parse_args()
+    if args.section not in COURSES[args.course]['sections']:
+        parser.error(f"section {args.section} is not registered for {args.course} in constants.COURSES")
+    partition = (args.course, args.section)
+    paths = table_paths(partition)
+    
+    # Every event table is drawn from the real roster so group joins line up
+    students_df = pd.read_csv(paths['students'])
+    group_ids = np.sort(students_df['group_id'].unique())
+    
+    if args.append:
+        print(f"Appending {args.weeks} week(s) of events...")
+        appended = append_event_data(students_df, args.weeks, partition)
+        for table, df in appended.items():
+            print(f"{table}: +{len(df)} records")
+        return
+    
     print("Generating enhanced datasets for AI TA analysis...")
     
     # Generate enhanced datasets
     print("1. Team Formation Analysis...")
     team_formation_df = generate_team_formation_data()
-    team_formation_df.to_csv('/Users/jacksonzhao/Desktop/Intelligent_Teaching_Product/data/team_formation.csv', index=False)
+    team_formation_df.to_csv(paths['team_formation'], index=False)
     
     print("2. Real-time Monitoring...")
-    monitoring_df = generate_monitoring_data()
-    monitoring_df.to_csv('/Users/jacksonzhao/Desktop/Intelligent_Teaching_Product/data/monitoring.csv', index=False)
+    monitoring_df = generate_monitoring_data(group_ids)
+    monitoring_df.to_csv(paths['monitoring'], index=False)
+    
+    if args.minute_level:
+        print("2b. Minute-level Session Monitoring...")
+        session_monitoring_df = generate_session_monitoring_data(
+            group_ids, students_per_group=COURSES[args.course]['students_per_group'])
+        session_monitoring_df.to_csv(paths['monitoring_events'], index=False)
     
     print("3. AI Tutoring & Q&A...")
-    tutoring_df = generate_tutoring_data()
-    tutoring_df.to_csv('/Users/jacksonzhao/Desktop/Intelligent_Teaching_Product/data/tutoring.csv', index=False)
+    tutoring_df = generate_tutoring_data(students_df)
+    tutoring_df.to_csv(paths['tutoring'], index=False)
     
     print("4. Equal Participation Tracking...")
-    participation_df = generate_participation_data()
-    participation_df.to_csv('/Users/jacksonzhao/Desktop/Intelligent_Teaching_Product/data/participation.csv', index=False)
+    participation_df = generate_participation_data(students_df)
+    participation_df.to_csv(paths['participation'], index=False)
     
     print("5. Motivation & Reinforcement...")
-    motivation_df = generate_motivation_data()
-    motivation_df.to_csv('/Users/jacksonzhao/Desktop/Intelligent_Teaching_Product/data/motivation.csv', index=False)
+    motivation_df = generate_motivation_data(students_df)
+    motivation_df.to_csv(paths['motivation'], index=False)
     
     print("6. Gamification & Engagement...")
-    gamification_df = generate_gamification_data()
-    gamification_df.to_csv('/Users/jacksonzhao/Desktop/Intelligent_Teaching_Product/data/gamification.csv', index=False)
+    gamification_df = generate_gamification_data(students_df)
+    gamification_df.to_csv(paths['gamification'], index=False)
     
     print("7. Conflict Resolution...")
-    conflict_df = generate_conflict_resolution_data()
-    conflict_df.to_csv('/Users/jacksonzhao/Desktop/Intelligent_Teaching_Product/data/conflicts.csv', index=False)
+    conflict_df = generate_conflict_resolution_data(group_ids)
+    conflict_df.to_csv(paths['conflicts'], index=False)
+    
+    written = ['team_formation', 'monitoring', 'tutoring', 'participation',
+               'motivation', 'gamification', 'conflicts']
+    if args.minute_level:
+        written.append('monitoring_events')
+    write_manifest(written, partition)
+    export_parquet(written, partition)
     
     print("\n=== ENHANCED DATA SUMMARY ===")
     print(f"Team Formation Analysis: {len(team_formation_df)} records")
     print(f"Real-time Monitoring: {len(monitoring_df)} records")
+    if args.minute_level:
+        print(f"Session Monitoring Events: {len(session_monitoring_df)} records")
     print(f"AI Tutoring Interactions: {len(tutoring_df)} records")
     print(f"Participation Tracking: {len(participation_df)} records")
     print(f"Motivation Events: {len(motivation_df)} records")
@@ -271,7 +485,7 @@ def main():
     print(f"Conflict Resolutions: {len(conflict_df)} records")
     
     print("\nEnhanced data generation completed successfully!")
-    print("Files saved to /Users/jacksonzhao/Desktop/Intelligent_Teaching_Product/data/")
+    print(f"Files saved to {partition_dir(partition)}/")
 
 if __name__ == "__main__":
     main()
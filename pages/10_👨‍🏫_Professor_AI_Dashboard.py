@@ -1,5 +1,4 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
@@ -18,80 +17,90 @@ from prompts.professor_prompts import SYSTEM_PROMPT, CLASS_ANALYTICS_PROMPT, INT
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from constants import DATA_PATHS_STR
+from utils.data_loader import load_table, table_version, data_version
+from utils.lazy_sections import lazy_tabs
+from utils.risk_scoring import with_live_risk, RISK_TABLES
+from utils.sql_engine import run_sql
+from utils.equity import load_equity, EQUITY_COLUMNS
+from utils.figure_cache import cached_figure
+from utils.card_list import card_list
+from utils.theme import apply_theme
+from utils.courses import course_selector, course_context
 
 st.set_page_config(page_title="Professor AI Dashboard", page_icon="👨‍🏫", layout="wide")
 
-# Custom CSS
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 2.5rem;
-        font-weight: bold;
-        color: #1f77b4;
-        text-align: center;
-        margin-bottom: 2rem;
-    }
-    .insight-box {
-        background-color: #f8f9fa;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border-left: 4px solid #1f77b4;
-        margin: 1rem 0;
-    }
-    .alert-high {
-        background-color: #f8d7da;
-        padding: 1rem;
-        border-radius: 10px;
-        border-left: 4px solid #dc3545;
-        margin: 1rem 0;
-    }
-    .alert-medium {
-        background-color: #fff3cd;
-        padding: 1rem;
-        border-radius: 10px;
-        border-left: 4px solid #ffc107;
-        margin: 1rem 0;
-    }
-    .success-box {
-        background-color: #d4edda;
-        padding: 1rem;
-        border-radius: 10px;
-        border-left: 4px solid #28a745;
-        margin: 1rem 0;
-    }
-    .metric-card {
-        background-color: #ffffff;
-        padding: 1rem;
-        border-radius: 10px;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        text-align: center;
-        margin: 0.5rem 0;
-    }
-</style>
-""", unsafe_allow_html=True)
+# Shared stylesheet (static/theme.css)
+apply_theme()
+
+# Course section this session works on; every table below is loaded from it
+course_selector()
 
-@st.cache_data
 def load_professor_data():
     """Load all data for professor dashboard"""
-    students_df = pd.read_csv(DATA_PATHS_STR['students'])
-    groups_df = pd.read_csv(DATA_PATHS_STR['groups'])
-    monitoring_df = pd.read_csv(DATA_PATHS_STR['monitoring'])
-    tutoring_df = pd.read_csv(DATA_PATHS_STR['tutoring'])
-    participation_df = pd.read_csv(DATA_PATHS_STR['participation'])
-    conflicts_df = pd.read_csv(DATA_PATHS_STR['conflicts'])
+    students_df = load_table('students')
+    groups_df = with_live_risk(load_table('groups'))
+    monitoring_df = load_table('monitoring')
+    tutoring_df = load_table('tutoring')
+    participation_df = load_table('participation')
+    conflicts_df = load_table('conflicts')
     return students_df, groups_df, monitoring_df, tutoring_df, participation_df, conflicts_df
 
+@st.cache_data
+def weekly_monitoring_summary(monitoring_version: str):
+    """Weekly intervention counts and engagement trend, cached per monitoring version"""
+    weekly = run_sql("""
+        SELECT week,
+               count(*) FILTER (WHERE ai_intervention) AS with_ai,
+               count(*) FILTER (WHERE NOT ai_intervention) AS without_ai,
+               avg(avg_engagement) AS avg_engagement
+        FROM monitoring
+        GROUP BY week
+        ORDER BY week
+    """, tables=['monitoring']).set_index('week')
+    monitoring_weekly = weekly[['with_ai', 'without_ai']].rename(columns={'with_ai': True, 'without_ai': False})
+    return monitoring_weekly, weekly['avg_engagement']
+
+def intervention_frequency_figure() -> go.Figure:
+    """Weekly sessions with and without an AI intervention"""
+    monitoring_weekly, _ = weekly_monitoring_summary(table_version('monitoring'))
+    
+    fig_interventions = go.Figure()
+    fig_interventions.add_trace(go.Scatter(x=monitoring_weekly.index, y=monitoring_weekly[True],
+                                         name='With AI Intervention', line=dict(color='#e74c3c')))
+    fig_interventions.add_trace(go.Scatter(x=monitoring_weekly.index, y=monitoring_weekly[False],
+                                         name='No Intervention', line=dict(color='#2ecc71')))
+    fig_interventions.update_layout(title="AI Intervention Frequency Over Time",
+                                  xaxis_title="Week", yaxis_title="Number of Sessions")
+    return fig_interventions
+
+def equity_heatmap_figure(equity_metric: str) -> go.Figure:
+    """Gini of one participation channel for every group and week"""
+    equity_grid = load_equity().frame(equity_metric).pivot(index='group_id', columns='week', values='gini')
+    return px.imshow(equity_grid, color_continuous_scale='RdYlGn_r', zmin=0, zmax=0.6,
+                     aspect='auto', labels={'color': 'Gini'},
+                     title=f"{EQUITY_COLUMNS[equity_metric]} Inequality by Group and Week")
+
+def engagement_trend_figure() -> go.Figure:
+    """Weekly class engagement against the target level"""
+    _, engagement_trend = weekly_monitoring_summary(table_version('monitoring'))
+    fig_trend = px.line(x=engagement_trend.index, y=engagement_trend.values,
+                      title="Class Engagement Trend")
+    fig_trend.add_hline(y=7.5, line_dash="dash", line_color="red", 
+                      annotation_text="Target Engagement Level")
+    return fig_trend
+
 def generate_professor_ai_response(prompt: str, class_data: dict) -> str:
     """Generate contextual AI responses for professors using Azure OpenAI"""
     try:
         # Format context data for the AI
+        course = course_context()
         context = format_context_data(
             additional_context={
                 "class_metrics": class_data,
-                "course_context": "Columbia University Introduction to Machine Learning course",
-                "class_size": "80 students in 20 groups of 4",
-                "project_type": "8-week collaborative ML pipeline development"
+                "course_context": course['course'],
+                "section": course['partition'],
+                "class_size": course['class_size'],
+                "project_type": f"{course['weeks']}-week collaborative ML pipeline development"
             }
         )
         
@@ -99,7 +108,7 @@ def generate_professor_ai_response(prompt: str, class_data: dict) -> str:
         prompt_lower = prompt.lower()
         
         if any(word in prompt_lower for word in ['performance', 'analytics', 'progress', 'overview', 'class']):
-            system_prompt = SYSTEM_PROMPT
+            system_prompt = SYSTEM_PROMPT.format(**course)
             # Prepare data for CLASS_ANALYTICS_PROMPT with safe defaults
             analytics_data = {
                 'avg_engagement': class_data.get('avg_engagement', 7.0),
@@ -115,7 +124,7 @@ def generate_professor_ai_response(prompt: str, class_data: dict) -> str:
             user_prompt = f"User request: {prompt}\n\n{formatted_prompt}"
             
         elif any(word in prompt_lower for word in ['intervention', 'support', 'help', 'struggling', 'urgent']):
-            system_prompt = SYSTEM_PROMPT
+            system_prompt = SYSTEM_PROMPT.format(**course)
             # Prepare data for INTERVENTION_RECOMMENDATIONS_PROMPT with safe defaults
             intervention_data = {
                 'at_risk_groups': ', '.join(class_data.get('at_risk_groups', [])),
@@ -127,7 +136,7 @@ def generate_professor_ai_response(prompt: str, class_data: dict) -> str:
             
         else:
             # General query
-            system_prompt = SYSTEM_PROMPT
+            system_prompt = SYSTEM_PROMPT.format(**course)
             user_prompt = f"""
             The user is asking: "{prompt}"
             
@@ -135,7 +144,7 @@ def generate_professor_ai_response(prompt: str, class_data: dict) -> str:
             
             Current class context:
             - Average engagement: {class_data.get('avg_engagement', 0):.1f}/10
-            - Active groups: {class_data.get('active_groups', 0)}/20
+            - Active groups: {class_data.get('active_groups', 0)}/{class_data.get('n_groups', 0)}
             - At-risk students: {class_data.get('at_risk_students', 0)}
             - Top performing groups: {', '.join(class_data.get('top_groups', []))}
             - Groups needing attention: {', '.join(class_data.get('at_risk_groups', []))}
@@ -147,7 +156,8 @@ def generate_professor_ai_response(prompt: str, class_data: dict) -> str:
             user_prompt=user_prompt,
             context_data=context,
             temperature=0.7,
-            max_tokens=1200
+            max_tokens=1200,
+            data_version=data_version('students', 'groups', 'monitoring', 'tutoring', 'participation', 'conflicts')
         )
         
         return response
@@ -161,7 +171,7 @@ def generate_professor_ai_response(prompt: str, class_data: dict) -> str:
 
 **Current Status:**
 - Average Engagement: {class_data.get('avg_engagement', 0):.1f}/10
-- Active Groups: {class_data.get('active_groups', 0)}/20 performing well
+- Active Groups: {class_data.get('active_groups', 0)}/{class_data.get('n_groups', 0)} performing well
 - At-Risk Students: {class_data.get('at_risk_students', 0)} need attention
 
 **Top Performing Groups:** {', '.join(class_data.get('top_groups', []))}
@@ -175,9 +185,12 @@ def main():
     
     # Load data
     students_df, groups_df, monitoring_df, tutoring_df, participation_df, conflicts_df = load_professor_data()
+    groups_df = groups_df.sort_values('risk_score', ascending=False)
+    course = course_context()
     
     # Calculate class analytics
     class_data = {
+        'n_groups': course['n_groups'],
         'avg_engagement': students_df['engagement_score'].mean(),
         'participation_equality': monitoring_df['participation_equality'].mean(),
         'active_groups': len(groups_df[groups_df['risk_level'] == 'Low']),
@@ -217,7 +230,7 @@ def main():
     with col1:
         st.metric("Class Engagement", f"{class_data['avg_engagement']:.1f}/10", "▲ 0.8")
     with col2:
-        st.metric("Active Groups", f"{class_data['active_groups']}/20", "▲ 2")
+        st.metric("Active Groups", f"{class_data['active_groups']}/{course['n_groups']}", "▲ 2")
     with col3:
         st.metric("At-Risk Students", class_data['at_risk_students'], "▼ 3")
     with col4:
@@ -324,25 +337,27 @@ def main():
     # Detailed Analytics Tabs
     st.markdown("## 📊 Detailed Analytics")
     
-    tab1, tab2, tab3, tab4 = st.tabs(["👥 Student Performance", "🎯 Group Dynamics", "📈 Intervention Tracking", "🎓 Course Optimization"])
+    analytics_tabs = ["👥 Student Performance", "🎯 Group Dynamics", "📈 Intervention Tracking", "🎓 Course Optimization"]
+    active_tab = lazy_tabs(analytics_tabs, key="professor_analytics_tab")
     
-    with tab1:
+    if active_tab == analytics_tabs[0]:
         # Student performance analysis
         col1, col2 = st.columns(2)
         
         with col1:
             # Performance vs engagement scatter
-            fig_scatter = px.scatter(students_df, x='engagement_score', y='academic_performance',
-                                   color='personality_type', size='collaboration_score',
-                                   title="Student Performance Analysis",
-                                   hover_data=['student_name', 'preferred_role'])
+            fig_scatter = cached_figure('professor_student_performance', lambda: px.scatter(
+                students_df, x='engagement_score', y='academic_performance',
+                color='personality_type', size='collaboration_score',
+                title="Student Performance Analysis",
+                hover_data=['student_name', 'preferred_role']), tables=['students'])
             st.plotly_chart(fig_scatter, use_container_width=True)
         
         with col2:
             # Skill distribution by major
-            fig_skills = px.box(students_df, x='major', y='technical_skills',
-                              title="Technical Skills by Major")
-            fig_skills.update_layout(xaxis=dict(tickangle=45))
+            fig_skills = cached_figure('professor_skills_by_major', lambda: px.box(
+                students_df, x='major', y='technical_skills',
+                title="Technical Skills by Major").update_layout(xaxis=dict(tickangle=45)), tables=['students'])
             st.plotly_chart(fig_skills, use_container_width=True)
         
         # At-risk student table
@@ -356,49 +371,57 @@ def main():
         else:
             st.success("🎉 No students currently at risk!")
     
-    with tab2:
+    elif active_tab == analytics_tabs[1]:
         # Group dynamics analysis
         col1, col2 = st.columns(2)
         
         with col1:
             # Group performance metrics
-            fig_group_perf = px.scatter(groups_df, x='avg_collaboration_score', y='avg_engagement_score',
-                                      color='risk_level', size='progress_percentage',
-                                      title="Group Performance Overview",
-                                      hover_data=['group_name'])
+            fig_group_perf = cached_figure('professor_group_performance', lambda: px.scatter(
+                groups_df, x='avg_collaboration_score', y='avg_engagement_score',
+                color='risk_level', size='progress_percentage',
+                title="Group Performance Overview",
+                hover_data=['group_name']), tables=['groups', *RISK_TABLES])
             st.plotly_chart(fig_group_perf, use_container_width=True)
         
         with col2:
             # Diversity vs performance
-            fig_diversity = px.scatter(groups_df, x='personality_diversity', y='avg_engagement_score',
-                                     color='risk_level', size='avg_technical_skills',
-                                     title="Personality Diversity Impact")
+            fig_diversity = cached_figure('professor_diversity_impact', lambda: px.scatter(
+                groups_df, x='personality_diversity', y='avg_engagement_score',
+                color='risk_level', size='avg_technical_skills',
+                title="Personality Diversity Impact"), tables=['groups', *RISK_TABLES])
             st.plotly_chart(fig_diversity, use_container_width=True)
         
+        # Within-group participation equity for every group and week
+        st.markdown("### ⚖️ Participation Equity (Gini)")
+        equity_metric = st.selectbox("Channel:", list(EQUITY_COLUMNS), format_func=EQUITY_COLUMNS.get,
+                                     key="professor_equity_metric")
+        fig_equity = cached_figure('professor_equity_heatmap', equity_heatmap_figure, equity_metric,
+                                   tables=['participation'], filters={'metric': equity_metric})
+        st.plotly_chart(fig_equity, use_container_width=True)
+        
         # Group intervention recommendations
         st.markdown("### 💡 Group Intervention Recommendations")
         
-        for _, group in groups_df[groups_df['risk_level'].isin(['High', 'Medium'])].iterrows():
-            risk_color = {'High': 'alert-high', 'Medium': 'alert-medium'}[group['risk_level']]
-            st.markdown(f"""
+        flagged_groups = groups_df[groups_df['risk_level'].isin(['High', 'Medium'])] \
+            .sort_values('risk_score', ascending=False)
+        flagged_groups = flagged_groups.assign(
+            risk_color=flagged_groups['risk_level'].map({'High': 'alert-high', 'Medium': 'alert-medium'}),
+            risk_factors=flagged_groups['risk_factors'].fillna('').replace('', 'None above threshold'))
+        card_list(flagged_groups, """
             <div class="{risk_color}">
-            <strong>{group['group_name']}</strong> - {group['project_topic']}<br>
-            Risk Level: {group['risk_level']} | Progress: {group['progress_percentage']:.1f}%<br>
-            Engagement: {group['avg_engagement_score']:.1f}/10 | Collaboration: {group['avg_collaboration_score']:.1f}/10
+            <strong>{group_name}</strong> - {project_topic}<br>
+            Risk Level: {risk_level} ({risk_score:.1f}/10) | Progress: {progress_percentage:.1f}%<br>
+            Risk Factors: {risk_factors}<br>
+            Engagement: {avg_engagement_score:.1f}/10 | Collaboration: {avg_collaboration_score:.1f}/10
             </div>
-            """, unsafe_allow_html=True)
+            """, key="professor_group_recommendations", height=600,
+                  empty_message="No groups currently at medium or high risk.")
     
-    with tab3:
+    elif active_tab == analytics_tabs[2]:
         # Intervention tracking
-        monitoring_weekly = monitoring_df.groupby(['week', 'ai_intervention']).size().unstack(fill_value=0)
-        
-        fig_interventions = go.Figure()
-        fig_interventions.add_trace(go.Scatter(x=monitoring_weekly.index, y=monitoring_weekly[True],
-                                             name='With AI Intervention', line=dict(color='#e74c3c')))
-        fig_interventions.add_trace(go.Scatter(x=monitoring_weekly.index, y=monitoring_weekly[False],
-                                             name='No Intervention', line=dict(color='#2ecc71')))
-        fig_interventions.update_layout(title="AI Intervention Frequency Over Time",
-                                      xaxis_title="Week", yaxis_title="Number of Sessions")
+        fig_interventions = cached_figure('professor_intervention_frequency', intervention_frequency_figure,
+                                          tables=['monitoring'])
         st.plotly_chart(fig_interventions, use_container_width=True)
         
         # Success rate metrics
@@ -410,16 +433,12 @@ def main():
         with col3:
             st.metric("Student Satisfaction", "8.4/10", "▲ 0.3")
     
-    with tab4:
+    elif active_tab == analytics_tabs[3]:
         # Course optimization insights
         st.markdown("### 🎓 Learning Outcome Analysis")
         
         # Engagement trends over time
-        engagement_trend = monitoring_df.groupby('week')['avg_engagement'].mean()
-        fig_trend = px.line(x=engagement_trend.index, y=engagement_trend.values,
-                          title="Class Engagement Trend")
-        fig_trend.add_hline(y=7.5, line_dash="dash", line_color="red", 
-                          annotation_text="Target Engagement Level")
+        fig_trend = cached_figure('professor_engagement_trend', engagement_trend_figure, tables=['monitoring'])
         st.plotly_chart(fig_trend, use_container_width=True)
         
         # Curriculum effectiveness
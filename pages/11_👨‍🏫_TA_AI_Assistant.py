@@ -18,83 +18,83 @@ from prompts.ta_prompts import SYSTEM_PROMPT, TASK_PRIORITIZATION_PROMPT, CONFLI
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from constants import DATA_PATHS_STR
+from utils.data_loader import load_table, data_version
+from utils.lazy_sections import lazy_tabs
+from utils.figure_cache import cached_figure
+from utils.card_list import card_list
+from utils.risk_scoring import with_live_risk
+from utils.alerts import load_alerts
+from utils.interaction_graph import load_network_metrics, ISOLATION_RATIO
+from utils.theme import apply_theme
+from utils.courses import course_selector, course_context
 
 st.set_page_config(page_title="TA AI Assistant", page_icon="👨‍🏫", layout="wide")
 
-# Custom CSS
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 2.5rem;
-        font-weight: bold;
-        color: #1f77b4;
-        text-align: center;
-        margin-bottom: 2rem;
-    }
-    .task-card {
-        background-color: #ffffff;
-        padding: 1rem;
-        border-radius: 10px;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        margin: 0.5rem 0;
-        border-left: 4px solid #3498db;
-    }
-    .urgent-task {
-        border-left-color: #e74c3c;
-        background-color: #fdf2f2;
-    }
-    .medium-task {
-        border-left-color: #f39c12;
-        background-color: #fffbf2;
-    }
-    .low-task {
-        border-left-color: #2ecc71;
-        background-color: #f2fdf7;
-    }
-    .chat-message {
-        padding: 1rem;
-        border-radius: 10px;
-        margin: 0.5rem 0;
-    }
-    .user-message {
-        background-color: #e3f2fd;
-        margin-left: 20%;
-    }
-    .assistant-message {
-        background-color: #f5f5f5;
-        margin-right: 20%;
-    }
-    .success-metric {
-        background-color: #d4edda;
-        padding: 0.5rem;
-        border-radius: 5px;
-        text-align: center;
-        margin: 0.3rem 0;
-    }
-</style>
-""", unsafe_allow_html=True)
+# Shared stylesheet (static/theme.css)
+apply_theme()
+
+# Course section this session works on; every table below is loaded from it
+course_selector()
 
-@st.cache_data
 def load_ta_data():
     """Load data relevant for TA dashboard"""
-    students_df = pd.read_csv(DATA_PATHS_STR['students'])
-    groups_df = pd.read_csv(DATA_PATHS_STR['groups'])
-    monitoring_df = pd.read_csv(DATA_PATHS_STR['monitoring'])
-    tutoring_df = pd.read_csv(DATA_PATHS_STR['tutoring'])
-    conflicts_df = pd.read_csv(DATA_PATHS_STR['conflicts'])
-    participation_df = pd.read_csv(DATA_PATHS_STR['participation'])
+    students_df = load_table('students')
+    groups_df = with_live_risk(load_table('groups'))
+    monitoring_df = load_table('monitoring')
+    tutoring_df = load_table('tutoring')
+    conflicts_df = load_table('conflicts')
+    participation_df = load_table('participation')
     return students_df, groups_df, monitoring_df, tutoring_df, conflicts_df, participation_df
 
+def format_minutes(minutes: int) -> str:
+    """Format an estimated task time, e.g. 30 -> "30 min", 120 -> "2 hours" """
+    if minutes < 60:
+        return f"{minutes} min"
+    hours = minutes / 60
+    return f"{hours:g} hour{'s' if hours != 1 else ''}"
+
+def alert_tasks(alerts: pd.DataFrame, student_names: pd.Series, limit: int = 3) -> list:
+    """Turn the highest-ranked alerts into task board cards"""
+    tasks = []
+    for alert in alerts.head(limit).to_dict('records'):
+        if alert['student_id']:
+            title = f"Student Check-in: {student_names.get(alert['student_id'], alert['student_id'])}"
+        else:
+            title = f"Group {alert['group_id'][3:]} {alert['type']}"
+        tasks.append({"title": title, "desc": f"{alert['detail']} — {alert['action']}",
+                      "time": format_minutes(alert['minutes'])})
+    return tasks
+
+def network_figure(student_network: pd.DataFrame) -> go.Figure:
+    """Interaction strength against centrality, isolated students highlighted"""
+    fig_network = px.scatter(student_network.reset_index(), x='relative_strength', y='centrality',
+                             color='isolated', size='partners', hover_name='student_name',
+                             hover_data=['group_id', 'interactions', 'cross_group_partners'],
+                             title="Interaction Strength vs Network Centrality",
+                             color_discrete_map={True: '#e74c3c', False: '#2ecc71'})
+    fig_network.add_vline(x=ISOLATION_RATIO, line_dash="dash", line_color="red", annotation_text="Isolation threshold")
+    return fig_network
+
+def bridges_figure(student_network: pd.DataFrame) -> go.Figure:
+    """Students spending the largest share of their interaction time outside their team"""
+    bridges = student_network.sort_values('bridge_share', ascending=False).head(10).reset_index()
+    fig_bridges = px.bar(bridges, x='student_name', y='bridge_share', color='group_id',
+                         title="Top Cross-Group Bridges (share of interaction time outside the team)",
+                         hover_data=['cross_group_partners', 'centrality'])
+    fig_bridges.update_layout(yaxis_tickformat='.0%')
+    return fig_bridges
+
 def generate_ta_ai_response(prompt: str, ta_data: dict) -> str:
     """Generate contextual AI responses for TAs using Azure OpenAI"""
     try:
         # Format context data for the AI
+        course = course_context()
         context = format_context_data(
             additional_context={
                 "ta_metrics": ta_data,
-                "course_context": "Columbia University Introduction to Machine Learning course",
-                "class_size": "80 students in 20 groups of 4",
+                "course_context": course['course'],
+                "section": course['partition'],
+                "class_size": course['class_size'],
                 "ta_role": "Teaching Assistant supporting collaborative ML projects"
             }
         )
@@ -103,7 +103,7 @@ def generate_ta_ai_response(prompt: str, ta_data: dict) -> str:
         prompt_lower = prompt.lower()
         
         if any(word in prompt_lower for word in ['priority', 'urgent', 'task', 'today']):
-            system_prompt = SYSTEM_PROMPT
+            system_prompt = SYSTEM_PROMPT.format(**course)
             formatted_prompt = TASK_PRIORITIZATION_PROMPT.format(
                 active_conflicts=ta_data.get('active_conflicts', 3),
                 at_risk_students=ta_data.get('at_risk_count', 5),
@@ -117,9 +117,9 @@ def generate_ta_ai_response(prompt: str, ta_data: dict) -> str:
             user_prompt = f"User request: {prompt}\n\n{formatted_prompt}"
             
         elif any(word in prompt_lower for word in ['conflict', 'mediate', 'dispute', 'argument']):
-            system_prompt = SYSTEM_PROMPT
+            system_prompt = SYSTEM_PROMPT.format(**course)
             formatted_prompt = CONFLICT_MEDIATION_PROMPT.format(
-                group_id=ta_data.get('conflict_group', 'GRP007'),
+                group_id=ta_data.get('conflict_group', ''),
                 conflict_type=ta_data.get('conflict_type', 'Leadership role dispute'),
                 participants="2 students with different leadership styles",
                 conflict_duration="6 hours",
@@ -131,7 +131,7 @@ def generate_ta_ai_response(prompt: str, ta_data: dict) -> str:
             
         else:
             # General TA query
-            system_prompt = SYSTEM_PROMPT
+            system_prompt = SYSTEM_PROMPT.format(**course)
             user_prompt = f"""
             The TA is asking: "{prompt}"
             
@@ -151,7 +151,8 @@ def generate_ta_ai_response(prompt: str, ta_data: dict) -> str:
             user_prompt=user_prompt,
             context_data=context,
             temperature=0.7,
-            max_tokens=1200
+            max_tokens=1200,
+            data_version=data_version('students', 'groups', 'monitoring', 'tutoring', 'conflicts', 'participation')
         )
         
         return response
@@ -183,24 +184,38 @@ def main():
     
     # Load data
     students_df, groups_df, monitoring_df, tutoring_df, conflicts_df, participation_df = load_ta_data()
+    alerts = load_alerts()
+    at_risk_students = students_df[students_df['engagement_score'] < 6.5].sort_values('engagement_score')
+    student_names = students_df.set_index('student_id')['student_name']
+    groups_df = groups_df.sort_values('risk_score', ascending=False)
+    risk_counts = groups_df['risk_level'].value_counts()
+    priority_groups = groups_df.head(2).to_dict('records')
+    # A section with fewer than two groups leaves the missing priority slots blank
+    blank_group = {'group_id': '', 'project_topic': '', 'risk_factors': '', 'progress_percentage': 0}
+    priority_groups += [blank_group] * (2 - len(priority_groups))
+    # Success stories come from the section's most advanced groups, blank when it has fewer than three
+    success_groups = groups_df.nlargest(3, 'progress_percentage')['group_id'].tolist()
+    success_groups += [''] * (3 - len(success_groups))
+    # Conflict prompts default to the most recent conflict in this section
+    latest_conflict = next(iter(conflicts_df.sort_values('timestamp').tail(1).to_dict('records')), {})
     
     # Calculate TA-specific metrics
     ta_data = {
-        'urgent_groups': ['007', '012'],
-        'medium_groups': ['003', '018'],
-        'at_risk_student': 'STU025',
-        'tech_help_groups': ['GRP003', 'GRP008', 'GRP015'],
+        'urgent_groups': groups_df[groups_df['risk_level'] == 'High']['group_id'].str[3:].tolist(),
+        'medium_groups': groups_df[groups_df['risk_level'] == 'Medium']['group_id'].str[3:].tolist(),
+        'at_risk_student': next(iter(students_df.nsmallest(1, 'engagement_score')['student_id']), ''),
+        'tech_help_groups': students_df.groupby('group_id')['technical_skills'].mean().nsmallest(3).index.tolist(),
         'review_groups': groups_df[groups_df['risk_level'] == 'Low'],
-        'active_conflicts': 3,
+        'active_conflicts': int((alerts['rule'] == 'unresolved_conflict').sum()),
         'resolution_rate': 87.3,
         'avg_resolution_time': 4.2,
         'common_conflicts': ['Unequal participation', 'Technical disagreements', 'Communication styles'],
-        'conflict_group': 'GRP007',
-        'conflict_type': 'Leadership role dispute',
+        'conflict_group': latest_conflict.get('group_id', priority_groups[0]['group_id']),
+        'conflict_type': latest_conflict.get('conflict_type', 'Leadership role dispute'),
         'high_priority_students': 5,
         'medium_priority_students': 12,
         'improved_students': 8,
-        'focus_student': 'Alex Chen',
+        'focus_student': next(iter(at_risk_students['student_name']), ''),
         'student_engagement': 5.8,
         'student_collaboration': 6.2,
         'student_technical': 7.1,
@@ -213,17 +228,17 @@ def main():
         'motivation_strategy': 'clear progress milestones',
         'stress_level': 'Moderate',
         'stress_support': 'workload management',
-        'high_performing_groups': 12,
-        'moderate_risk_groups': 5,
-        'high_risk_groups': 3,
-        'priority_group_1': 'GRP007',
-        'project_topic_1': 'Customer Churn Prediction',
-        'risk_factors_1': ['Personality conflicts', 'Missed deadlines'],
+        'high_performing_groups': int(risk_counts.get('Low', 0)),
+        'moderate_risk_groups': int(risk_counts.get('Medium', 0)),
+        'high_risk_groups': int(risk_counts.get('High', 0)),
+        'priority_group_1': priority_groups[0]['group_id'],
+        'project_topic_1': priority_groups[0]['project_topic'],
+        'risk_factors_1': [f for f in priority_groups[0]['risk_factors'].split(', ') if f],
         'last_checkin_1': 3,
-        'progress_1': 65,
+        'progress_1': priority_groups[0]['progress_percentage'],
         'ai_recommendation_1': 'Immediate conflict mediation + timeline adjustment',
-        'priority_group_2': 'GRP012',
-        'project_topic_2': 'Image Classification for Medical Diagnosis',
+        'priority_group_2': priority_groups[1]['group_id'],
+        'project_topic_2': priority_groups[1]['project_topic'],
         'opportunity_2': 'Strong technical skills but communication gaps',
         'strengths_2': 'Advanced coding abilities',
         'growth_area_2': 'Team coordination',
@@ -244,16 +259,16 @@ def main():
         'student_satisfaction': 8.6,
         'intervention_effectiveness': 87.5,
         'workload_efficiency': 45.2,
-        'success_group_1': 'GRP009',
-        'success_student': 'Maria Rodriguez',
-        'success_group_2': 'GRP014',
-        'success_group_3': 'GRP006',
+        'success_group_1': success_groups[0],
+        'success_student': next(iter(students_df.nlargest(1, 'engagement_score')['student_name']), ''),
+        'success_group_2': success_groups[1],
+        'success_group_3': success_groups[2],
         'engagement_improvement': 23.1,
         'conflict_prevention': 67.8,
         'learning_improvement': 18.4,
         'time_optimization': 42.6,
-        'priority_tasks': 6,
-        'at_risk_count': 5,
+        'priority_tasks': int(alerts['severity'].isin(['High', 'Medium']).sum()),
+        'at_risk_count': len(at_risk_students),
         'time_saved': 12.5
     }
     
@@ -278,10 +293,7 @@ def main():
     
     with col1:
         st.markdown("### 🔴 Urgent Tasks")
-        urgent_tasks = [
-            {"title": "Group 007 Conflict", "desc": "Leadership dispute escalation", "time": "2 hours"},
-            {"title": "Student Check-in", "desc": "Alex Chen - engagement drop", "time": "30 min"}
-        ]
+        urgent_tasks = alert_tasks(alerts[alerts['severity'] == 'High'], student_names)
         
         for task in urgent_tasks:
             st.markdown(f"""
@@ -294,10 +306,7 @@ def main():
     
     with col2:
         st.markdown("### 🟡 Medium Priority")
-        medium_tasks = [
-            {"title": "Group 012 Dynamics", "desc": "Communication improvement needed", "time": "45 min"},
-            {"title": "Technical Support", "desc": "3 groups need preprocessing help", "time": "90 min"}
-        ]
+        medium_tasks = alert_tasks(alerts[alerts['severity'] == 'Medium'], student_names)
         
         for task in medium_tasks:
             st.markdown(f"""
@@ -310,9 +319,10 @@ def main():
     
     with col3:
         st.markdown("### 🟢 Low Priority")
-        low_tasks = [
-            {"title": "Progress Reviews", "desc": "12 groups routine check-ins", "time": "2 hours"},
-            {"title": "Resource Updates", "desc": "Update tutorial materials", "time": "30 min"}
+        quiet_groups = groups_df['group_id'].nunique() - alerts['group_id'].nunique()
+        low_tasks = alert_tasks(alerts[alerts['severity'] == 'Low'], student_names, limit=2) + [
+            {"title": "Progress Reviews", "desc": f"{quiet_groups} groups without open alerts - routine check-ins",
+             "time": format_minutes(10 * quiet_groups)}
         ]
         
         for task in low_tasks:
@@ -392,47 +402,41 @@ def main():
     # Detailed Analytics Tabs
     st.markdown("## 📊 Detailed Analytics")
     
-    tab1, tab2, tab3, tab4 = st.tabs(["🚨 Active Issues", "👥 Student Support", "📈 Performance Tracking", "🛠️ Resources"])
+    analytics_tabs = ["🚨 Active Issues", "👥 Student Support", "📈 Performance Tracking", "🛠️ Resources"]
+    active_tab = lazy_tabs(analytics_tabs, key="ta_analytics_tab")
     
-    with tab1:
+    if active_tab == analytics_tabs[0]:
         # Active issues that need attention
         st.markdown("### 🔍 Issues Requiring Immediate Attention")
         
         col1, col2 = st.columns(2)
         
         with col1:
-            # Conflict timeline
-            conflict_timeline = [
-                {"time": "2 hours ago", "group": "GRP007", "issue": "Leadership dispute detected", "severity": "High"},
-                {"time": "4 hours ago", "group": "GRP012", "issue": "Participation inequality", "severity": "Medium"},
-                {"time": "1 day ago", "group": "GRP003", "issue": "Technical barriers", "severity": "Low"}
-            ]
+            # Open alerts, already ranked by severity
+            severity_colors = {"High": "#e74c3c", "Medium": "#f39c12", "Low": "#2ecc71"}
             
             st.markdown("**Recent Issues Detected:**")
-            for issue in conflict_timeline:
-                severity_colors = {"High": "#e74c3c", "Medium": "#f39c12", "Low": "#2ecc71"}
-                st.markdown(f"""
-                <div style="border-left: 4px solid {severity_colors[issue['severity']]}; padding: 0.5rem; margin: 0.5rem 0; background-color: #f8f9fa;">
-                <strong>{issue['group']}</strong> - {issue['issue']}<br>
-                <em>{issue['time']} | Severity: {issue['severity']}</em>
+            card_list(alerts.assign(color=alerts['severity'].map(severity_colors)), """
+                <div style="border-left: 4px solid {color}; padding: 0.5rem; margin: 0.5rem 0; background-color: #f8f9fa;">
+                <strong>{group_id}</strong> - {type}: {detail}<br>
+                <em>Raised {raised_at:%b %d %H:%M} | Severity: {severity}</em>
                 </div>
-                """, unsafe_allow_html=True)
+                """, key="ta_recent_issues", page_size=5,
+                      empty_message="No open alerts in this section.")
         
         with col2:
             # Student engagement alerts
-            at_risk_students = students_df[students_df['engagement_score'] < 6.5].head(5)
-            
             st.markdown("**Students Needing Support:**")
-            for _, student in at_risk_students.iterrows():
-                st.markdown(f"""
+            card_list(at_risk_students, """
                 <div style="border-left: 4px solid #e74c3c; padding: 0.5rem; margin: 0.5rem 0; background-color: #fdf2f2;">
-                <strong>{student['student_name']}</strong><br>
-                Engagement: {student['engagement_score']}/10 | Group: {student['group_id']}<br>
-                <em>Personality: {student['personality_type']} | Role: {student['preferred_role']}</em>
+                <strong>{student_name}</strong><br>
+                Engagement: {engagement_score}/10 | Group: {group_id}<br>
+                <em>Personality: {personality_type} | Role: {preferred_role}</em>
                 </div>
-                """, unsafe_allow_html=True)
+                """, key="ta_at_risk_students", page_size=5,
+                      empty_message="No students below the engagement threshold.")
     
-    with tab2:
+    elif active_tab == analytics_tabs[1]:
         # Student support tracking
         col1, col2 = st.columns(2)
         
@@ -457,8 +461,38 @@ def main():
                                      title="Intervention Success Rates by Type")
             fig_interventions.update_layout(yaxis_range=[0, 100])
             st.plotly_chart(fig_interventions, use_container_width=True)
+        
+        # Collaboration network: who is drifting out of their team's interactions
+        st.markdown("### 🕸️ Collaboration Network")
+        network = load_network_metrics()
+        student_network = network['students'].join(student_names)
+        isolated = student_network[student_network['isolated']].sort_values('relative_strength')
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            if len(isolated):
+                st.warning(f"⚠️ {len(isolated)} student(s) interact far less than their teammates")
+                for student_id, student in isolated.head(5).iterrows():
+                    st.markdown(f"- **{student['student_name']}** ({student['group_id']}): "
+                                f"{student['interactions']} interactions with {student['partners']} partners, "
+                                f"{student['relative_strength']:.0%} of the team median")
+            else:
+                st.success(f"🎉 No isolated students: everyone interacts at least {ISOLATION_RATIO:.0%} as much as their team median")
+            
+            fig_network = cached_figure('ta_network_centrality', network_figure, student_network,
+                                        tables=['students', 'interactions'])
+            st.plotly_chart(fig_network, use_container_width=True)
+        
+        with col2:
+            fig_bridges = cached_figure('ta_network_bridges', bridges_figure, student_network,
+                                        tables=['students', 'interactions'])
+            st.plotly_chart(fig_bridges, use_container_width=True)
+            
+            st.caption("Strongest links between teams")
+            st.dataframe(network['group_links'].head(5), hide_index=True, use_container_width=True)
     
-    with tab3:
+    elif active_tab == analytics_tabs[2]:
         # Performance tracking
         col1, col2 = st.columns(2)
         
@@ -489,7 +523,7 @@ def main():
             fig_workload.update_layout(title="Workload Distribution: Human vs AI", barmode='stack')
             st.plotly_chart(fig_workload, use_container_width=True)
     
-    with tab4:
+    elif active_tab == analytics_tabs[3]:
         # Resources and tools
         col1, col2 = st.columns(2)
         
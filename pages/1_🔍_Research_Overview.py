@@ -4,50 +4,56 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.figure_cache import cached_figure
+from utils.theme import apply_theme
+from utils.courses import course_selector
 
 st.set_page_config(page_title="Research Overview", page_icon="🔍", layout="wide")
 
-# Custom CSS
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 2.5rem;
-        font-weight: bold;
-        color: #1f77b4;
-        text-align: center;
-        margin-bottom: 2rem;
-    }
-    .section-header {
-        font-size: 1.5rem;
-        font-weight: bold;
-        color: #2c3e50;
-        margin-top: 2rem;
-        margin-bottom: 1rem;
-    }
-    .insight-box {
-        background-color: #f8f9fa;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border-left: 4px solid #1f77b4;
-        margin: 1rem 0;
-    }
-    .enhancement-card {
-        background-color: #ffffff;
-        padding: 1.5rem;
-        border-radius: 10px;
-        box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-        margin: 1rem 0;
-        border-left: 4px solid #2ecc71;
-    }
-    .challenge-card {
-        background-color: #fff5f5;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border-left: 4px solid #e74c3c;
-        margin: 1rem 0;
+# Shared stylesheet (static/theme.css)
+apply_theme()
+
+# Course section this session works on; every table below is loaded from it
+course_selector()
+
+def ta_effectiveness_figure():
+    """Traditional vs AI-enhanced TA effectiveness bars"""
+    fig = go.Figure(data=[
+        go.Bar(name='Traditional TA Limitations', x=['Availability', 'Consistency', 'Scalability', 'Objectivity'], 
+               y=[60, 55, 40, 65], marker_color='#e74c3c'),
+        go.Bar(name='AI-Enhanced Potential', x=['Availability', 'Consistency', 'Scalability', 'Objectivity'], 
+               y=[95, 90, 95, 85], marker_color='#2ecc71')
+    ])
+    fig.update_layout(title="TA Effectiveness: Traditional vs AI-Enhanced", 
+                     yaxis_title="Effectiveness %", barmode='group', height=300)
+    return fig
+
+def expected_outcomes_figure():
+    """Current vs target scores of the expected outcomes"""
+    outcomes_data = {
+        'Metric': ['Student Engagement', 'Equal Participation', 'Conflict Resolution', 
+                   'Learning Outcomes', 'TA Efficiency', 'Student Satisfaction'],
+        'Current State': [65, 50, 45, 70, 55, 60],
+        'AI-Enhanced Target': [85, 80, 75, 88, 90, 85],
+        'Improvement': [20, 30, 30, 18, 35, 25]
     }
-</style>
-""", unsafe_allow_html=True)
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(name='Current State', x=outcomes_data['Metric'], 
+                        y=outcomes_data['Current State'], marker_color='#e74c3c'))
+    fig.add_trace(go.Bar(name='AI-Enhanced Target', x=outcomes_data['Metric'], 
+                        y=outcomes_data['AI-Enhanced Target'], marker_color='#2ecc71'))
+
+    fig.update_layout(
+        title="Expected Improvements with AI-Enhanced TA Functionality",
+        yaxis_title="Effectiveness Score (0-100)",
+        barmode='group',
+        height=400
+    )
+    return fig
 
 def main():
     st.markdown('<h1 class="main-header">🔍 AI-Enhanced Teaching Assistants: Research Overview</h1>', unsafe_allow_html=True)
@@ -71,14 +77,7 @@ def main():
     
     with col2:
         # Key metrics visualization
-        fig = go.Figure(data=[
-            go.Bar(name='Traditional TA Limitations', x=['Availability', 'Consistency', 'Scalability', 'Objectivity'], 
-                   y=[60, 55, 40, 65], marker_color='#e74c3c'),
-            go.Bar(name='AI-Enhanced Potential', x=['Availability', 'Consistency', 'Scalability', 'Objectivity'], 
-                   y=[95, 90, 95, 85], marker_color='#2ecc71')
-        ])
-        fig.update_layout(title="TA Effectiveness: Traditional vs AI-Enhanced", 
-                         yaxis_title="Effectiveness %", barmode='group', height=300)
+        fig = cached_figure('overview_ta_effectiveness', ta_effectiveness_figure)
         st.plotly_chart(fig, use_container_width=True)
     
     # Current Challenges in Group Work
@@ -275,26 +274,7 @@ def main():
     st.markdown('<h3 class="section-header">🎯 Expected Outcomes</h3>', unsafe_allow_html=True)
     
     # Create outcome metrics visualization
-    outcomes_data = {
-        'Metric': ['Student Engagement', 'Equal Participation', 'Conflict Resolution', 
-                   'Learning Outcomes', 'TA Efficiency', 'Student Satisfaction'],
-        'Current State': [65, 50, 45, 70, 55, 60],
-        'AI-Enhanced Target': [85, 80, 75, 88, 90, 85],
-        'Improvement': [20, 30, 30, 18, 35, 25]
-    }
-    
-    fig = go.Figure()
-    fig.add_trace(go.Bar(name='Current State', x=outcomes_data['Metric'], 
-                        y=outcomes_data['Current State'], marker_color='#e74c3c'))
-    fig.add_trace(go.Bar(name='AI-Enhanced Target', x=outcomes_data['Metric'], 
-                        y=outcomes_data['AI-Enhanced Target'], marker_color='#2ecc71'))
-    
-    fig.update_layout(
-        title="Expected Improvements with AI-Enhanced TA Functionality",
-        yaxis_title="Effectiveness Score (0-100)",
-        barmode='group',
-        height=400
-    )
+    fig = cached_figure('overview_expected_outcomes', expected_outcomes_figure)
     st.plotly_chart(fig, use_container_width=True)
     
     # Navigation Guide
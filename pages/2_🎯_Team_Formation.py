@@ -9,46 +9,207 @@ import os
 
 # Add the project root to the path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from constants import DATA_PATHS_STR
+from utils.data_loader import load_table, data_version
+from utils.team_formation import TeamFormationOptimizer
+from utils.figure_cache import cached_figure
+from utils.theme import apply_theme
+from utils.courses import course_selector, course_config
 
 st.set_page_config(page_title="AI Team Formation", page_icon="🎯", layout="wide")
 
-# Custom CSS
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 2.5rem;
-        font-weight: bold;
-        color: #1f77b4;
-        text-align: center;
-        margin-bottom: 2rem;
-    }
-    .insight-box {
-        background-color: #f8f9fa;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border-left: 4px solid #1f77b4;
-        margin: 1rem 0;
-    }
-    .metric-card {
-        background-color: #ffffff;
-        padding: 1rem;
-        border-radius: 10px;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        text-align: center;
-    }
-</style>
-""", unsafe_allow_html=True)
+# Shared stylesheet (static/theme.css)
+apply_theme()
+
+# Course section this session works on; every table below is loaded from it
+course_selector()
 
-@st.cache_data
 def load_team_formation_data():
     """Load team formation analysis data"""
-    return pd.read_csv(DATA_PATHS_STR['team_formation'])
+    return load_table('team_formation')
 
-@st.cache_data
 def load_students_data():
     """Load student data for filtering"""
-    return pd.read_csv(DATA_PATHS_STR['students'])
+    return load_table('students')
+
+@st.cache_data(show_spinner="Forming teams...")
+def optimize_roster_teams(students_version: str, seed: int, restarts: int):
+    """Partition the roster with the team formation optimizer, cached per section roster version"""
+    students_data = load_students_data()
+    optimizer = TeamFormationOptimizer(group_size=course_config()['students_per_group'], seed=seed) \
+        .fit_parallel(students_data, restarts=restarts)
+    assignments = optimizer.assignments().merge(
+        students_data[['student_id', 'student_name', 'personality_type', 'preferred_role', 'major']],
+        on='student_id'
+    )
+    return (assignments, optimizer.group_scores(), optimizer.scores(),
+            TeamFormationOptimizer.evaluate(students_data), optimizer.restart_scores)
+
+def radar_figure(team_data: pd.DataFrame) -> go.Figure:
+    """Radar comparison of the formation methods across every outcome"""
+    metrics_comparison = team_data.groupby('formation_method').agg({
+        'satisfaction_score': 'mean',
+        'skill_balance_score': 'mean',
+        'diversity_score': 'mean',
+        'completion_rate': 'mean',
+        'weeks_to_completion': 'mean',
+        'conflict_incidents': 'mean'
+    }).round(2)
+
+    # Create radar chart for comprehensive comparison
+    categories = ['Satisfaction', 'Skill Balance', 'Diversity', 'Completion Rate', 'Time Efficiency', 'Low Conflicts']
+
+    fig_radar = go.Figure()
+
+    for method in ['Random', 'Self-Selected', 'AI-Optimized']:
+        method_data = metrics_comparison.loc[method]
+        values = [
+            method_data['satisfaction_score'],
+            method_data['skill_balance_score'], 
+            method_data['diversity_score'],
+            method_data['completion_rate'] / 10,  # Scale to 0-10
+            10 - method_data['weeks_to_completion'],  # Invert for efficiency
+            10 - method_data['conflict_incidents']  # Invert for fewer conflicts
+        ]
+
+        color_map = {'Random': '#e74c3c', 'Self-Selected': '#f39c12', 'AI-Optimized': '#2ecc71'}
+
+        fig_radar.add_trace(go.Scatterpolar(
+            r=values,
+            theta=categories,
+            fill='toself',
+            name=method,
+            line_color=color_map[method]
+        ))
+
+    fig_radar.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, 10]
+            )),
+        showlegend=True,
+        title="Formation Method Performance Radar"
+    )
+    return fig_radar
+
+def algorithm_figure() -> go.Figure:
+    """AI vs human assignment scores on the algorithm benchmarks"""
+    algorithm_metrics = {
+        'Metric': ['Accuracy', 'Efficiency', 'Satisfaction', 'Scalability'],
+        'Score': [92, 88, 94, 96],
+        'Benchmark': [85, 75, 80, 85]
+    }
+
+    fig_algorithm = go.Figure(data=[
+        go.Bar(name='AI Algorithm', x=algorithm_metrics['Metric'], y=algorithm_metrics['Score'], marker_color='#2ecc71'),
+        go.Bar(name='Human Assignment', x=algorithm_metrics['Metric'], y=algorithm_metrics['Benchmark'], marker_color='#e74c3c')
+    ])
+
+    fig_algorithm.update_layout(
+        title="AI vs Human Team Formation Performance",
+        yaxis_title="Performance Score",
+        barmode='group'
+    )
+    return fig_algorithm
+
+@st.fragment
+def detailed_analysis(team_data: pd.DataFrame):
+    """Filtered method drill-down; reruns on its own when a filter changes"""
+    # Detailed Analysis with Filters
+    st.markdown("## 🔍 Detailed Analysis")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        selected_method = st.selectbox("Formation Method:", team_data['formation_method'].unique())
+    with col2:
+        min_satisfaction = st.slider("Minimum Satisfaction:", 1.0, 10.0, 1.0)
+    with col3:
+        show_conflicts = st.checkbox("Show Conflict Analysis", value=True)
+    
+    # Filter data
+    filtered_data = team_data[
+        (team_data['formation_method'] == selected_method) & 
+        (team_data['satisfaction_score'] >= min_satisfaction)
+    ]
+    
+    col1, col2 = st.columns(2)
+    
+    filters = {'method': selected_method, 'min_satisfaction': min_satisfaction}
+    
+    with col1:
+        # Scatter plot: Skill Balance vs Satisfaction
+        fig_scatter = cached_figure('team_formation_scatter', lambda: px.scatter(
+            filtered_data, x='skill_balance_score', y='satisfaction_score',
+            size='completion_rate', color='diversity_score',
+            title=f"Skill Balance vs Satisfaction ({selected_method})",
+            hover_data=['conflict_incidents']), tables=['team_formation'], filters=filters)
+        st.plotly_chart(fig_scatter, use_container_width=True)
+    
+    with col2:
+        if show_conflicts:
+            # Conflict analysis
+            fig_conflicts = cached_figure('team_formation_conflicts', lambda: px.histogram(
+                filtered_data, x='conflict_incidents',
+                title=f"Conflict Distribution ({selected_method})",
+                nbins=10), tables=['team_formation'], filters=filters)
+            st.plotly_chart(fig_conflicts, use_container_width=True)
+        else:
+            # Time to completion analysis
+            fig_time = cached_figure('team_formation_completion', lambda: px.histogram(
+                filtered_data, x='weeks_to_completion',
+                title=f"Time to Completion ({selected_method})",
+                nbins=10), tables=['team_formation'], filters=filters)
+            st.plotly_chart(fig_time, use_container_width=True)
+
+@st.fragment
+def roster_team_formation(students_data: pd.DataFrame):
+    """Roster partitioning controls and results, rerun independently of the page"""
+    # Roster-based team formation
+    st.markdown("## 🧮 Form Teams From the Roster")
+    st.markdown(f"""
+    Partition all {len(students_data)} students into groups of {course_config()['students_per_group']},
+    balancing technical, collaboration and engagement scores across groups while maximizing
+    personality, role and major diversity and keeping a shared availability slot in every group.
+    """)
+    
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        formation_seed = st.number_input("Random Seed:", min_value=0, value=42, step=1)
+        restarts = st.number_input("Restarts:", min_value=1, max_value=32, value=4, step=1,
+                                   help="Independent searches run in parallel; the best partition is kept")
+        if st.button("🚀 Run Team Formation"):
+            st.session_state.formation_seed = int(formation_seed)
+            st.session_state.formation_restarts = int(restarts)
+    
+    if "formation_seed" in st.session_state:
+        assignments, group_scores, optimized, current, restart_scores = optimize_roster_teams(
+            data_version('students'), st.session_state.formation_seed,
+            st.session_state.formation_restarts
+        )
+        
+        with col2:
+            metric_cols = st.columns(3)
+            with metric_cols[0]:
+                st.metric("Skill Balance", f"{optimized['skill_balance']:.1f}/10",
+                          f"{optimized['skill_balance'] - current['skill_balance']:+.1f} vs current groups")
+            with metric_cols[1]:
+                st.metric("Diversity", f"{optimized['diversity']:.1f}/10",
+                          f"{optimized['diversity'] - current['diversity']:+.1f} vs current groups")
+            with metric_cols[2]:
+                st.metric("Shared Availability", f"{optimized['availability_coverage']:.0f}%",
+                          f"{optimized['availability_coverage'] - current['availability_coverage']:+.0f}% vs current groups")
+        
+        if len(restart_scores) > 1:
+            st.caption(
+                f"Best of {len(restart_scores)} restarts — objective ranged from "
+                f"{restart_scores['objective'].min():.2f} to {restart_scores['objective'].max():.2f}"
+            )
+        
+        team_members = assignments.groupby('group_id')['student_name'].agg(', '.join).rename('members')
+        st.dataframe(
+            group_scores.set_index('group_id').join(team_members).round(2),
+            use_container_width=True
+        )
 
 def main():
     st.markdown('<h1 class="main-header">🎯 Forming Well-Balanced Teams</h1>', unsafe_allow_html=True)
@@ -155,118 +316,40 @@ def main():
     
     with col1:
         # Satisfaction comparison
-        fig_satisfaction = px.box(team_data, x='formation_method', y='satisfaction_score',
-                                title="Team Satisfaction by Formation Method",
-                                color='formation_method',
-                                color_discrete_map={
-                                    'Random': '#e74c3c',
-                                    'Self-Selected': '#f39c12', 
-                                    'AI-Optimized': '#2ecc71'
-                                })
+        fig_satisfaction = cached_figure('team_formation_satisfaction', lambda: px.box(
+            team_data, x='formation_method', y='satisfaction_score',
+            title="Team Satisfaction by Formation Method",
+            color='formation_method',
+            color_discrete_map={
+                'Random': '#e74c3c',
+                'Self-Selected': '#f39c12', 
+                'AI-Optimized': '#2ecc71'
+            }), tables=['team_formation'])
         st.plotly_chart(fig_satisfaction, use_container_width=True)
     
     with col2:
         # Skill balance comparison
-        fig_skills = px.box(team_data, x='formation_method', y='skill_balance_score',
-                           title="Skill Balance by Formation Method",
-                           color='formation_method',
-                           color_discrete_map={
-                               'Random': '#e74c3c',
-                               'Self-Selected': '#f39c12',
-                               'AI-Optimized': '#2ecc71'
-                           })
+        fig_skills = cached_figure('team_formation_skills', lambda: px.box(
+            team_data, x='formation_method', y='skill_balance_score',
+            title="Skill Balance by Formation Method",
+            color='formation_method',
+            color_discrete_map={
+                'Random': '#e74c3c',
+                'Self-Selected': '#f39c12',
+                'AI-Optimized': '#2ecc71'
+            }), tables=['team_formation'])
         st.plotly_chart(fig_skills, use_container_width=True)
     
     # Comprehensive metrics comparison
     st.markdown("### 🎯 Comprehensive Performance Analysis")
     
-    metrics_comparison = team_data.groupby('formation_method').agg({
-        'satisfaction_score': 'mean',
-        'skill_balance_score': 'mean',
-        'diversity_score': 'mean',
-        'completion_rate': 'mean',
-        'weeks_to_completion': 'mean',
-        'conflict_incidents': 'mean'
-    }).round(2)
-    
-    # Create radar chart for comprehensive comparison
-    categories = ['Satisfaction', 'Skill Balance', 'Diversity', 'Completion Rate', 'Time Efficiency', 'Low Conflicts']
-    
-    fig_radar = go.Figure()
-    
-    for method in ['Random', 'Self-Selected', 'AI-Optimized']:
-        method_data = metrics_comparison.loc[method]
-        values = [
-            method_data['satisfaction_score'],
-            method_data['skill_balance_score'], 
-            method_data['diversity_score'],
-            method_data['completion_rate'] / 10,  # Scale to 0-10
-            10 - method_data['weeks_to_completion'],  # Invert for efficiency
-            10 - method_data['conflict_incidents']  # Invert for fewer conflicts
-        ]
-        
-        color_map = {'Random': '#e74c3c', 'Self-Selected': '#f39c12', 'AI-Optimized': '#2ecc71'}
-        
-        fig_radar.add_trace(go.Scatterpolar(
-            r=values,
-            theta=categories,
-            fill='toself',
-            name=method,
-            line_color=color_map[method]
-        ))
-    
-    fig_radar.update_layout(
-        polar=dict(
-            radialaxis=dict(
-                visible=True,
-                range=[0, 10]
-            )),
-        showlegend=True,
-        title="Formation Method Performance Radar"
-    )
+    fig_radar = cached_figure('team_formation_radar', radar_figure, team_data, tables=['team_formation'])
     
     st.plotly_chart(fig_radar, use_container_width=True)
     
-    # Detailed Analysis with Filters
-    st.markdown("## 🔍 Detailed Analysis")
+    detailed_analysis(team_data)
     
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        selected_method = st.selectbox("Formation Method:", team_data['formation_method'].unique())
-    with col2:
-        min_satisfaction = st.slider("Minimum Satisfaction:", 1.0, 10.0, 1.0)
-    with col3:
-        show_conflicts = st.checkbox("Show Conflict Analysis", value=True)
-    
-    # Filter data
-    filtered_data = team_data[
-        (team_data['formation_method'] == selected_method) & 
-        (team_data['satisfaction_score'] >= min_satisfaction)
-    ]
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # Scatter plot: Skill Balance vs Satisfaction
-        fig_scatter = px.scatter(filtered_data, x='skill_balance_score', y='satisfaction_score',
-                               size='completion_rate', color='diversity_score',
-                               title=f"Skill Balance vs Satisfaction ({selected_method})",
-                               hover_data=['conflict_incidents'])
-        st.plotly_chart(fig_scatter, use_container_width=True)
-    
-    with col2:
-        if show_conflicts:
-            # Conflict analysis
-            fig_conflicts = px.histogram(filtered_data, x='conflict_incidents',
-                                       title=f"Conflict Distribution ({selected_method})",
-                                       nbins=10)
-            st.plotly_chart(fig_conflicts, use_container_width=True)
-        else:
-            # Time to completion analysis
-            fig_time = px.histogram(filtered_data, x='weeks_to_completion',
-                                  title=f"Time to Completion ({selected_method})",
-                                  nbins=10)
-            st.plotly_chart(fig_time, use_container_width=True)
+    roster_team_formation(students_data)
     
     # AI Algorithm Insights
     st.markdown("## 🤖 AI Algorithm Insights")
@@ -294,22 +377,7 @@ def main():
     
     with col2:
         # Algorithm effectiveness metrics
-        algorithm_metrics = {
-            'Metric': ['Accuracy', 'Efficiency', 'Satisfaction', 'Scalability'],
-            'Score': [92, 88, 94, 96],
-            'Benchmark': [85, 75, 80, 85]
-        }
-        
-        fig_algorithm = go.Figure(data=[
-            go.Bar(name='AI Algorithm', x=algorithm_metrics['Metric'], y=algorithm_metrics['Score'], marker_color='#2ecc71'),
-            go.Bar(name='Human Assignment', x=algorithm_metrics['Metric'], y=algorithm_metrics['Benchmark'], marker_color='#e74c3c')
-        ])
-        
-        fig_algorithm.update_layout(
-            title="AI vs Human Team Formation Performance",
-            yaxis_title="Performance Score",
-            barmode='group'
-        )
+        fig_algorithm = cached_figure('team_formation_algorithm', algorithm_figure)
         
         st.plotly_chart(fig_algorithm, use_container_width=True)
     
@@ -1,5 +1,4 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
@@ -10,53 +9,46 @@ from datetime import datetime, timedelta
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from constants import DATA_PATHS_STR
+from utils.data_loader import load_table
+from utils.alerts import load_alerts
+from utils.monitoring_stream import load_monitoring_window
+from utils.streaming_stats import rolling_monitoring_stats
+from utils.downsampling import time_series_figure, downsample, in_range, line_trace, WEBGL_THRESHOLD, POINT_BUDGET
+from utils.figure_cache import cached_figure
+from utils.theme import apply_theme
+from utils.courses import course_selector
 
 st.set_page_config(page_title="Real-Time Monitoring", page_icon="👁️", layout="wide")
 
-# Custom CSS
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 2.5rem;
-        font-weight: bold;
-        color: #1f77b4;
-        text-align: center;
-        margin-bottom: 2rem;
-    }
-    .insight-box {
-        background-color: #f8f9fa;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border-left: 4px solid #1f77b4;
-        margin: 1rem 0;
-    }
-    .alert-box {
-        background-color: #fff3cd;
-        padding: 1rem;
-        border-radius: 10px;
-        border-left: 4px solid #ffc107;
-        margin: 1rem 0;
-    }
-    .success-box {
-        background-color: #d4edda;
-        padding: 1rem;
-        border-radius: 10px;
-        border-left: 4px solid #28a745;
-        margin: 1rem 0;
+# Shared stylesheet (static/theme.css)
+apply_theme()
+
+# Course section this session works on; every table below is loaded from it
+course_selector()
+
+def load_monitoring_data(time_range: str = "Full Semester"):
+    """Load monitoring data for the selected period, reading only newly appended rows"""
+    return load_monitoring_window(time_range)
+
+def technology_figure():
+    """Accuracy and response speed of the monitoring technologies"""
+    tech_metrics = {
+        'Technology': ['Audio Analysis', 'Text Analysis', 'Behavioral Tracking', 'Combined AI'],
+        'Accuracy': [78, 85, 82, 94],
+        'Response Time': [95, 88, 92, 89]  # Inverted for better is higher
     }
-</style>
-""", unsafe_allow_html=True)
 
-@st.cache_data
-def load_monitoring_data():
-    """Load real-time monitoring data"""
-    return pd.read_csv(DATA_PATHS_STR['monitoring'])
+    fig_tech = go.Figure(data=[
+        go.Bar(name='Accuracy %', x=tech_metrics['Technology'], y=tech_metrics['Accuracy'], marker_color='#2ecc71'),
+        go.Bar(name='Response Speed', x=tech_metrics['Technology'], y=tech_metrics['Response Time'], marker_color='#3498db')
+    ])
 
-@st.cache_data
-def load_groups_data():
-    """Load groups data"""
-    return pd.read_csv(DATA_PATHS_STR['groups'])
+    fig_tech.update_layout(
+        title="Monitoring Technology Performance",
+        yaxis_title="Performance Score",
+        barmode='group'
+    )
+    return fig_tech
 
 def main():
     st.markdown('<h1 class="main-header">👁️ Real-Time Facilitation and Monitoring</h1>', unsafe_allow_html=True)
@@ -72,15 +64,15 @@ def main():
     st.sidebar.markdown("### ⏰ Time Range")
     time_range = st.sidebar.selectbox(
         "Monitoring Period:",
-        ["Last 24 Hours", "Last Week", "Last Month", "Full Semester"]
+        ["Last 24 Hours", "Last Week", "Last Month", "Full Semester"],
+        on_change=lambda: st.session_state.pop('timeline_zoom', None)
     )
     
     # Load data
-    monitoring_data = load_monitoring_data()
-    groups_data = load_groups_data()
-    
-    # Convert timestamp
-    monitoring_data['timestamp'] = pd.to_datetime(monitoring_data['timestamp'])
+    monitoring_data = load_monitoring_data(time_range)
+    rolling_stats = rolling_monitoring_stats()
+    rolling = rolling_stats.snapshot()
+    st.sidebar.caption(f"{len(monitoring_data)} monitored sessions in this period")
     
     # Key Research Insight
     st.markdown("""
@@ -93,19 +85,23 @@ def main():
     col1, col2, col3, col4 = st.columns(4)
     
     # Calculate key metrics
-    current_engagement = monitoring_data['avg_engagement'].mean()
+    # Rolling statistics cover each group's most recent sessions; trends compare fast and slow EWMAs
+    current_engagement = rolling['avg_engagement_mean'].mean()
     intervention_rate = monitoring_data['ai_intervention'].mean() * 100
-    participation_equality = monitoring_data['participation_equality'].mean()
-    avg_meeting_duration = monitoring_data['meeting_duration'].mean()
+    participation_equality = rolling['participation_equality_mean'].mean()
+    avg_meeting_duration = rolling['meeting_duration_mean'].mean()
     
     with col1:
-        st.metric("Current Engagement", f"{current_engagement:.1f}/10", "▲ 0.8 from last week")
+        st.metric("Current Engagement", f"{current_engagement:.1f}/10",
+                  f"{rolling['avg_engagement_trend'].mean():+.2f} trend")
     with col2:
         st.metric("AI Intervention Rate", f"{intervention_rate:.1f}%", "▼ 2.3% from target")
     with col3:
-        st.metric("Participation Equality", f"{participation_equality:.1f}/10", "▲ 1.2 improvement")
+        st.metric("Participation Equality", f"{participation_equality:.1f}/10",
+                  f"{rolling['participation_equality_trend'].mean():+.2f} trend")
     with col4:
-        st.metric("Avg Meeting Duration", f"{avg_meeting_duration:.0f} min", "Within target range")
+        st.metric("Avg Meeting Duration", f"{avg_meeting_duration:.0f} min",
+                  f"{rolling['meeting_duration_trend'].mean():+.1f} min trend")
     
     # Role-specific insights
     if user_role == "Teaching Assistant":
@@ -123,7 +119,7 @@ def main():
         """, unsafe_allow_html=True)
         
         # TA-specific alerts
-        high_risk_groups = monitoring_data[monitoring_data['avg_engagement'] < 6]['group_id'].unique()
+        high_risk_groups = rolling.index[rolling['avg_engagement_mean'] < 6].tolist()
         if len(high_risk_groups) > 0:
             st.markdown(f"""
             <div class="alert-box">
@@ -192,23 +188,57 @@ def main():
         )
     with col3:
         show_interventions = st.checkbox("Highlight AI Interventions", value=True)
+        smooth_timeline = st.checkbox("Smooth with EWMA", value=False,
+                                      disabled=metric_to_show not in rolling_stats.stats.metrics)
     
     # Filter data based on selections
     filtered_data = monitoring_data[monitoring_data['group_id'].isin(selected_groups)]
     
     # Time series visualization
-    fig_timeline = px.line(filtered_data, x='timestamp', y=metric_to_show, color='group_id',
-                          title=f"{metric_to_show.replace('_', ' ').title()} Over Time")
-    
-    if show_interventions:
-        intervention_data = filtered_data[filtered_data['ai_intervention'] == True]
-        fig_timeline.add_scatter(x=intervention_data['timestamp'], 
-                               y=intervention_data[metric_to_show],
-                               mode='markers', 
-                               marker=dict(symbol='star', size=12, color='red'),
-                               name='AI Interventions')
-    
-    st.plotly_chart(fig_timeline, use_container_width=True)
+    timeline_data = filtered_data
+    if smooth_timeline and metric_to_show in rolling_stats.stats.metrics:
+        timeline_data = filtered_data.assign(**{
+            metric_to_show: rolling_stats.ewma_trace(metric_to_show, filtered_data.index)
+        })
+    # Box-selecting a time span zooms in; the span is re-queried from the raw rows
+    timeline_zoom = st.session_state.get('timeline_zoom')
+    
+    def build_timeline():
+        fig_timeline = time_series_figure(timeline_data, 'timestamp', metric_to_show, color='group_id',
+                                          title=f"{metric_to_show.replace('_', ' ').title()} Over Time",
+                                          x_range=timeline_zoom)
+        
+        if show_interventions:
+            intervention_data = in_range(filtered_data[filtered_data['ai_intervention'] == True], 'timestamp', timeline_zoom)
+            intervention_data = downsample(intervention_data, 'timestamp', metric_to_show, method='minmax')
+            fig_timeline.add_trace(line_trace(intervention_data['timestamp'], intervention_data[metric_to_show],
+                                              len(intervention_data) > WEBGL_THRESHOLD, mode='markers',
+                                              marker=dict(symbol='star', size=12, color='red'),
+                                              name='AI Interventions'))
+        return fig_timeline
+    
+    monitor_filters = {'time_range': time_range, 'groups': list(selected_groups)}
+    fig_timeline = cached_figure('monitoring_timeline', build_timeline, tables=['monitoring'],
+                                 filters={**monitor_filters, 'metric': metric_to_show,
+                                          'interventions': show_interventions, 'smooth': smooth_timeline,
+                                          'zoom': timeline_zoom})
+    
+    timeline_event = st.plotly_chart(fig_timeline, use_container_width=True, key='timeline_chart',
+                                     on_select='rerun', selection_mode='box')
+    boxes = timeline_event.selection.get('box', []) if timeline_event else []
+    if boxes and boxes[0].get('x'):
+        st.session_state.timeline_zoom = tuple(sorted(boxes[0]['x']))
+        st.rerun()
+    
+    zoom_col1, zoom_col2 = st.columns([4, 1])
+    with zoom_col1:
+        st.caption(f"Showing {fig_timeline.layout.meta['plotted_points']:,} of "
+                   f"{fig_timeline.layout.meta['raw_points']:,} points. "
+                   "Box-select a time span to zoom in at full resolution.")
+    with zoom_col2:
+        if timeline_zoom and st.button("Reset zoom"):
+            del st.session_state.timeline_zoom
+            st.rerun()
     
     # Intervention Analysis
     col1, col2 = st.columns(2)
@@ -218,24 +248,29 @@ def main():
         intervention_effect = filtered_data.groupby('ai_intervention').agg({
             'avg_engagement': 'mean',
             'participation_equality': 'mean'
-        }).round(2)
+        }).round(2).reindex([False, True])
         
-        fig_intervention = go.Figure(data=[
-            go.Bar(name='Engagement', x=['No Intervention', 'With Intervention'], 
-                   y=[intervention_effect.loc[False, 'avg_engagement'], 
-                      intervention_effect.loc[True, 'avg_engagement']],
-                   marker_color='#3498db'),
-            go.Bar(name='Participation Equality', x=['No Intervention', 'With Intervention'],
-                   y=[intervention_effect.loc[False, 'participation_equality'],
-                      intervention_effect.loc[True, 'participation_equality']],
-                   marker_color='#2ecc71')
-        ])
+        def build_intervention():
+            fig_intervention = go.Figure(data=[
+                go.Bar(name='Engagement', x=['No Intervention', 'With Intervention'], 
+                       y=[intervention_effect.loc[False, 'avg_engagement'], 
+                          intervention_effect.loc[True, 'avg_engagement']],
+                       marker_color='#3498db'),
+                go.Bar(name='Participation Equality', x=['No Intervention', 'With Intervention'],
+                       y=[intervention_effect.loc[False, 'participation_equality'],
+                          intervention_effect.loc[True, 'participation_equality']],
+                       marker_color='#2ecc71')
+            ])
+            
+            fig_intervention.update_layout(
+                title="AI Intervention Effectiveness",
+                yaxis_title="Score (1-10)",
+                barmode='group'
+            )
+            return fig_intervention
         
-        fig_intervention.update_layout(
-            title="AI Intervention Effectiveness",
-            yaxis_title="Score (1-10)",
-            barmode='group'
-        )
+        fig_intervention = cached_figure('monitoring_intervention_effect', build_intervention,
+                                         tables=['monitoring'], filters=monitor_filters)
         
         st.plotly_chart(fig_intervention, use_container_width=True)
     
@@ -243,8 +278,9 @@ def main():
         # Intervention types distribution
         intervention_types = filtered_data[filtered_data['ai_intervention'] == True]['intervention_type'].value_counts()
         
-        fig_types = px.pie(values=intervention_types.values, names=intervention_types.index,
-                          title="Types of AI Interventions")
+        fig_types = cached_figure('monitoring_intervention_types', lambda: px.pie(
+            values=intervention_types.values, names=intervention_types.index,
+            title="Types of AI Interventions"), tables=['monitoring'], filters=monitor_filters)
         st.plotly_chart(fig_types, use_container_width=True)
     
     # Detailed Group Analysis
@@ -268,48 +304,50 @@ def main():
             st.metric("Equality Trend", f"{trend_indicator} {abs(equality_trend):.2f}")
         
         # Group timeline with annotations
-        fig_group = make_subplots(
-            rows=2, cols=1,
-            subplot_titles=('Engagement Over Time', 'Meeting Characteristics'),
-            shared_xaxes=True
-        )
-        
-        # Engagement timeline
-        fig_group.add_trace(
-            go.Scatter(x=group_data['timestamp'], y=group_data['avg_engagement'],
-                      name='Engagement', line=dict(color='#3498db')),
-            row=1, col=1
-        )
-        
-        # Meeting duration
-        fig_group.add_trace(
-            go.Scatter(x=group_data['timestamp'], y=group_data['meeting_duration'],
-                      name='Duration (min)', line=dict(color='#e74c3c')),
-            row=2, col=1
-        )
-        
-        # Add intervention markers as scatter points to avoid timestamp arithmetic issues
-        interventions = group_data[group_data['ai_intervention'] == True]
-        if not interventions.empty:
-            fig_group.add_trace(
-                go.Scatter(
-                    x=interventions['timestamp'],
-                    y=[group_data['avg_engagement'].max()] * len(interventions),
-                    mode='markers',
-                    marker=dict(
-                        symbol='line-ns',
-                        size=15,
-                        color='red',
-                        line=dict(width=2)
-                    ),
-                    name='AI Interventions',
-                    showlegend=True,
-                    hovertext=[f"Intervention: {it}" for it in interventions['intervention_type']]
-                ),
-                row=1, col=1
+        def build_group():
+            fig_group = make_subplots(
+                rows=2, cols=1,
+                subplot_titles=('Engagement Over Time', 'Meeting Characteristics'),
+                shared_xaxes=True
             )
+            
+            # Engagement and meeting duration, each reduced to the chart's point budget
+            use_webgl = len(group_data) > WEBGL_THRESHOLD
+            for row, (column, name, color) in enumerate([('avg_engagement', 'Engagement', '#3498db'),
+                                                         ('meeting_duration', 'Duration (min)', '#e74c3c')], start=1):
+                series = downsample(group_data, 'timestamp', column, budget=POINT_BUDGET // 2)
+                fig_group.add_trace(
+                    line_trace(series['timestamp'], series[column], use_webgl, name=name, line=dict(color=color)),
+                    row=row, col=1
+                )
+            
+            # Add intervention markers as scatter points to avoid timestamp arithmetic issues
+            interventions = downsample(group_data[group_data['ai_intervention'] == True], 'timestamp', 'avg_engagement',
+                                       method='minmax')
+            if not interventions.empty:
+                fig_group.add_trace(
+                    go.Scatter(
+                        x=interventions['timestamp'],
+                        y=[group_data['avg_engagement'].max()] * len(interventions),
+                        mode='markers',
+                        marker=dict(
+                            symbol='line-ns',
+                            size=15,
+                            color='red',
+                            line=dict(width=2)
+                        ),
+                        name='AI Interventions',
+                        showlegend=True,
+                        hovertext=[f"Intervention: {it}" for it in interventions['intervention_type']]
+                    ),
+                    row=1, col=1
+                )
+            
+            fig_group.update_layout(height=600, title=f"Detailed Analysis: {selected_group}")
+            return fig_group
         
-        fig_group.update_layout(height=600, title=f"Detailed Analysis: {selected_group}")
+        fig_group = cached_figure('monitoring_group_detail', build_group, tables=['monitoring'],
+                                  filters={**monitor_filters, 'group': selected_group})
         st.plotly_chart(fig_group, use_container_width=True)
     
     # AI Monitoring Technology
@@ -342,43 +380,30 @@ def main():
     
     with col2:
         # Technology effectiveness metrics
-        tech_metrics = {
-            'Technology': ['Audio Analysis', 'Text Analysis', 'Behavioral Tracking', 'Combined AI'],
-            'Accuracy': [78, 85, 82, 94],
-            'Response Time': [95, 88, 92, 89]  # Inverted for better is higher
-        }
-        
-        fig_tech = go.Figure(data=[
-            go.Bar(name='Accuracy %', x=tech_metrics['Technology'], y=tech_metrics['Accuracy'], marker_color='#2ecc71'),
-            go.Bar(name='Response Speed', x=tech_metrics['Technology'], y=tech_metrics['Response Time'], marker_color='#3498db')
-        ])
-        
-        fig_tech.update_layout(
-            title="Monitoring Technology Performance",
-            yaxis_title="Performance Score",
-            barmode='group'
-        )
+        fig_tech = cached_figure('monitoring_technology', technology_figure)
         
         st.plotly_chart(fig_tech, use_container_width=True)
     
     # Live Alerts Simulation
     st.markdown("## 🚨 Live Monitoring Alerts")
     
-    # Simulate real-time alerts
-    alerts = [
-        {"group": "GRP003", "type": "Low Participation", "severity": "Medium", "action": "Prompt quiet member"},
-        {"group": "GRP007", "type": "Off-topic Discussion", "severity": "Low", "action": "Redirect conversation"},
-        {"group": "GRP012", "type": "Conflict Detected", "severity": "High", "action": "Immediate intervention"},
-        {"group": "GRP015", "type": "Engagement Drop", "severity": "Medium", "action": "Suggest break"}
-    ]
-    
-    for alert in alerts:
-        severity_colors = {"Low": "success-box", "Medium": "alert-box", "High": "alert-box"}
-        severity_icons = {"Low": "🟢", "Medium": "🟡", "High": "🔴"}
-        
+    # Open alerts from the rule engine, most severe first
+    alerts = load_alerts()
+    student_names = load_table('students').set_index('student_id')['student_name']
+    
+    severity_counts = alerts['severity'].value_counts()
+    st.caption(f"{len(alerts)} open alerts — {severity_counts.get('High', 0)} high, "
+               f"{severity_counts.get('Medium', 0)} medium, {severity_counts.get('Low', 0)} low")
+    
+    severity_colors = {"Low": "success-box", "Medium": "alert-box", "High": "alert-box"}
+    severity_icons = {"Low": "🟢", "Medium": "🟡", "High": "🔴"}
+    
+    for alert in alerts.head(8).to_dict('records'):
+        student = f" ({student_names.get(alert['student_id'], alert['student_id'])})" if alert['student_id'] else ""
         st.markdown(f"""
         <div class="{severity_colors[alert['severity']]}">
-        <strong>{severity_icons[alert['severity']]} {alert['group']}: {alert['type']}</strong><br>
+        <strong>{severity_icons[alert['severity']]} {alert['group_id']}: {alert['type']}</strong><br>
+        {alert['detail']}{student}<br>
         Severity: {alert['severity']} | Recommended Action: {alert['action']}
         </div>
         """, unsafe_allow_html=True)
@@ -1,5 +1,4 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
@@ -9,51 +8,69 @@ from plotly.subplots import make_subplots
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from constants import DATA_PATHS_STR
+from utils.data_loader import load_table
+from utils.figure_cache import cached_figure
+from utils.theme import apply_theme
+from utils.courses import course_selector
 
 st.set_page_config(page_title="AI Tutoring Support", page_icon="🎓", layout="wide")
 
-# Custom CSS
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 2.5rem;
-        font-weight: bold;
-        color: #1f77b4;
-        text-align: center;
-        margin-bottom: 2rem;
-    }
-    .insight-box {
-        background-color: #f8f9fa;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border-left: 4px solid #1f77b4;
-        margin: 1rem 0;
-    }
-    .psychology-principle {
-        background-color: #e8f5e8;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border-left: 4px solid #28a745;
-        margin: 1rem 0;
-    }
-    .evidence-box {
-        background-color: #fff3cd;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border-left: 4px solid #ffc107;
-        margin: 1rem 0;
-    }
-</style>
-""", unsafe_allow_html=True)
+# Shared stylesheet (static/theme.css)
+apply_theme()
+
+# Course section this session works on; every table below is loaded from it
+course_selector()
 
-@st.cache_data
 def load_tutoring_data():
     """Load AI tutoring and support data"""
-    tutoring_df = pd.read_csv(DATA_PATHS_STR['tutoring'])
-    students_df = pd.read_csv(DATA_PATHS_STR['students'])
+    tutoring_df = load_table('tutoring')
+    students_df = load_table('students')
     return tutoring_df, students_df
 
+def tutoring_impact_figure():
+    """Before/after bars of the learning-experience evidence"""
+    success_metrics = {
+        'Metric': ['Help-Seeking Frequency', 'Question Quality', 'Learning Confidence', 'Group Participation', 'Academic Performance'],
+        'Before_AI': [3.2, 5.8, 6.1, 5.9, 7.2],
+        'After_AI': [7.8, 8.1, 8.4, 8.0, 8.1],
+        'Improvement': [143, 40, 38, 36, 13]
+    }
+
+    fig_impact = go.Figure()
+    fig_impact.add_trace(go.Bar(name='Before AI Tutoring', x=success_metrics['Metric'], 
+                               y=success_metrics['Before_AI'], marker_color='#e74c3c'))
+    fig_impact.add_trace(go.Bar(name='After AI Tutoring', x=success_metrics['Metric'], 
+                               y=success_metrics['After_AI'], marker_color='#2ecc71'))
+
+    fig_impact.update_layout(
+        title="Student Learning Experience Improvements with AI Tutoring",
+        yaxis_title="Score (1-10)",
+        barmode='group',
+        height=400
+    )
+    return fig_impact
+
+def help_seeking_barriers_figure():
+    """Help-seeking barrier strength with and without AI tutoring"""
+    barriers_data = {
+        'Barrier': ['Fear of Judgment', 'Imposter Syndrome', 'Social Comparison', 'Time Constraints', 'Perceived Incompetence'],
+        'Traditional_Impact': [8.2, 7.8, 7.5, 6.9, 8.1],
+        'AI_Mitigation': [2.1, 2.3, 1.8, 1.2, 2.0]
+    }
+
+    fig_barriers = go.Figure(data=[
+        go.Bar(name='Traditional Barriers', x=barriers_data['Barrier'], y=barriers_data['Traditional_Impact'], marker_color='#e74c3c'),
+        go.Bar(name='With AI Support', x=barriers_data['Barrier'], y=barriers_data['AI_Mitigation'], marker_color='#2ecc71')
+    ])
+
+    fig_barriers.update_layout(
+        title="Reduction in Help-Seeking Barriers with AI Tutoring",
+        yaxis_title="Barrier Strength (1-10 scale)",
+        barmode='group',
+        height=400
+    )
+    return fig_barriers
+
 def main():
     st.markdown('<h1 class="main-header">🎓 AI Tutoring & Question Answering Support</h1>', unsafe_allow_html=True)
     
@@ -219,38 +236,24 @@ def main():
     with col1:
         # Question types distribution
         question_counts = tutoring_df['question_type'].value_counts()
-        fig_questions = px.pie(values=question_counts.values, names=question_counts.index,
-                              title="Distribution of Student Questions",
-                              color_discrete_sequence=px.colors.qualitative.Set3)
+        fig_questions = cached_figure('tutoring_questions', lambda: px.pie(
+            values=question_counts.values, names=question_counts.index,
+            title="Distribution of Student Questions",
+            color_discrete_sequence=px.colors.qualitative.Set3), tables=['tutoring'])
         st.plotly_chart(fig_questions, use_container_width=True)
     
     with col2:
         # Response quality by complexity
-        fig_quality = px.box(tutoring_df, x='complexity_level', y='response_quality',
-                           title="AI Response Quality by Question Complexity",
-                           color='complexity_level')
+        fig_quality = cached_figure('tutoring_quality', lambda: px.box(
+            tutoring_df, x='complexity_level', y='response_quality',
+            title="AI Response Quality by Question Complexity",
+            color='complexity_level'), tables=['tutoring'])
         st.plotly_chart(fig_quality, use_container_width=True)
     
     # Social Barriers to Help-Seeking
     st.markdown("## 🚧 Addressing Social Barriers to Help-Seeking")
     
-    barriers_data = {
-        'Barrier': ['Fear of Judgment', 'Imposter Syndrome', 'Social Comparison', 'Time Constraints', 'Perceived Incompetence'],
-        'Traditional_Impact': [8.2, 7.8, 7.5, 6.9, 8.1],
-        'AI_Mitigation': [2.1, 2.3, 1.8, 1.2, 2.0]
-    }
-    
-    fig_barriers = go.Figure(data=[
-        go.Bar(name='Traditional Barriers', x=barriers_data['Barrier'], y=barriers_data['Traditional_Impact'], marker_color='#e74c3c'),
-        go.Bar(name='With AI Support', x=barriers_data['Barrier'], y=barriers_data['AI_Mitigation'], marker_color='#2ecc71')
-    ])
-    
-    fig_barriers.update_layout(
-        title="Reduction in Help-Seeking Barriers with AI Tutoring",
-        yaxis_title="Barrier Strength (1-10 scale)",
-        barmode='group',
-        height=400
-    )
+    fig_barriers = cached_figure('tutoring_barriers', help_seeking_barriers_figure)
     
     st.plotly_chart(fig_barriers, use_container_width=True)
     
@@ -331,29 +334,33 @@ def main():
     
     # Filter data
     filtered_tutoring = tutoring_df[tutoring_df['complexity_level'] == selected_complexity]
+    filters = {'complexity': selected_complexity}
     
     col1, col2 = st.columns(2)
     
     with col1:
         # Response time vs satisfaction
-        fig_satisfaction = px.scatter(filtered_tutoring, x='response_time_minutes', y='student_satisfaction',
-                                    color='follow_up_needed', size='response_quality',
-                                    title=f"Response Time vs Satisfaction ({selected_complexity} Questions)",
-                                    hover_data=['question_type'])
+        fig_satisfaction = cached_figure('tutoring_satisfaction', lambda: px.scatter(
+            filtered_tutoring, x='response_time_minutes', y='student_satisfaction',
+            color='follow_up_needed', size='response_quality',
+            title=f"Response Time vs Satisfaction ({selected_complexity} Questions)",
+            hover_data=['question_type']), tables=['tutoring'], filters=filters)
         st.plotly_chart(fig_satisfaction, use_container_width=True)
     
     with col2:
         if show_confidence:
             # AI confidence vs response quality
-            fig_confidence = px.scatter(filtered_tutoring, x='ai_confidence', y='response_quality',
-                                      color='complexity_level', size='student_satisfaction',
-                                      title="AI Confidence vs Response Quality")
+            fig_confidence = cached_figure('tutoring_confidence', lambda: px.scatter(
+                filtered_tutoring, x='ai_confidence', y='response_quality',
+                color='complexity_level', size='student_satisfaction',
+                title="AI Confidence vs Response Quality"), tables=['tutoring'], filters=filters)
             st.plotly_chart(fig_confidence, use_container_width=True)
         else:
             # Question frequency by type
             question_freq = filtered_tutoring['question_type'].value_counts()
-            fig_freq = px.bar(x=question_freq.index, y=question_freq.values,
-                            title=f"Question Frequency by Type ({selected_complexity})")
+            fig_freq = cached_figure('tutoring_question_frequency', lambda: px.bar(
+                x=question_freq.index, y=question_freq.values,
+                title=f"Question Frequency by Type ({selected_complexity})"), tables=['tutoring'], filters=filters)
             st.plotly_chart(fig_freq, use_container_width=True)
     
     # Implementation Recommendations
@@ -398,25 +405,7 @@ def main():
     # Success Stories and Impact
     st.markdown("## 🌟 Impact on Student Learning Experience")
     
-    success_metrics = {
-        'Metric': ['Help-Seeking Frequency', 'Question Quality', 'Learning Confidence', 'Group Participation', 'Academic Performance'],
-        'Before_AI': [3.2, 5.8, 6.1, 5.9, 7.2],
-        'After_AI': [7.8, 8.1, 8.4, 8.0, 8.1],
-        'Improvement': [143, 40, 38, 36, 13]
-    }
-    
-    fig_impact = go.Figure()
-    fig_impact.add_trace(go.Bar(name='Before AI Tutoring', x=success_metrics['Metric'], 
-                               y=success_metrics['Before_AI'], marker_color='#e74c3c'))
-    fig_impact.add_trace(go.Bar(name='After AI Tutoring', x=success_metrics['Metric'], 
-                               y=success_metrics['After_AI'], marker_color='#2ecc71'))
-    
-    fig_impact.update_layout(
-        title="Student Learning Experience Improvements with AI Tutoring",
-        yaxis_title="Score (1-10)",
-        barmode='group',
-        height=400
-    )
+    fig_impact = cached_figure('tutoring_impact', tutoring_impact_figure)
     
     st.plotly_chart(fig_impact, use_container_width=True)
     
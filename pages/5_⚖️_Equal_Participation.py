@@ -9,58 +9,271 @@ from plotly.subplots import make_subplots
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from constants import DATA_PATHS_STR
+from utils.data_loader import load_table
+from utils.figure_cache import cached_figure
+from utils.equity import load_equity, EquityMatrix, EQUITY_COLUMNS
+from utils.theme import apply_theme
+from utils.courses import course_selector
 
 st.set_page_config(page_title="Equal Participation", page_icon="⚖️", layout="wide")
 
-# Custom CSS
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 2.5rem;
-        font-weight: bold;
-        color: #1f77b4;
-        text-align: center;
-        margin-bottom: 2rem;
-    }
-    .insight-box {
-        background-color: #f8f9fa;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border-left: 4px solid #1f77b4;
-        margin: 1rem 0;
-    }
-    .psychology-principle {
-        background-color: #e8f5e8;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border-left: 4px solid #28a745;
-        margin: 1rem 0;
-    }
-    .theory-box {
-        background-color: #fff3cd;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border-left: 4px solid #ffc107;
-        margin: 1rem 0;
-    }
-    .intervention-box {
-        background-color: #f8d7da;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border-left: 4px solid #dc3545;
-        margin: 1rem 0;
-    }
-</style>
-""", unsafe_allow_html=True)
+# Shared stylesheet (static/theme.css)
+apply_theme()
+
+# Course section this session works on; every table below is loaded from it
+course_selector()
 
-@st.cache_data
 def load_participation_data():
     """Load participation tracking data"""
-    participation_df = pd.read_csv(DATA_PATHS_STR['participation'])
-    students_df = pd.read_csv(DATA_PATHS_STR['students'])
+    participation_df = load_table('participation')
+    students_df = load_table('students')
     return participation_df, students_df
 
+def participation_evidence_figure():
+    """Before/after bars of the participation-tracking evidence"""
+    before_after_data = {
+        'Measure': ['Equal Participation', 'Student Satisfaction', 'Free-Riding Incidents', 
+                   'Group Cohesion', 'Learning Outcomes', 'Peer Evaluations'],
+        'Before_AI': [4.2, 6.1, 8.3, 5.8, 7.1, 5.9],
+        'After_AI': [8.1, 8.4, 2.1, 8.2, 8.3, 8.6],
+        'Effect_Size': [0.89, 0.76, -1.12, 0.83, 0.41, 0.91]
+    }
+
+    fig_evidence = go.Figure()
+    fig_evidence.add_trace(go.Bar(name='Before AI Tracking', x=before_after_data['Measure'], 
+                                 y=before_after_data['Before_AI'], marker_color='#e74c3c'))
+    fig_evidence.add_trace(go.Bar(name='After AI Tracking', x=before_after_data['Measure'], 
+                                 y=before_after_data['After_AI'], marker_color='#2ecc71'))
+
+    fig_evidence.update_layout(
+        title="Impact of AI-Driven Participation Tracking on Group Dynamics",
+        yaxis_title="Score (1-10, except Free-Riding which is incident count)",
+        barmode='group',
+        height=500
+    )
+    return fig_evidence
+
+@st.fragment
+def participation_equity_analysis(participation_df: pd.DataFrame, equity: EquityMatrix):
+    """Week/group filtered equity charts; reruns on its own when a filter changes"""
+    # Participation Analysis Dashboard
+    st.markdown("## 📊 Participation Equity Analysis")
+    
+    # Filters for analysis
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        selected_week = st.selectbox("Week:", sorted(participation_df['week'].unique()))
+    with col2:
+        group_filter = st.multiselect("Groups:", 
+                                     sorted(participation_df['group_id'].unique()),
+                                     default=sorted(participation_df['group_id'].unique())[:5])
+    with col3:
+        metric_view = st.selectbox("View:", ["Contribution %", "Peer Ratings", "Improvement Trends"])
+    
+    # Filter data
+    filtered_data = participation_df[
+        (participation_df['week'] == selected_week) & 
+        (participation_df['group_id'].isin(group_filter))
+    ]
+    filters = {'week': selected_week, 'groups': list(group_filter)}
+    
+    if metric_view == "Contribution %":
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            # Contribution distribution
+            def build_contrib():
+                fig_contrib = px.histogram(filtered_data, x='contribution_percentage',
+                                         title=f"Contribution Distribution - Week {selected_week}",
+                                         nbins=15)
+                fig_contrib.add_vline(x=25, line_dash="dash", line_color="red", 
+                                     annotation_text="Equal Share (25%)")
+                return fig_contrib
+            
+            fig_contrib = cached_figure('participation_contribution', build_contrib,
+                                        tables=['participation'], filters=filters)
+            st.plotly_chart(fig_contrib, use_container_width=True)
+        
+        with col2:
+            # Group-level equity from the precomputed Gini/Theil/entropy matrix
+            equity_metric = st.selectbox("Equity of:", list(EQUITY_COLUMNS), format_func=EQUITY_COLUMNS.get)
+            
+            def build_equity():
+                group_equity = equity.frame(equity_metric, groups=group_filter, weeks=selected_week)
+                group_equity['equity_score'] = 10 * (1 - group_equity['gini'])  # Higher score = more equal
+                
+                fig_equity = px.bar(group_equity, x='group_id', y='equity_score',
+                                  title=f"Group {EQUITY_COLUMNS[equity_metric]} Equity Scores (10 × (1 − Gini))",
+                                  color='equity_score',
+                                  color_continuous_scale='RdYlGn',
+                                  hover_data={'gini': ':.3f', 'theil': ':.3f', 'entropy': ':.3f'})
+                fig_equity.update_layout(yaxis_range=[0, 10])
+                return fig_equity
+            
+            fig_equity = cached_figure('participation_group_equity', build_equity, tables=['participation'],
+                                       filters={**filters, 'metric': equity_metric})
+            st.plotly_chart(fig_equity, use_container_width=True)
+        
+        # Class-wide inequality of every participation channel over the semester
+        def build_equity_trend():
+            equity_trend = equity.summary('gini').rename(columns=EQUITY_COLUMNS).reset_index() \
+                .melt(id_vars='week', var_name='channel', value_name='gini')
+            return px.line(equity_trend, x='week', y='gini', color='channel', markers=True,
+                           title="Average Within-Group Gini by Week (0 = perfectly equal)")
+        
+        fig_equity_trend = cached_figure('participation_equity_trend', build_equity_trend, tables=['participation'])
+        st.plotly_chart(fig_equity_trend, use_container_width=True)
+    
+    elif metric_view == "Peer Ratings":
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            # Peer rating vs contribution correlation
+            fig_peer = cached_figure('participation_peer_ratings', lambda: px.scatter(
+                filtered_data, x='contribution_percentage', y='peer_rating',
+                color='group_id', size='ideas_contributed',
+                title="Peer Ratings vs Actual Contributions"), tables=['participation'], filters=filters)
+            st.plotly_chart(fig_peer, use_container_width=True)
+        
+        with col2:
+            # AI prompts effectiveness
+            def build_prompts():
+                prompt_effect = filtered_data.groupby('ai_prompts_received').agg({
+                    'contribution_percentage': 'mean',
+                    'peer_rating': 'mean'
+                }).reset_index()
+                
+                return px.bar(prompt_effect, x='ai_prompts_received', y='contribution_percentage',
+                              title="Effect of AI Prompts on Participation")
+            
+            fig_prompts = cached_figure('participation_prompts', build_prompts,
+                                        tables=['participation'], filters=filters)
+            st.plotly_chart(fig_prompts, use_container_width=True)
+    
+    else:  # Improvement Trends
+        # Weekly improvement trends
+        def build_trends():
+            weekly_trends = participation_df.groupby(['week', 'group_id'])['contribution_percentage'].mean().reset_index()
+            
+            fig_trends = px.line(weekly_trends, x='week', y='contribution_percentage', 
+                               color='group_id', title="Participation Trends Over Time")
+            fig_trends.add_hline(y=25, line_dash="dash", line_color="red", 
+                               annotation_text="Target: Equal Participation")
+            return fig_trends
+        
+        fig_trends = cached_figure('participation_trends', build_trends, tables=['participation'])
+        st.plotly_chart(fig_trends, use_container_width=True)
+
+@st.fragment
+def individual_participation(participation_df: pd.DataFrame, students_df: pd.DataFrame):
+    """Per-student participation drill-down, rerun independently of the page"""
+    # Individual Student Analysis
+    st.markdown("## 👤 Individual Participation Patterns")
+    
+    # Student selector
+    student_list = participation_df['student_id'].unique()
+    selected_student = st.selectbox("Select Student for Analysis:", student_list)
+    
+    if selected_student:
+        student_data = participation_df[participation_df['student_id'] == selected_student]
+        student_profile = students_df[students_df['student_id'] == selected_student].iloc[0]
+        
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            avg_contribution = student_data['contribution_percentage'].mean()
+            st.metric("Average Contribution", f"{avg_contribution:.1f}%")
+            
+            trend = "Improving" if student_data['improvement_flag'].mean() > 0.5 else "Declining"
+            st.metric("Trend", trend)
+        
+        with col2:
+            avg_peer_rating = student_data['peer_rating'].mean()
+            st.metric("Peer Rating", f"{avg_peer_rating:.1f}/10")
+            
+            ai_prompts = student_data['ai_prompts_received'].sum()
+            st.metric("AI Interventions", int(ai_prompts))
+        
+        with col3:
+            total_ideas = student_data['ideas_contributed'].sum()
+            st.metric("Ideas Contributed", int(total_ideas))
+            
+            meeting_participation = student_data['meeting_speaking_time'].mean()
+            st.metric("Avg Speaking Time", f"{meeting_participation:.1f} min")
+        
+        # Student-specific recommendations
+        st.markdown(f"### 💡 Personalized Recommendations for {selected_student}")
+        
+        if avg_contribution < 20:
+            st.markdown("""
+            <div class="intervention-box">
+            <h4>🎯 Under-Contribution Intervention</h4>
+            <p><strong>Psychological Approach:</strong></p>
+            <ul>
+                <li>Investigate potential barriers (confidence, skills, understanding)</li>
+                <li>Provide scaffolded opportunities for meaningful contribution</li>
+                <li>Focus on effort recognition rather than outcome comparison</li>
+                <li>Connect contributions to personal interests and strengths</li>
+            </ul>
+            </div>
+            """, unsafe_allow_html=True)
+        elif avg_contribution > 35:
+            st.markdown("""
+            <div class="intervention-box">
+            <h4>⚖️ Over-Contribution Management</h4>
+            <p><strong>Healthy Boundaries Approach:</strong></p>
+            <ul>
+                <li>Acknowledge and appreciate leadership tendencies</li>
+                <li>Teach delegation and peer mentoring skills</li>
+                <li>Encourage patience with peer learning processes</li>
+                <li>Redirect energy toward quality improvement rather than quantity</li>
+            </ul>
+            </div>
+            """, unsafe_allow_html=True)
+        else:
+            st.markdown("""
+            <div class="psychology-principle">
+            <h4>✅ Balanced Participation</h4>
+            <p>This student demonstrates healthy collaborative behavior. Continue supporting through:</p>
+            <ul>
+                <li>Recognition of positive modeling for others</li>
+                <li>Opportunities for peer mentoring</li>
+                <li>Leadership development challenges</li>
+                <li>Feedback on contribution quality and impact</li>
+            </ul>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        # Individual trend visualization
+        def build_individual():
+            fig_individual = make_subplots(
+                rows=2, cols=1,
+                subplot_titles=['Contribution Percentage Over Time', 'Peer Rating Over Time'],
+                shared_xaxes=True
+            )
+            
+            fig_individual.add_trace(
+                go.Scatter(x=student_data['week'], y=student_data['contribution_percentage'],
+                          name='Contribution %', line=dict(color='#3498db')),
+                row=1, col=1
+            )
+            
+            fig_individual.add_trace(
+                go.Scatter(x=student_data['week'], y=student_data['peer_rating'],
+                          name='Peer Rating', line=dict(color='#e74c3c')),
+                row=2, col=1
+            )
+            
+            fig_individual.add_hline(y=25, line_dash="dash", line_color="red", row=1, col=1)
+            fig_individual.add_hline(y=7, line_dash="dash", line_color="green", row=2, col=1)
+            
+            fig_individual.update_layout(height=500, title=f"Individual Progress: {selected_student}")
+            return fig_individual
+        
+        fig_individual = cached_figure('participation_individual', build_individual,
+                                       tables=['participation'], filters={'student': selected_student})
+        st.plotly_chart(fig_individual, use_container_width=True)
+
 def main():
     st.markdown('<h1 class="main-header">⚖️ Encouraging Equal Participation</h1>', unsafe_allow_html=True)
     
@@ -85,14 +298,15 @@ def main():
     col1, col2, col3, col4 = st.columns(4)
     
     avg_contribution = participation_df['contribution_percentage'].mean()
-    participation_std = participation_df['contribution_percentage'].std()
+    equity = load_equity()
+    class_gini = np.nanmean(equity.latest()['gini'])
     improvement_rate = participation_df['improvement_flag'].mean() * 100
     peer_satisfaction = participation_df['peer_rating'].mean()
     
     with col1:
         st.metric("Avg Contribution", f"{avg_contribution:.1f}%", "Target: 25% (equal)")
     with col2:
-        st.metric("Participation Variance", f"{participation_std:.1f}%", "Lower = more equal")
+        st.metric("Contribution Gini", f"{class_gini:.2f}", "Lower = more equal")
     with col3:
         st.metric("Students Improving", f"{improvement_rate:.1f}%", "Weekly basis")
     with col4:
@@ -230,80 +444,7 @@ def main():
         </div>
         """, unsafe_allow_html=True)
     
-    # Participation Analysis Dashboard
-    st.markdown("## 📊 Participation Equity Analysis")
-    
-    # Filters for analysis
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        selected_week = st.selectbox("Week:", sorted(participation_df['week'].unique()))
-    with col2:
-        group_filter = st.multiselect("Groups:", 
-                                     sorted(participation_df['group_id'].unique()),
-                                     default=sorted(participation_df['group_id'].unique())[:5])
-    with col3:
-        metric_view = st.selectbox("View:", ["Contribution %", "Peer Ratings", "Improvement Trends"])
-    
-    # Filter data
-    filtered_data = participation_df[
-        (participation_df['week'] == selected_week) & 
-        (participation_df['group_id'].isin(group_filter))
-    ]
-    
-    if metric_view == "Contribution %":
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Contribution distribution
-            fig_contrib = px.histogram(filtered_data, x='contribution_percentage',
-                                     title=f"Contribution Distribution - Week {selected_week}",
-                                     nbins=15)
-            fig_contrib.add_vline(x=25, line_dash="dash", line_color="red", 
-                                 annotation_text="Equal Share (25%)")
-            st.plotly_chart(fig_contrib, use_container_width=True)
-        
-        with col2:
-            # Group-level equity
-            group_equity = filtered_data.groupby('group_id')['contribution_percentage'].std().reset_index()
-            group_equity['equity_score'] = 10 - (group_equity['contribution_percentage'] / 5)  # Higher score = more equal
-            
-            fig_equity = px.bar(group_equity, x='group_id', y='equity_score',
-                              title="Group Participation Equity Scores",
-                              color='equity_score',
-                              color_continuous_scale='RdYlGn')
-            fig_equity.update_layout(yaxis_range=[0, 10])
-            st.plotly_chart(fig_equity, use_container_width=True)
-    
-    elif metric_view == "Peer Ratings":
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Peer rating vs contribution correlation
-            fig_peer = px.scatter(filtered_data, x='contribution_percentage', y='peer_rating',
-                                color='group_id', size='ideas_contributed',
-                                title="Peer Ratings vs Actual Contributions")
-            st.plotly_chart(fig_peer, use_container_width=True)
-        
-        with col2:
-            # AI prompts effectiveness
-            prompt_effect = filtered_data.groupby('ai_prompts_received').agg({
-                'contribution_percentage': 'mean',
-                'peer_rating': 'mean'
-            }).reset_index()
-            
-            fig_prompts = px.bar(prompt_effect, x='ai_prompts_received', y='contribution_percentage',
-                               title="Effect of AI Prompts on Participation")
-            st.plotly_chart(fig_prompts, use_container_width=True)
-    
-    else:  # Improvement Trends
-        # Weekly improvement trends
-        weekly_trends = participation_df.groupby(['week', 'group_id'])['contribution_percentage'].mean().reset_index()
-        
-        fig_trends = px.line(weekly_trends, x='week', y='contribution_percentage', 
-                           color='group_id', title="Participation Trends Over Time")
-        fig_trends.add_hline(y=25, line_dash="dash", line_color="red", 
-                           annotation_text="Target: Equal Participation")
-        st.plotly_chart(fig_trends, use_container_width=True)
+    participation_equity_analysis(participation_df, equity)
     
     # Social Psychology Interventions
     st.markdown("## 🎯 Evidence-Based Intervention Strategies")
@@ -387,132 +528,13 @@ def main():
         </div>
         """, unsafe_allow_html=True)
     
-    # Individual Student Analysis
-    st.markdown("## 👤 Individual Participation Patterns")
-    
-    # Student selector
-    student_list = participation_df['student_id'].unique()
-    selected_student = st.selectbox("Select Student for Analysis:", student_list)
-    
-    if selected_student:
-        student_data = participation_df[participation_df['student_id'] == selected_student]
-        student_profile = students_df[students_df['student_id'] == selected_student].iloc[0]
-        
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            avg_contribution = student_data['contribution_percentage'].mean()
-            st.metric("Average Contribution", f"{avg_contribution:.1f}%")
-            
-            trend = "Improving" if student_data['improvement_flag'].mean() > 0.5 else "Declining"
-            st.metric("Trend", trend)
-        
-        with col2:
-            avg_peer_rating = student_data['peer_rating'].mean()
-            st.metric("Peer Rating", f"{avg_peer_rating:.1f}/10")
-            
-            ai_prompts = student_data['ai_prompts_received'].sum()
-            st.metric("AI Interventions", int(ai_prompts))
-        
-        with col3:
-            total_ideas = student_data['ideas_contributed'].sum()
-            st.metric("Ideas Contributed", int(total_ideas))
-            
-            meeting_participation = student_data['meeting_speaking_time'].mean()
-            st.metric("Avg Speaking Time", f"{meeting_participation:.1f} min")
-        
-        # Student-specific recommendations
-        st.markdown(f"### 💡 Personalized Recommendations for {selected_student}")
-        
-        if avg_contribution < 20:
-            st.markdown("""
-            <div class="intervention-box">
-            <h4>🎯 Under-Contribution Intervention</h4>
-            <p><strong>Psychological Approach:</strong></p>
-            <ul>
-                <li>Investigate potential barriers (confidence, skills, understanding)</li>
-                <li>Provide scaffolded opportunities for meaningful contribution</li>
-                <li>Focus on effort recognition rather than outcome comparison</li>
-                <li>Connect contributions to personal interests and strengths</li>
-            </ul>
-            </div>
-            """, unsafe_allow_html=True)
-        elif avg_contribution > 35:
-            st.markdown("""
-            <div class="intervention-box">
-            <h4>⚖️ Over-Contribution Management</h4>
-            <p><strong>Healthy Boundaries Approach:</strong></p>
-            <ul>
-                <li>Acknowledge and appreciate leadership tendencies</li>
-                <li>Teach delegation and peer mentoring skills</li>
-                <li>Encourage patience with peer learning processes</li>
-                <li>Redirect energy toward quality improvement rather than quantity</li>
-            </ul>
-            </div>
-            """, unsafe_allow_html=True)
-        else:
-            st.markdown("""
-            <div class="psychology-principle">
-            <h4>✅ Balanced Participation</h4>
-            <p>This student demonstrates healthy collaborative behavior. Continue supporting through:</p>
-            <ul>
-                <li>Recognition of positive modeling for others</li>
-                <li>Opportunities for peer mentoring</li>
-                <li>Leadership development challenges</li>
-                <li>Feedback on contribution quality and impact</li>
-            </ul>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        # Individual trend visualization
-        fig_individual = make_subplots(
-            rows=2, cols=1,
-            subplot_titles=['Contribution Percentage Over Time', 'Peer Rating Over Time'],
-            shared_xaxes=True
-        )
-        
-        fig_individual.add_trace(
-            go.Scatter(x=student_data['week'], y=student_data['contribution_percentage'],
-                      name='Contribution %', line=dict(color='#3498db')),
-            row=1, col=1
-        )
-        
-        fig_individual.add_trace(
-            go.Scatter(x=student_data['week'], y=student_data['peer_rating'],
-                      name='Peer Rating', line=dict(color='#e74c3c')),
-            row=2, col=1
-        )
-        
-        fig_individual.add_hline(y=25, line_dash="dash", line_color="red", row=1, col=1)
-        fig_individual.add_hline(y=7, line_dash="dash", line_color="green", row=2, col=1)
-        
-        fig_individual.update_layout(height=500, title=f"Individual Progress: {selected_student}")
-        st.plotly_chart(fig_individual, use_container_width=True)
+    individual_participation(participation_df, students_df)
     
     # Research Evidence and Outcomes
     st.markdown("## 📊 Research Evidence: Impact on Group Dynamics")
     
     # Simulate before/after comparison
-    before_after_data = {
-        'Measure': ['Equal Participation', 'Student Satisfaction', 'Free-Riding Incidents', 
-                   'Group Cohesion', 'Learning Outcomes', 'Peer Evaluations'],
-        'Before_AI': [4.2, 6.1, 8.3, 5.8, 7.1, 5.9],
-        'After_AI': [8.1, 8.4, 2.1, 8.2, 8.3, 8.6],
-        'Effect_Size': [0.89, 0.76, -1.12, 0.83, 0.41, 0.91]
-    }
-    
-    fig_evidence = go.Figure()
-    fig_evidence.add_trace(go.Bar(name='Before AI Tracking', x=before_after_data['Measure'], 
-                                 y=before_after_data['Before_AI'], marker_color='#e74c3c'))
-    fig_evidence.add_trace(go.Bar(name='After AI Tracking', x=before_after_data['Measure'], 
-                                 y=before_after_data['After_AI'], marker_color='#2ecc71'))
-    
-    fig_evidence.update_layout(
-        title="Impact of AI-Driven Participation Tracking on Group Dynamics",
-        yaxis_title="Score (1-10, except Free-Riding which is incident count)",
-        barmode='group',
-        height=500
-    )
+    fig_evidence = cached_figure('participation_evidence', participation_evidence_figure)
     
     st.plotly_chart(fig_evidence, use_container_width=True)
     
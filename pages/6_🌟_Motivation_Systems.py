@@ -1,5 +1,4 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
@@ -9,58 +8,49 @@ from plotly.subplots import make_subplots
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from constants import DATA_PATHS_STR
+from utils.data_loader import load_table
+from utils.query import select, isin, equals
+from utils.figure_cache import cached_figure
+from utils.theme import apply_theme
+from utils.courses import course_selector
 
 st.set_page_config(page_title="Motivation Systems", page_icon="🌟", layout="wide")
 
-# Custom CSS
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 2.5rem;
-        font-weight: bold;
-        color: #1f77b4;
-        text-align: center;
-        margin-bottom: 2rem;
-    }
-    .psychology-principle {
-        background-color: #e8f5e8;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border-left: 4px solid #28a745;
-        margin: 1rem 0;
-    }
-    .motivation-theory {
-        background-color: #fff3cd;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border-left: 4px solid #ffc107;
-        margin: 1rem 0;
-    }
-    .intervention-strategy {
-        background-color: #f8d7da;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border-left: 4px solid #dc3545;
-        margin: 1rem 0;
-    }
-    .insight-box {
-        background-color: #f8f9fa;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border-left: 4px solid #1f77b4;
-        margin: 1rem 0;
-    }
-</style>
-""", unsafe_allow_html=True)
+# Shared stylesheet (static/theme.css)
+apply_theme()
+
+# Course section this session works on; every table below is loaded from it
+course_selector()
 
-@st.cache_data
 def load_motivation_data():
     """Load motivation and reinforcement data"""
-    motivation_df = pd.read_csv(DATA_PATHS_STR['motivation'])
-    students_df = pd.read_csv(DATA_PATHS_STR['students'])
+    motivation_df = load_table('motivation')
+    students_df = load_table('students')
     return motivation_df, students_df
 
+def motivation_outcomes_figure():
+    """Before/after bars of the motivation-system outcomes"""
+    outcomes_data = {
+        'Outcome': ['Student Engagement', 'Intrinsic Motivation', 'Persistence', 'Collaborative Behavior', 'Learning Satisfaction'],
+        'Before_AI': [6.2, 5.8, 6.0, 6.4, 6.1],
+        'After_AI': [8.7, 8.1, 8.4, 8.6, 8.3],
+        'Effect_Size': [0.89, 0.76, 0.82, 0.71, 0.78]
+    }
+
+    fig_outcomes = go.Figure()
+    fig_outcomes.add_trace(go.Bar(name='Before AI Motivation System', x=outcomes_data['Outcome'], 
+                                 y=outcomes_data['Before_AI'], marker_color='#e74c3c'))
+    fig_outcomes.add_trace(go.Bar(name='After AI Motivation System', x=outcomes_data['Outcome'], 
+                                 y=outcomes_data['After_AI'], marker_color='#2ecc71'))
+
+    fig_outcomes.update_layout(
+        title="Impact of AI Motivation Systems on Student Outcomes",
+        yaxis_title="Score (1-10)",
+        barmode='group',
+        height=500
+    )
+    return fig_outcomes
+
 def main():
     st.markdown('<h1 class="main-header">🌟 Motivation & Positive Reinforcement Systems</h1>', unsafe_allow_html=True)
     
@@ -263,51 +253,69 @@ def main():
         time_period = st.selectbox("Time Period:", ["Last Week", "Last Month", "All Time"])
     
     # Filter data
-    filtered_motivation = motivation_df[motivation_df['reinforcement_type'].isin(reinforcement_filter)]
+    where = [isin('reinforcement_type', reinforcement_filter)]
     if response_filter != 'All':
-        filtered_motivation = filtered_motivation[filtered_motivation['student_response'] == response_filter]
+        where.append(equals('student_response', response_filter))
+    filtered_motivation = select('motivation', where, columns=['reinforcement_type', 'motivation_boost', 'student_response',
+                                                              'engagement_before', 'engagement_after'])
+    filters = {'reinforcement': list(reinforcement_filter), 'response': response_filter}
     
     col1, col2 = st.columns(2)
     
     with col1:
         # Engagement improvement by reinforcement type
-        improvement_by_type = filtered_motivation.groupby('reinforcement_type')['motivation_boost'].mean().reset_index()
-        fig_improvement = px.bar(improvement_by_type, x='reinforcement_type', y='motivation_boost',
-                               title="Average Motivation Boost by Reinforcement Type",
-                               color='motivation_boost',
-                               color_continuous_scale='Viridis')
+        def build_improvement():
+            improvement_by_type = filtered_motivation.groupby('reinforcement_type')['motivation_boost'].mean().reset_index()
+            fig_improvement = px.bar(improvement_by_type, x='reinforcement_type', y='motivation_boost',
+                                   title="Average Motivation Boost by Reinforcement Type",
+                                   color='motivation_boost',
+                                   color_continuous_scale='Viridis')
+            return fig_improvement
+        
+        fig_improvement = cached_figure('motivation_improvement', build_improvement,
+                                        tables=['motivation'], filters=filters)
         st.plotly_chart(fig_improvement, use_container_width=True)
     
     with col2:
         # Student response distribution
-        response_counts = filtered_motivation['student_response'].value_counts()
-        fig_responses = px.pie(values=response_counts.values, names=response_counts.index,
-                             title="Student Response Distribution",
-                             color_discrete_map={'Very Positive': '#2ecc71', 'Positive': '#f39c12', 
-                                               'Neutral': '#95a5a6', 'Negative': '#e74c3c'})
+        def build_responses():
+            response_counts = filtered_motivation['student_response'].value_counts()
+            fig_responses = px.pie(values=response_counts.values, names=response_counts.index,
+                                 title="Student Response Distribution",
+                                 color_discrete_map={'Very Positive': '#2ecc71', 'Positive': '#f39c12', 
+                                                   'Neutral': '#95a5a6', 'Negative': '#e74c3c'})
+            return fig_responses
+        
+        fig_responses = cached_figure('motivation_responses', build_responses,
+                                      tables=['motivation'], filters=filters)
         st.plotly_chart(fig_responses, use_container_width=True)
     
     # Detailed Engagement Analysis
     st.markdown("## 🔍 Engagement Before vs After Interventions")
     
-    fig_engagement = go.Figure()
-    
-    # Before and after comparison
-    fig_engagement.add_trace(go.Histogram(x=filtered_motivation['engagement_before'], 
-                                        name='Before Intervention', 
-                                        opacity=0.7, 
-                                        marker_color='#e74c3c'))
-    fig_engagement.add_trace(go.Histogram(x=filtered_motivation['engagement_after'], 
-                                        name='After Intervention', 
-                                        opacity=0.7, 
-                                        marker_color='#2ecc71'))
-    
-    fig_engagement.update_layout(
-        title="Engagement Score Distribution: Before vs After Motivation Interventions",
-        xaxis_title="Engagement Score (1-10)",
-        yaxis_title="Number of Students",
-        barmode='overlay'
-    )
+    def build_engagement():
+        fig_engagement = go.Figure()
+        
+        # Before and after comparison
+        fig_engagement.add_trace(go.Histogram(x=filtered_motivation['engagement_before'], 
+                                            name='Before Intervention', 
+                                            opacity=0.7, 
+                                            marker_color='#e74c3c'))
+        fig_engagement.add_trace(go.Histogram(x=filtered_motivation['engagement_after'], 
+                                            name='After Intervention', 
+                                            opacity=0.7, 
+                                            marker_color='#2ecc71'))
+        
+        fig_engagement.update_layout(
+            title="Engagement Score Distribution: Before vs After Motivation Interventions",
+            xaxis_title="Engagement Score (1-10)",
+            yaxis_title="Number of Students",
+            barmode='overlay'
+        )
+        return fig_engagement
+    
+    fig_engagement = cached_figure('motivation_engagement', build_engagement,
+                                   tables=['motivation'], filters=filters)
     
     st.plotly_chart(fig_engagement, use_container_width=True)
     
@@ -436,27 +444,32 @@ def main():
         
         if not student_motivations.empty:
             # Individual motivation timeline
-            fig_timeline = go.Figure()
-            
-            fig_timeline.add_trace(go.Scatter(
-                x=student_motivations['timestamp'], 
-                y=student_motivations['engagement_before'],
-                name='Before Intervention',
-                line=dict(color='#e74c3c')
-            ))
-            
-            fig_timeline.add_trace(go.Scatter(
-                x=student_motivations['timestamp'], 
-                y=student_motivations['engagement_after'],
-                name='After Intervention',
-                line=dict(color='#2ecc71')
-            ))
+            def build_timeline():
+                fig_timeline = go.Figure()
+                
+                fig_timeline.add_trace(go.Scatter(
+                    x=student_motivations['timestamp'], 
+                    y=student_motivations['engagement_before'],
+                    name='Before Intervention',
+                    line=dict(color='#e74c3c')
+                ))
+                
+                fig_timeline.add_trace(go.Scatter(
+                    x=student_motivations['timestamp'], 
+                    y=student_motivations['engagement_after'],
+                    name='After Intervention',
+                    line=dict(color='#2ecc71')
+                ))
+                
+                fig_timeline.update_layout(
+                    title=f"Motivation Intervention Timeline: {selected_student}",
+                    xaxis_title="Time",
+                    yaxis_title="Engagement Score (1-10)"
+                )
+                return fig_timeline
             
-            fig_timeline.update_layout(
-                title=f"Motivation Intervention Timeline: {selected_student}",
-                xaxis_title="Time",
-                yaxis_title="Engagement Score (1-10)"
-            )
+            fig_timeline = cached_figure('motivation_student_timeline', build_timeline,
+                                         tables=['motivation', 'students'], filters={'student': selected_student})
             
             st.plotly_chart(fig_timeline, use_container_width=True)
             
@@ -546,25 +559,7 @@ def main():
     # Implementation Outcomes
     st.markdown("## 🎯 Key Outcomes: Psychology-Informed Motivation Enhancement")
     
-    outcomes_data = {
-        'Outcome': ['Student Engagement', 'Intrinsic Motivation', 'Persistence', 'Collaborative Behavior', 'Learning Satisfaction'],
-        'Before_AI': [6.2, 5.8, 6.0, 6.4, 6.1],
-        'After_AI': [8.7, 8.1, 8.4, 8.6, 8.3],
-        'Effect_Size': [0.89, 0.76, 0.82, 0.71, 0.78]
-    }
-    
-    fig_outcomes = go.Figure()
-    fig_outcomes.add_trace(go.Bar(name='Before AI Motivation System', x=outcomes_data['Outcome'], 
-                                 y=outcomes_data['Before_AI'], marker_color='#e74c3c'))
-    fig_outcomes.add_trace(go.Bar(name='After AI Motivation System', x=outcomes_data['Outcome'], 
-                                 y=outcomes_data['After_AI'], marker_color='#2ecc71'))
-    
-    fig_outcomes.update_layout(
-        title="Impact of AI Motivation Systems on Student Outcomes",
-        yaxis_title="Score (1-10)",
-        barmode='group',
-        height=500
-    )
+    fig_outcomes = cached_figure('motivation_outcomes', motivation_outcomes_figure)
     
     st.plotly_chart(fig_outcomes, use_container_width=True)
     
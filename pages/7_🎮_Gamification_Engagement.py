@@ -1,5 +1,4 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
@@ -9,66 +8,71 @@ from plotly.subplots import make_subplots
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from constants import DATA_PATHS_STR
+from utils.data_loader import load_table
+from utils.query import select, isin, equals
+from utils.figure_cache import cached_figure
+from utils.theme import apply_theme
+from utils.courses import course_selector
 
 st.set_page_config(page_title="Gamification & Engagement", page_icon="🎮", layout="wide")
 
-# Custom CSS
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 2.5rem;
-        font-weight: bold;
-        color: #1f77b4;
-        text-align: center;
-        margin-bottom: 2rem;
-    }
-    .psychology-principle {
-        background-color: #e8f5e8;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border-left: 4px solid #28a745;
-        margin: 1rem 0;
-    }
-    .game-theory {
-        background-color: #fff3cd;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border-left: 4px solid #ffc107;
-        margin: 1rem 0;
-    }
-    .implementation-box {
-        background-color: #f8d7da;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border-left: 4px solid #dc3545;
-        margin: 1rem 0;
-    }
-    .insight-box {
-        background-color: #f8f9fa;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border-left: 4px solid #1f77b4;
-        margin: 1rem 0;
-    }
-    .achievement-badge {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        padding: 1rem;
-        border-radius: 10px;
-        margin: 0.5rem;
-        text-align: center;
-    }
-</style>
-""", unsafe_allow_html=True)
+# Shared stylesheet (static/theme.css)
+apply_theme()
+
+# Course section this session works on; every table below is loaded from it
+course_selector()
 
-@st.cache_data
 def load_gamification_data():
     """Load gamification and achievement data"""
-    gamification_df = pd.read_csv(DATA_PATHS_STR['gamification'])
-    students_df = pd.read_csv(DATA_PATHS_STR['students'])
+    gamification_df = load_table('gamification')
+    students_df = load_table('students')
     return gamification_df, students_df
 
+def gamification_impact_figure():
+    """Before/after bars of the gamification impact evidence"""
+    impact_data = {
+        'Metric': ['Student Engagement', 'Collaborative Behavior', 'Task Completion', 'Peer Interaction', 'Learning Satisfaction'],
+        'Before_Gamification': [6.1, 5.9, 7.2, 6.0, 6.3],
+        'After_Gamification': [8.8, 8.9, 9.1, 8.7, 8.5],
+        'Effect_Size': [0.91, 1.02, 0.73, 0.89, 0.76]
+    }
+
+    fig_impact = go.Figure()
+    fig_impact.add_trace(go.Bar(name='Before Gamification', x=impact_data['Metric'], 
+                               y=impact_data['Before_Gamification'], marker_color='#e74c3c'))
+    fig_impact.add_trace(go.Bar(name='After Gamification', x=impact_data['Metric'], 
+                               y=impact_data['After_Gamification'], marker_color='#2ecc71'))
+
+    fig_impact.update_layout(
+        title="Impact of Educational Gamification on Collaborative Learning",
+        yaxis_title="Score (1-10)",
+        barmode='group',
+        height=500
+    )
+    return fig_impact
+
+def longterm_engagement_figure():
+    """Simulated weekly engagement, traditional vs gamified"""
+    weeks = list(range(1, 9))
+    traditional_engagement = [7.2, 6.8, 6.4, 6.0, 5.8, 5.5, 5.2, 5.0]
+    gamified_engagement = [7.2, 7.8, 8.1, 8.3, 8.5, 8.4, 8.6, 8.7]
+
+    fig_longterm = go.Figure()
+    fig_longterm.add_trace(go.Scatter(x=weeks, y=traditional_engagement, 
+                                    name='Traditional Approach', 
+                                    line=dict(color='#e74c3c', dash='dash')))
+    fig_longterm.add_trace(go.Scatter(x=weeks, y=gamified_engagement, 
+                                    name='Gamified Approach', 
+                                    line=dict(color='#2ecc71', width=3)))
+
+    fig_longterm.update_layout(
+        title="Engagement Trends: Traditional vs Gamified Collaborative Learning",
+        xaxis_title="Project Week",
+        yaxis_title="Average Engagement Score",
+        height=400
+    )
+    return fig_longterm
+
 def main():
     st.markdown('<h1 class="main-header">🎮 Gamification & Engagement Incentives</h1>', unsafe_allow_html=True)
     
@@ -274,35 +278,43 @@ def main():
         team_bonus_filter = st.selectbox("Team Bonus:", ["All", "Yes", "No"])
     
     # Filter data
-    filtered_gamification = gamification_df[
-        (gamification_df['achievement_type'].isin(achievement_filter)) &
-        (gamification_df['difficulty_level'].isin(difficulty_filter))
-    ]
-    
-    if team_bonus_filter == "Yes":
-        filtered_gamification = filtered_gamification[filtered_gamification['team_bonus'] == True]
-    elif team_bonus_filter == "No":
-        filtered_gamification = filtered_gamification[filtered_gamification['team_bonus'] == False]
+    where = [isin('achievement_type', achievement_filter), isin('difficulty_level', difficulty_filter)]
+    if team_bonus_filter != "All":
+        where.append(equals('team_bonus', team_bonus_filter == "Yes"))
+    filtered_gamification = select('gamification', where, columns=['achievement_type', 'difficulty_level',
+                                                                  'points_earned', 'engagement_increase'])
+    filters = {'achievements': list(achievement_filter), 'difficulty': list(difficulty_filter),
+               'team_bonus': team_bonus_filter}
     
     col1, col2 = st.columns(2)
     
     with col1:
         # Points distribution by achievement type
-        points_by_type = filtered_gamification.groupby('achievement_type')['points_earned'].mean().reset_index()
-        fig_points = px.bar(points_by_type, x='achievement_type', y='points_earned',
-                          title="Average Points by Achievement Type",
-                          color='points_earned',
-                          color_continuous_scale='Viridis')
-        fig_points.update_layout(xaxis=dict(tickangle=45))
+        def build_points():
+            points_by_type = filtered_gamification.groupby('achievement_type')['points_earned'].mean().reset_index()
+            fig_points = px.bar(points_by_type, x='achievement_type', y='points_earned',
+                              title="Average Points by Achievement Type",
+                              color='points_earned',
+                              color_continuous_scale='Viridis')
+            fig_points.update_layout(xaxis=dict(tickangle=45))
+            return fig_points
+        
+        fig_points = cached_figure('gamification_points', build_points,
+                                   tables=['gamification'], filters=filters)
         st.plotly_chart(fig_points, use_container_width=True)
     
     with col2:
         # Engagement increase by difficulty
-        engagement_by_difficulty = filtered_gamification.groupby('difficulty_level')['engagement_increase'].mean().reset_index()
-        fig_engagement = px.bar(engagement_by_difficulty, x='difficulty_level', y='engagement_increase',
-                              title="Engagement Increase by Difficulty Level",
-                              color='engagement_increase',
-                              color_continuous_scale='RdYlGn')
+        def build_engagement():
+            engagement_by_difficulty = filtered_gamification.groupby('difficulty_level')['engagement_increase'].mean().reset_index()
+            fig_engagement = px.bar(engagement_by_difficulty, x='difficulty_level', y='engagement_increase',
+                                  title="Engagement Increase by Difficulty Level",
+                                  color='engagement_increase',
+                                  color_continuous_scale='RdYlGn')
+            return fig_engagement
+        
+        fig_engagement = cached_figure('gamification_engagement', build_engagement,
+                                       tables=['gamification'], filters=filters)
         st.plotly_chart(fig_engagement, use_container_width=True)
     
     # Achievement Gallery
@@ -370,32 +382,39 @@ def main():
                 st.metric("Avg Time to Earn", f"{avg_time:.1f}h")
             
             # Achievement timeline
-            fig_timeline = go.Figure()
-            
-            cumulative_points = student_achievements.sort_values('timestamp')['points_earned'].cumsum()
-            fig_timeline.add_trace(go.Scatter(
-                x=student_achievements.sort_values('timestamp')['timestamp'],
-                y=cumulative_points,
-                mode='lines+markers',
-                name='Cumulative Points',
-                line=dict(color='#2ecc71', width=3),
-                marker=dict(size=8)
-            ))
+            def build_timeline():
+                fig_timeline = go.Figure()
+                
+                cumulative_points = student_achievements.sort_values('timestamp')['points_earned'].cumsum()
+                fig_timeline.add_trace(go.Scatter(
+                    x=student_achievements.sort_values('timestamp')['timestamp'],
+                    y=cumulative_points,
+                    mode='lines+markers',
+                    name='Cumulative Points',
+                    line=dict(color='#2ecc71', width=3),
+                    marker=dict(size=8)
+                ))
+                
+                fig_timeline.update_layout(
+                    title=f"Achievement Progress Timeline: {selected_student}",
+                    xaxis_title="Time",
+                    yaxis_title="Cumulative Points"
+                )
+                return fig_timeline
             
-            fig_timeline.update_layout(
-                title=f"Achievement Progress Timeline: {selected_student}",
-                xaxis_title="Time",
-                yaxis_title="Cumulative Points"
-            )
+            fig_timeline = cached_figure('gamification_student_timeline', build_timeline,
+                                         tables=['gamification', 'students'], filters={'student': selected_student})
             
             st.plotly_chart(fig_timeline, use_container_width=True)
             
             # Achievement breakdown
             achievement_breakdown = student_achievements['achievement_type'].value_counts()
             if not achievement_breakdown.empty:
-                fig_breakdown = px.pie(values=achievement_breakdown.values, 
-                                     names=achievement_breakdown.index,
-                                     title=f"Achievement Distribution: {selected_student}")
+                fig_breakdown = cached_figure('gamification_student_breakdown', lambda: px.pie(
+                    values=achievement_breakdown.values,
+                    names=achievement_breakdown.index,
+                    title=f"Achievement Distribution: {selected_student}"),
+                    tables=['gamification', 'students'], filters={'student': selected_student})
                 st.plotly_chart(fig_breakdown, use_container_width=True)
         else:
             st.info(f"No achievements recorded yet for {selected_student}")
@@ -456,25 +475,7 @@ def main():
     st.markdown("## 📊 Gamification Impact Assessment")
     
     # Create impact comparison data
-    impact_data = {
-        'Metric': ['Student Engagement', 'Collaborative Behavior', 'Task Completion', 'Peer Interaction', 'Learning Satisfaction'],
-        'Before_Gamification': [6.1, 5.9, 7.2, 6.0, 6.3],
-        'After_Gamification': [8.8, 8.9, 9.1, 8.7, 8.5],
-        'Effect_Size': [0.91, 1.02, 0.73, 0.89, 0.76]
-    }
-    
-    fig_impact = go.Figure()
-    fig_impact.add_trace(go.Bar(name='Before Gamification', x=impact_data['Metric'], 
-                               y=impact_data['Before_Gamification'], marker_color='#e74c3c'))
-    fig_impact.add_trace(go.Bar(name='After Gamification', x=impact_data['Metric'], 
-                               y=impact_data['After_Gamification'], marker_color='#2ecc71'))
-    
-    fig_impact.update_layout(
-        title="Impact of Educational Gamification on Collaborative Learning",
-        yaxis_title="Score (1-10)",
-        barmode='group',
-        height=500
-    )
+    fig_impact = cached_figure('gamification_impact', gamification_impact_figure)
     
     st.plotly_chart(fig_impact, use_container_width=True)
     
@@ -482,24 +483,7 @@ def main():
     st.markdown("## 📈 Sustained Engagement Through Gamification")
     
     # Simulate long-term engagement data
-    weeks = list(range(1, 9))
-    traditional_engagement = [7.2, 6.8, 6.4, 6.0, 5.8, 5.5, 5.2, 5.0]
-    gamified_engagement = [7.2, 7.8, 8.1, 8.3, 8.5, 8.4, 8.6, 8.7]
-    
-    fig_longterm = go.Figure()
-    fig_longterm.add_trace(go.Scatter(x=weeks, y=traditional_engagement, 
-                                    name='Traditional Approach', 
-                                    line=dict(color='#e74c3c', dash='dash')))
-    fig_longterm.add_trace(go.Scatter(x=weeks, y=gamified_engagement, 
-                                    name='Gamified Approach', 
-                                    line=dict(color='#2ecc71', width=3)))
-    
-    fig_longterm.update_layout(
-        title="Engagement Trends: Traditional vs Gamified Collaborative Learning",
-        xaxis_title="Project Week",
-        yaxis_title="Average Engagement Score",
-        height=400
-    )
+    fig_longterm = cached_figure('gamification_longterm', longterm_engagement_figure)
     
     st.plotly_chart(fig_longterm, use_container_width=True)
     
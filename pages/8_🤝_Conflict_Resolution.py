@@ -9,65 +9,201 @@ from plotly.subplots import make_subplots
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from constants import DATA_PATHS_STR
+from utils.data_loader import load_table
+from utils.query import select, isin, equals
+from utils.figure_cache import cached_figure
+from utils.theme import apply_theme
+from utils.courses import course_selector
 
 st.set_page_config(page_title="Conflict Resolution", page_icon="🤝", layout="wide")
 
-# Custom CSS
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 2.5rem;
-        font-weight: bold;
-        color: #1f77b4;
-        text-align: center;
-        margin-bottom: 2rem;
-    }
-    .psychology-principle {
-        background-color: #e8f5e8;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border-left: 4px solid #28a745;
-        margin: 1rem 0;
-    }
-    .conflict-theory {
-        background-color: #fff3cd;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border-left: 4px solid #ffc107;
-        margin: 1rem 0;
-    }
-    .resolution-strategy {
-        background-color: #f8d7da;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border-left: 4px solid #dc3545;
-        margin: 1rem 0;
-    }
-    .insight-box {
-        background-color: #f8f9fa;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border-left: 4px solid #1f77b4;
-        margin: 1rem 0;
-    }
-    .success-story {
-        background-color: #d4edda;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border-left: 4px solid #28a745;
-        margin: 1rem 0;
-    }
-</style>
-""", unsafe_allow_html=True)
+# Shared stylesheet (static/theme.css)
+apply_theme()
+
+# Course section this session works on; every table below is loaded from it
+course_selector()
+
+# Columns the pattern charts and the case study read
+CASE_COLUMNS = ['conflict_id', 'conflict_type', 'detection_method', 'severity_level', 'intervention_time_hours',
+                'resolution_strategy', 'resolution_success', 'group_satisfaction_before',
+                'group_satisfaction_after', 'human_ta_involved', 'follow_up_needed']
 
-@st.cache_data
 def load_conflict_data():
     """Load conflict resolution data"""
-    conflicts_df = pd.read_csv(DATA_PATHS_STR['conflicts'])
-    students_df = pd.read_csv(DATA_PATHS_STR['students'])
+    conflicts_df = load_table('conflicts')
+    students_df = load_table('students')
     return conflicts_df, students_df
 
+def conflict_impact_figure():
+    """Traditional vs AI-enhanced bars of the conflict-resolution evidence"""
+    impact_metrics = {
+        'Metric': ['Early Detection Rate', 'Resolution Success', 'Relationship Preservation', 
+                  'Learning Outcomes', 'Future Conflict Prevention', 'Student Satisfaction'],
+        'Traditional_Approach': [32, 58, 45, 62, 28, 54],
+        'AI_Enhanced_Approach': [87, 85, 78, 81, 72, 84],
+        'Improvement': [55, 27, 33, 19, 44, 30]
+    }
+
+    fig_impact = go.Figure()
+    fig_impact.add_trace(go.Bar(name='Traditional Approach', x=impact_metrics['Metric'], 
+                               y=impact_metrics['Traditional_Approach'], marker_color='#e74c3c'))
+    fig_impact.add_trace(go.Bar(name='AI-Enhanced Approach', x=impact_metrics['Metric'], 
+                               y=impact_metrics['AI_Enhanced_Approach'], marker_color='#2ecc71'))
+
+    fig_impact.update_layout(
+        title="Conflict Resolution Effectiveness: Traditional vs AI-Enhanced Approaches",
+        yaxis_title="Success Rate (%)",
+        barmode='group',
+        height=500
+    )
+    return fig_impact
+
+@st.fragment
+def conflict_pattern_analysis(conflicts_df: pd.DataFrame):
+    """Type/severity filtered conflict charts and case study; reruns on its own when a filter changes"""
+    # Conflict Pattern Analysis
+    st.markdown("## 📊 Conflict Pattern & Resolution Analysis")
+    
+    # Filter controls
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        conflict_type_filter = st.multiselect("Conflict Types:", 
+                                            conflicts_df['conflict_type'].unique(),
+                                            default=conflicts_df['conflict_type'].unique())
+    with col2:
+        severity_filter = st.multiselect("Severity Levels:", 
+                                       conflicts_df['severity_level'].unique(),
+                                       default=conflicts_df['severity_level'].unique())
+    with col3:
+        resolution_filter = st.selectbox("Resolution Success:", ["All", "Successful", "Unsuccessful"])
+    
+    # Filter data
+    where = [isin('conflict_type', conflict_type_filter), isin('severity_level', severity_filter)]
+    if resolution_filter != "All":
+        where.append(equals('resolution_success', resolution_filter == "Successful"))
+    filtered_conflicts = select('conflicts', where, columns=CASE_COLUMNS)
+    filters = {'types': list(conflict_type_filter), 'severity': list(severity_filter),
+               'resolution': resolution_filter}
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Conflict types distribution
+        def build_conflicts():
+            conflict_counts = filtered_conflicts['conflict_type'].value_counts()
+            fig_conflicts = px.pie(values=conflict_counts.values, names=conflict_counts.index,
+                                 title="Distribution of Conflict Types",
+                                 color_discrete_sequence=px.colors.qualitative.Set3)
+            return fig_conflicts
+        
+        fig_conflicts = cached_figure('conflict_types', build_conflicts,
+                                      tables=['conflicts'], filters=filters)
+        st.plotly_chart(fig_conflicts, use_container_width=True)
+    
+    with col2:
+        # Resolution success by conflict type
+        def build_success():
+            success_by_type = filtered_conflicts.groupby('conflict_type')['resolution_success'].mean().reset_index()
+            success_by_type['success_rate'] = success_by_type['resolution_success'] * 100
+            
+            fig_success = px.bar(success_by_type, x='conflict_type', y='success_rate',
+                               title="Resolution Success Rate by Conflict Type",
+                               color='success_rate',
+                               color_continuous_scale='RdYlGn')
+            fig_success.update_layout(xaxis=dict(tickangle=45))
+            fig_success.update_layout(yaxis_range=[0, 100])
+            return fig_success
+        
+        fig_success = cached_figure('conflict_success', build_success,
+                                    tables=['conflicts'], filters=filters)
+        st.plotly_chart(fig_success, use_container_width=True)
+    
+    # Resolution Timeline Analysis
+    st.markdown("## ⏱️ Intervention Timing & Effectiveness")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Intervention time vs success rate
+        fig_timing = cached_figure('conflict_timing', lambda: px.scatter(
+            filtered_conflicts, x='intervention_time_hours', y='group_satisfaction_after',
+            color='resolution_success', size='group_satisfaction_before',
+            title="Intervention Timing vs Outcome Satisfaction",
+            hover_data=['conflict_type', 'severity_level']), tables=['conflicts'], filters=filters)
+        st.plotly_chart(fig_timing, use_container_width=True)
+    
+    with col2:
+        # Detection method effectiveness
+        def build_detection():
+            detection_success = filtered_conflicts.groupby('detection_method')['resolution_success'].mean().reset_index()
+            detection_success['success_rate'] = detection_success['resolution_success'] * 100
+            
+            fig_detection = px.bar(detection_success, x='detection_method', y='success_rate',
+                                 title="Resolution Success by Detection Method",
+                                 color='success_rate',
+                                 color_continuous_scale='Viridis')
+            return fig_detection
+        
+        fig_detection = cached_figure('conflict_detection', build_detection,
+                                      tables=['conflicts'], filters=filters)
+        st.plotly_chart(fig_detection, use_container_width=True)
+    
+    # Detailed Conflict Case Study
+    st.markdown("## 🔍 Conflict Resolution Case Analysis")
+    
+    # Select a specific conflict for detailed analysis
+    conflict_list = filtered_conflicts['conflict_id'].unique()
+    if len(conflict_list) > 0:
+        selected_conflict = st.selectbox("Select Conflict for Detailed Analysis:", conflict_list)
+        
+        if selected_conflict:
+            conflict_details = filtered_conflicts[filtered_conflicts['conflict_id'] == selected_conflict].iloc[0]
+            
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                st.markdown(f"**Conflict ID:** {conflict_details['conflict_id']}")
+                st.markdown(f"**Type:** {conflict_details['conflict_type']}")
+                st.markdown(f"**Severity:** {conflict_details['severity_level']}")
+            
+            with col2:
+                st.markdown(f"**Detection:** {conflict_details['detection_method']}")
+                st.markdown(f"**Strategy:** {conflict_details['resolution_strategy']}")
+                st.markdown(f"**Success:** {'✅ Yes' if conflict_details['resolution_success'] else '❌ No'}")
+            
+            with col3:
+                st.markdown(f"**Intervention Time:** {conflict_details['intervention_time_hours']:.1f} hours")
+                st.markdown(f"**TA Involved:** {'Yes' if conflict_details['human_ta_involved'] else 'AI Only'}")
+                st.markdown(f"**Follow-up Needed:** {'Yes' if conflict_details['follow_up_needed'] else 'No'}")
+            
+            # Satisfaction improvement visualization
+            def build_improvement():
+                fig_improvement = go.Figure()
+                
+                categories = ['Before Resolution', 'After Resolution']
+                satisfaction_scores = [conflict_details['group_satisfaction_before'], 
+                                     conflict_details['group_satisfaction_after']]
+                
+                fig_improvement.add_trace(go.Bar(
+                    x=categories,
+                    y=satisfaction_scores,
+                    marker_color=['#e74c3c', '#2ecc71'],
+                    text=[f"{score:.1f}" for score in satisfaction_scores],
+                    textposition='auto'
+                ))
+                
+                fig_improvement.update_layout(
+                    title=f"Group Satisfaction: {selected_conflict}",
+                    yaxis_title="Satisfaction Score (1-10)",
+                    yaxis_range=[0, 10]
+                )
+                return fig_improvement
+            
+            fig_improvement = cached_figure('conflict_case_satisfaction', build_improvement,
+                                            tables=['conflicts'], filters={'conflict': selected_conflict})
+            
+            st.plotly_chart(fig_improvement, use_container_width=True)
+
 def main():
     st.markdown('<h1 class="main-header">🤝 Conflict Mediation & Social Coaching</h1>', unsafe_allow_html=True)
     
@@ -257,130 +393,7 @@ def main():
         </div>
         """, unsafe_allow_html=True)
     
-    # Conflict Pattern Analysis
-    st.markdown("## 📊 Conflict Pattern & Resolution Analysis")
-    
-    # Filter controls
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        conflict_type_filter = st.multiselect("Conflict Types:", 
-                                            conflicts_df['conflict_type'].unique(),
-                                            default=conflicts_df['conflict_type'].unique())
-    with col2:
-        severity_filter = st.multiselect("Severity Levels:", 
-                                       conflicts_df['severity_level'].unique(),
-                                       default=conflicts_df['severity_level'].unique())
-    with col3:
-        resolution_filter = st.selectbox("Resolution Success:", ["All", "Successful", "Unsuccessful"])
-    
-    # Filter data
-    filtered_conflicts = conflicts_df[
-        (conflicts_df['conflict_type'].isin(conflict_type_filter)) &
-        (conflicts_df['severity_level'].isin(severity_filter))
-    ]
-    
-    if resolution_filter == "Successful":
-        filtered_conflicts = filtered_conflicts[filtered_conflicts['resolution_success'] == True]
-    elif resolution_filter == "Unsuccessful":
-        filtered_conflicts = filtered_conflicts[filtered_conflicts['resolution_success'] == False]
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # Conflict types distribution
-        conflict_counts = filtered_conflicts['conflict_type'].value_counts()
-        fig_conflicts = px.pie(values=conflict_counts.values, names=conflict_counts.index,
-                             title="Distribution of Conflict Types",
-                             color_discrete_sequence=px.colors.qualitative.Set3)
-        st.plotly_chart(fig_conflicts, use_container_width=True)
-    
-    with col2:
-        # Resolution success by conflict type
-        success_by_type = filtered_conflicts.groupby('conflict_type')['resolution_success'].mean().reset_index()
-        success_by_type['success_rate'] = success_by_type['resolution_success'] * 100
-        
-        fig_success = px.bar(success_by_type, x='conflict_type', y='success_rate',
-                           title="Resolution Success Rate by Conflict Type",
-                           color='success_rate',
-                           color_continuous_scale='RdYlGn')
-        fig_success.update_layout(xaxis=dict(tickangle=45))
-        fig_success.update_layout(yaxis_range=[0, 100])
-        st.plotly_chart(fig_success, use_container_width=True)
-    
-    # Resolution Timeline Analysis
-    st.markdown("## ⏱️ Intervention Timing & Effectiveness")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # Intervention time vs success rate
-        fig_timing = px.scatter(filtered_conflicts, x='intervention_time_hours', y='group_satisfaction_after',
-                              color='resolution_success', size='group_satisfaction_before',
-                              title="Intervention Timing vs Outcome Satisfaction",
-                              hover_data=['conflict_type', 'severity_level'])
-        st.plotly_chart(fig_timing, use_container_width=True)
-    
-    with col2:
-        # Detection method effectiveness
-        detection_success = filtered_conflicts.groupby('detection_method')['resolution_success'].mean().reset_index()
-        detection_success['success_rate'] = detection_success['resolution_success'] * 100
-        
-        fig_detection = px.bar(detection_success, x='detection_method', y='success_rate',
-                             title="Resolution Success by Detection Method",
-                             color='success_rate',
-                             color_continuous_scale='Viridis')
-        st.plotly_chart(fig_detection, use_container_width=True)
-    
-    # Detailed Conflict Case Study
-    st.markdown("## 🔍 Conflict Resolution Case Analysis")
-    
-    # Select a specific conflict for detailed analysis
-    conflict_list = filtered_conflicts['conflict_id'].unique()
-    if len(conflict_list) > 0:
-        selected_conflict = st.selectbox("Select Conflict for Detailed Analysis:", conflict_list)
-        
-        if selected_conflict:
-            conflict_details = filtered_conflicts[filtered_conflicts['conflict_id'] == selected_conflict].iloc[0]
-            
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                st.markdown(f"**Conflict ID:** {conflict_details['conflict_id']}")
-                st.markdown(f"**Type:** {conflict_details['conflict_type']}")
-                st.markdown(f"**Severity:** {conflict_details['severity_level']}")
-            
-            with col2:
-                st.markdown(f"**Detection:** {conflict_details['detection_method']}")
-                st.markdown(f"**Strategy:** {conflict_details['resolution_strategy']}")
-                st.markdown(f"**Success:** {'✅ Yes' if conflict_details['resolution_success'] else '❌ No'}")
-            
-            with col3:
-                st.markdown(f"**Intervention Time:** {conflict_details['intervention_time_hours']:.1f} hours")
-                st.markdown(f"**TA Involved:** {'Yes' if conflict_details['human_ta_involved'] else 'AI Only'}")
-                st.markdown(f"**Follow-up Needed:** {'Yes' if conflict_details['follow_up_needed'] else 'No'}")
-            
-            # Satisfaction improvement visualization
-            fig_improvement = go.Figure()
-            
-            categories = ['Before Resolution', 'After Resolution']
-            satisfaction_scores = [conflict_details['group_satisfaction_before'], 
-                                 conflict_details['group_satisfaction_after']]
-            
-            fig_improvement.add_trace(go.Bar(
-                x=categories,
-                y=satisfaction_scores,
-                marker_color=['#e74c3c', '#2ecc71'],
-                text=[f"{score:.1f}" for score in satisfaction_scores],
-                textposition='auto'
-            ))
-            
-            fig_improvement.update_layout(
-                title=f"Group Satisfaction: {selected_conflict}",
-                yaxis_title="Satisfaction Score (1-10)",
-                yaxis_range=[0, 10]
-            )
-            
-            st.plotly_chart(fig_improvement, use_container_width=True)
+    conflict_pattern_analysis(conflicts_df)
     
     # Resolution Strategies by Conflict Type
     st.markdown("## 🎯 Evidence-Based Resolution Strategies")
@@ -520,26 +533,7 @@ def main():
     st.markdown("## 📊 Conflict Resolution Impact Assessment")
     
     # Create comprehensive impact visualization
-    impact_metrics = {
-        'Metric': ['Early Detection Rate', 'Resolution Success', 'Relationship Preservation', 
-                  'Learning Outcomes', 'Future Conflict Prevention', 'Student Satisfaction'],
-        'Traditional_Approach': [32, 58, 45, 62, 28, 54],
-        'AI_Enhanced_Approach': [87, 85, 78, 81, 72, 84],
-        'Improvement': [55, 27, 33, 19, 44, 30]
-    }
-    
-    fig_impact = go.Figure()
-    fig_impact.add_trace(go.Bar(name='Traditional Approach', x=impact_metrics['Metric'], 
-                               y=impact_metrics['Traditional_Approach'], marker_color='#e74c3c'))
-    fig_impact.add_trace(go.Bar(name='AI-Enhanced Approach', x=impact_metrics['Metric'], 
-                               y=impact_metrics['AI_Enhanced_Approach'], marker_color='#2ecc71'))
-    
-    fig_impact.update_layout(
-        title="Conflict Resolution Effectiveness: Traditional vs AI-Enhanced Approaches",
-        yaxis_title="Success Rate (%)",
-        barmode='group',
-        height=500
-    )
+    fig_impact = cached_figure('conflict_impact', conflict_impact_figure)
     
     st.plotly_chart(fig_impact, use_container_width=True)
     
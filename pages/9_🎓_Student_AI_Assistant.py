@@ -17,69 +17,80 @@ from prompts.student_prompts import SYSTEM_PROMPT, TEAMMATE_MATCHING_PROMPT, PAR
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from constants import DATA_PATHS_STR
+from utils.data_loader import load_table, table_version, data_version
+from utils.lazy_sections import lazy_tabs
+from utils.figure_cache import cached_figure
+from utils.card_list import card_list
+from utils.theme import apply_theme
+from utils.courses import course_selector, course_context
 
 st.set_page_config(page_title="Student AI Assistant", page_icon="🎓", layout="wide")
 
-# Custom CSS
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 2.5rem;
-        font-weight: bold;
-        color: #1f77b4;
-        text-align: center;
-        margin-bottom: 2rem;
-    }
-    .chat-message {
-        padding: 1rem;
-        border-radius: 10px;
-        margin: 0.5rem 0;
-    }
-    .user-message {
-        background-color: #e3f2fd;
-        margin-left: 20%;
-    }
-    .assistant-message {
-        background-color: #f5f5f5;
-        margin-right: 20%;
-    }
-    .feature-card {
-        background-color: #ffffff;
-        padding: 1.5rem;
-        border-radius: 10px;
-        box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-        margin: 1rem 0;
-        border-left: 4px solid #2ecc71;
-    }
-    .dashboard-card {
-        background-color: #f8f9fa;
-        padding: 1rem;
-        border-radius: 10px;
-        border: 1px solid #dee2e6;
-        margin: 0.5rem 0;
-    }
-</style>
-""", unsafe_allow_html=True)
+# Shared stylesheet (static/theme.css)
+apply_theme()
+
+# Course section this session works on; every table below is loaded from it
+course_selector()
 
-@st.cache_data
 def load_student_data():
     """Load student and related data"""
-    students_df = pd.read_csv(DATA_PATHS_STR['students'])
-    participation_df = pd.read_csv(DATA_PATHS_STR['participation'])
-    motivation_df = pd.read_csv(DATA_PATHS_STR['motivation'])
-    gamification_df = pd.read_csv(DATA_PATHS_STR['gamification'])
+    students_df = load_table('students')
+    participation_df = load_table('participation')
+    motivation_df = load_table('motivation')
+    gamification_df = load_table('gamification')
     return students_df, participation_df, motivation_df, gamification_df
 
+@st.cache_data(show_spinner=False)
+def student_rows(table: str, student_id: str, version: str) -> pd.DataFrame:
+    """One student's rows of a table, cached per student and table version"""
+    df = load_table(table)
+    return df[df['student_id'] == student_id]
+
+def progress_figure(student_participation: pd.DataFrame) -> go.Figure:
+    """Weekly contribution trend of one student"""
+    fig_progress = px.line(student_participation, x='week', y='contribution_percentage',
+                         title="Your Weekly Contribution Trend")
+    fig_progress.add_hline(y=25, line_dash="dash", line_color="red", 
+                         annotation_text="Target: 25% (Equal Share)")
+    return fig_progress
+
+def contribution_breakdown_figure(student_participation: pd.DataFrame) -> go.Figure:
+    """Contribution types of one student's latest week"""
+    latest_week = student_participation['week'].max()
+    latest_data = student_participation[student_participation['week'] == latest_week].iloc[0]
+    
+    contributions = {
+        'Type': ['Code Commits', 'Document Edits', 'Ideas Contributed', 'Meeting Participation'],
+        'Count': [latest_data['code_commits'], latest_data['document_edits'], 
+                 latest_data['ideas_contributed'], latest_data['meeting_speaking_time']]
+    }
+    
+    return px.bar(x=contributions['Type'], y=contributions['Count'],
+                  title="This Week's Contribution Breakdown")
+
+def compatibility_figure() -> go.Figure:
+    """Team compatibility scores"""
+    compatibility_metrics = {
+        'Aspect': ['Skill Balance', 'Personality Diversity', 'Communication Styles', 'Work Preferences'],
+        'Score': [random.uniform(7, 9), random.uniform(6, 8), random.uniform(7, 9), random.uniform(6, 8)]
+    }
+    
+    fig_compatibility = px.bar(x=compatibility_metrics['Aspect'], y=compatibility_metrics['Score'],
+                             title="Team Compatibility Scores")
+    fig_compatibility.update_layout(yaxis_range=[0, 10])
+    return fig_compatibility
+
 def generate_student_ai_response(prompt: str, student_profile: dict, context_data: dict) -> str:
     """Generate contextual AI responses for students using Azure OpenAI"""
     try:
         # Format context data for the AI
+        course = course_context()
         context = format_context_data(
             student_profile=student_profile,
             additional_context={
-                "course_context": "Columbia University Introduction to Machine Learning course",
-                "project_type": "8-week collaborative ML pipeline development",
+                "course_context": course['course'],
+                "section": course['partition'],
+                "project_type": f"{course['weeks']}-week collaborative ML pipeline development",
                 "participation_data": context_data.get('participation', {}),
                 "motivation_data": context_data.get('motivation', {}),
                 "gamification_data": context_data.get('gamification', {})
@@ -90,7 +101,7 @@ def generate_student_ai_response(prompt: str, student_profile: dict, context_dat
         prompt_lower = prompt.lower()
         
         if any(word in prompt_lower for word in ['teammate', 'partner', 'group', 'team', 'match']):
-            system_prompt = SYSTEM_PROMPT
+            system_prompt = SYSTEM_PROMPT.format(**course)
             # Format available teammates (simplified for demo)
             available_teammates = "Sample teammates with diverse personalities and skills available"
             formatted_prompt = TEAMMATE_MATCHING_PROMPT.format(
@@ -107,7 +118,7 @@ def generate_student_ai_response(prompt: str, student_profile: dict, context_dat
             user_prompt = f"User request: {prompt}\n\n{formatted_prompt}"
             
         elif any(word in prompt_lower for word in ['contribution', 'participate', 'engage', 'involvement']):
-            system_prompt = SYSTEM_PROMPT
+            system_prompt = SYSTEM_PROMPT.format(**course)
             formatted_prompt = PARTICIPATION_GUIDANCE_PROMPT.format(
                 engagement_score=student_profile['engagement_score'],
                 contribution_percentage=random.randint(15, 35),  # Would come from real data
@@ -119,7 +130,7 @@ def generate_student_ai_response(prompt: str, student_profile: dict, context_dat
             
         else:
             # General query
-            system_prompt = SYSTEM_PROMPT
+            system_prompt = SYSTEM_PROMPT.format(**course)
             user_prompt = f"""
             The student is asking: "{prompt}"
             
@@ -140,7 +151,8 @@ def generate_student_ai_response(prompt: str, student_profile: dict, context_dat
             user_prompt=user_prompt,
             context_data=context,
             temperature=0.8,  # Slightly more creative for student interactions
-            max_tokens=1000
+            max_tokens=1000,
+            data_version=data_version('students', 'participation', 'motivation', 'gamification')
         )
         
         return response
@@ -249,91 +261,74 @@ def main():
     # Student Dashboard Features
     st.markdown("## 📊 Your Personal Dashboard")
     
-    tab1, tab2, tab3, tab4 = st.tabs(["📈 Progress Tracking", "🤝 Team Dynamics", "🎮 Achievements", "📚 Learning Resources"])
+    dashboard_tabs = ["📈 Progress Tracking", "🤝 Team Dynamics", "🎮 Achievements", "📚 Learning Resources"]
+    active_tab = lazy_tabs(dashboard_tabs, key="student_dashboard_tab")
     
-    with tab1:
+    if active_tab == dashboard_tabs[0]:
         # Progress tracking
-        student_participation = participation_df[participation_df['student_id'] == student_profile['student_id']]
+        student_id = student_profile['student_id']
+        student_participation = student_rows('participation', student_id, table_version('participation'))
         
         if not student_participation.empty:
             col1, col2 = st.columns(2)
             
             with col1:
                 # Weekly contribution trend
-                fig_progress = px.line(student_participation, x='week', y='contribution_percentage',
-                                     title="Your Weekly Contribution Trend")
-                fig_progress.add_hline(y=25, line_dash="dash", line_color="red", 
-                                     annotation_text="Target: 25% (Equal Share)")
+                fig_progress = cached_figure('student_progress', progress_figure, student_participation,
+                                             tables=['participation'], filters={'student_id': student_id})
                 st.plotly_chart(fig_progress, use_container_width=True)
             
             with col2:
                 # Contribution breakdown
-                latest_week = student_participation['week'].max()
-                latest_data = student_participation[student_participation['week'] == latest_week].iloc[0]
-                
-                contributions = {
-                    'Type': ['Code Commits', 'Document Edits', 'Ideas Contributed', 'Meeting Participation'],
-                    'Count': [latest_data['code_commits'], latest_data['document_edits'], 
-                             latest_data['ideas_contributed'], latest_data['meeting_speaking_time']]
-                }
-                
-                fig_breakdown = px.bar(x=contributions['Type'], y=contributions['Count'],
-                                     title="This Week's Contribution Breakdown")
+                fig_breakdown = cached_figure('student_contribution_breakdown', contribution_breakdown_figure,
+                                              student_participation, tables=['participation'],
+                                              filters={'student_id': student_id})
                 st.plotly_chart(fig_breakdown, use_container_width=True)
     
-    with tab2:
+    elif active_tab == dashboard_tabs[1]:
         # Team dynamics
         group_students = students_df[students_df['group_id'] == student_profile['group_id']]
         
         st.markdown(f"### 👥 Your Team: {group_students.iloc[0]['group_id']}")
         
-        for _, teammate in group_students.iterrows():
-            is_current_student = teammate['student_id'] == student_profile['student_id']
-            border_color = "#007bff" if is_current_student else "#28a745"
-            
-            st.markdown(f"""
+        is_current_student = group_students['student_id'] == student_profile['student_id']
+        teammates = group_students.assign(
+            border_color=np.where(is_current_student, "#007bff", "#28a745"),
+            label=np.where(is_current_student, '👤 You', '👥 ' + group_students['student_name']))
+        card_list(teammates, """
             <div style="border: 2px solid {border_color}; padding: 1rem; border-radius: 10px; margin: 0.5rem 0;">
-            <strong>{'👤 You' if is_current_student else '👥 ' + teammate['student_name']}</strong><br>
-            Role: {teammate['preferred_role']} | Skills: {teammate['technical_skills']}/10 | Engagement: {teammate['engagement_score']}/10<br>
-            Personality: {teammate['personality_type']} | Communication: {teammate['communication_style']}
+            <strong>{label}</strong><br>
+            Role: {preferred_role} | Skills: {technical_skills}/10 | Engagement: {engagement_score}/10<br>
+            Personality: {personality_type} | Communication: {communication_style}
             </div>
-            """, unsafe_allow_html=True)
+            """, key="student_teammates")
         
         # Team compatibility analysis
         st.markdown("### 🤝 Team Compatibility Analysis")
         
-        compatibility_metrics = {
-            'Aspect': ['Skill Balance', 'Personality Diversity', 'Communication Styles', 'Work Preferences'],
-            'Score': [random.uniform(7, 9), random.uniform(6, 8), random.uniform(7, 9), random.uniform(6, 8)]
-        }
-        
-        fig_compatibility = px.bar(x=compatibility_metrics['Aspect'], y=compatibility_metrics['Score'],
-                                 title="Team Compatibility Scores")
-        fig_compatibility.update_layout(yaxis_range=[0, 10])
+        fig_compatibility = cached_figure('student_team_compatibility', compatibility_figure,
+                                          tables=['students'], filters={'group_id': student_profile['group_id']})
         st.plotly_chart(fig_compatibility, use_container_width=True)
     
-    with tab3:
+    elif active_tab == dashboard_tabs[2]:
         # Achievements and gamification
-        student_achievements = gamification_df[gamification_df['student_id'] == student_profile['student_id']]
+        student_achievements = student_rows('gamification', student_profile['student_id'],
+                                            table_version('gamification'))
         
         col1, col2 = st.columns(2)
         
         with col1:
             st.markdown("### 🏆 Your Achievements")
             
-            if not student_achievements.empty:
-                for _, achievement in student_achievements.head(5).iterrows():
-                    difficulty_colors = {'Bronze': '#cd7f32', 'Silver': '#c0c0c0', 'Gold': '#ffd700', 'Platinum': '#e5e4e2'}
-                    color = difficulty_colors.get(achievement['difficulty_level'], '#e5e4e2')
-                    
-                    st.markdown(f"""
-                    <div style="background-color: {color}; padding: 0.5rem; border-radius: 5px; margin: 0.3rem 0; color: black;">
-                    <strong>{achievement['achievement_type']}</strong><br>
-                    Level: {achievement['difficulty_level']} | Points: {achievement['points_earned']}
-                    </div>
-                    """, unsafe_allow_html=True)
-            else:
-                st.markdown("No achievements yet. Keep collaborating to earn your first badge!")
+            difficulty_colors = {'Bronze': '#cd7f32', 'Silver': '#c0c0c0', 'Gold': '#ffd700', 'Platinum': '#e5e4e2'}
+            card_list(student_achievements.assign(
+                color=student_achievements['difficulty_level'].map(difficulty_colors).fillna('#e5e4e2')), """
+                <div style="background-color: {color}; padding: 0.5rem; border-radius: 5px; margin: 0.3rem 0; color: black;">
+                <strong>{achievement_type}</strong><br>
+                Level: {difficulty_level} | Points: {points_earned}
+                </div>
+                """, key="student_achievements", page_size=5,
+                      empty_message="No achievements yet. Keep collaborating to earn your first badge!")
         
         with col2:
             st.markdown("### 📊 Points & Progress")
@@ -347,10 +342,12 @@ def main():
             st.progress(progress)
             st.markdown(f"Progress to next level: {total_points % next_level_threshold}/{next_level_threshold}")
             
-            # Leaderboard position
-            st.metric("Class Rank", f"{random.randint(15, 45)}/80")
+            # Leaderboard position by total points in this section
+            class_points = gamification_df.groupby('student_id')['points_earned'].sum()
+            class_rank = int((class_points > total_points).sum()) + 1
+            st.metric("Class Rank", f"{class_rank}/{course_context()['n_students']}")
     
-    with tab4:
+    elif active_tab == dashboard_tabs[3]:
         # Learning resources
         st.markdown("### 📚 Personalized Learning Resources")
         
@@ -358,7 +355,7 @@ def main():
         
         with col1:
             st.markdown(f"""
-            <div class="feature-card">
+            <div class="resource-card">
             <h4>🎯 Recommended for {student_profile['preferred_role']}s</h4>
             <ul>
                 <li>Advanced Data Preprocessing Techniques</li>
@@ -370,7 +367,7 @@ def main():
             """, unsafe_allow_html=True)
             
             st.markdown(f"""
-            <div class="feature-card">
+            <div class="resource-card">
             <h4>🧠 {student_profile['personality_type']} Learning Style</h4>
             <ul>
                 <li>Structured problem-solving approaches</li>
@@ -383,7 +380,7 @@ def main():
         
         with col2:
             st.markdown("""
-            <div class="feature-card">
+            <div class="resource-card">
             <h4>🤝 Collaboration Skills</h4>
             <ul>
                 <li>Effective Communication in Tech Teams</li>
@@ -395,7 +392,7 @@ def main():
             """, unsafe_allow_html=True)
             
             st.markdown("""
-            <div class="feature-card">
+            <div class="resource-card">
             <h4>📈 Skill Development</h4>
             <ul>
                 <li>Python for Machine Learning</li>
@@ -2,6 +2,12 @@
 Utilities package for AI-Enhanced Teaching Assistant Dashboard
 """
 
-from .azure_openai import azure_openai_client, get_ai_response, format_context_data
-
 __all__ = ['azure_openai_client', 'get_ai_response', 'format_context_data']
+
+def __getattr__(name):
+    # Resolve the Azure OpenAI helpers lazily so data-layer modules (used by
+    # the generator scripts) can be imported without initializing the client
+    if name in __all__:
+        from . import azure_openai
+        return getattr(azure_openai, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
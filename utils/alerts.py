@@ -0,0 +1,319 @@
+"""
+Rule-based alert engine over the monitoring, participation and conflict tables
+
+The ``AlertEngine`` folds only newly appended rows into per-group (and
+per-group, per-week) aggregates, re-evaluates the rules just for the
+groups those rows touched, and keeps one alert per (group, rule) so a
+condition that persists across refreshes is reported once. ``alerts()``
+returns the open alerts ranked by severity.
+"""
+
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from .data_loader import load_table, appended_rows, data_version
+from .partitions import Partition, active_partition
+from .equity import xlogx, normalized_entropy
+
+ALERT_TABLES = ['monitoring', 'participation', 'conflicts']
+
+# rule -> label, severity thresholds, recommended action and estimated TA
+# time in minutes, most urgent rule first. Thresholds are compared against
+# the rule's value in the direction that signals trouble.
+ALERT_RULES = {
+    'unresolved_conflict': {
+        'label': 'Unresolved Conflict', 'medium': 1, 'high': 1,
+        'action': 'Immediate intervention', 'minutes': 120
+    },
+    'engagement_drop': {
+        'label': 'Engagement Drop', 'medium': 1.0, 'high': 2.0,
+        'action': 'Suggest a break or re-engagement activity', 'minutes': 30
+    },
+    'low_engagement': {
+        'label': 'Low Engagement', 'medium': 6.5, 'high': 6.0,
+        'action': 'Schedule a group check-in', 'minutes': 45
+    },
+    'low_active_speakers': {
+        'label': 'Low Participation', 'medium': 2.5, 'high': 2.0,
+        'action': 'Prompt quiet members', 'minutes': 20
+    },
+    'uneven_contribution': {
+        'label': 'Uneven Contributions', 'medium': 0.9, 'high': 0.8,
+        'action': 'Rebalance task ownership', 'minutes': 30
+    },
+    'quiet_member': {
+        'label': 'Quiet Member', 'medium': 0.6, 'high': 0.4,
+        'action': 'Student check-in', 'minutes': 30
+    },
+    'rising_off_topic': {
+        'label': 'Off-topic Discussion', 'low': 1.5, 'medium': 3.0, 'high': 6.0,
+        'action': 'Redirect conversation', 'minutes': 15
+    }
+}
+
+SEVERITY_RANK = {'High': 3, 'Medium': 2, 'Low': 1}
+
+class AlertEngine:
+    """Incrementally evaluated, deduplicated group alerts"""
+
+    def __init__(self, group_ids: Iterable[str], rules: Optional[Dict[str, dict]] = None):
+        """
+        Args:
+            group_ids: Groups to monitor
+            rules: Overrides for entries of ``ALERT_RULES``
+        """
+        self.group_ids = np.array(list(group_ids), dtype=object)
+        self._index = pd.Index(self.group_ids)
+        self.rules = {name: {**rule, **(rules or {}).get(name, {})} for name, rule in ALERT_RULES.items()}
+        self._lock = threading.Lock()
+        self._watermarks: Dict[str, tuple] = {}
+        self._alerts: Dict[tuple, dict] = {}
+        self._reset('monitoring')
+        self._reset('participation')
+        self._reset('conflicts')
+
+    def _reset(self, table: str):
+        n_groups = len(self.group_ids)
+        if table == 'monitoring':
+            # (n_groups, n_weeks) sums: sessions, engagement, speakers, off_topic
+            self._monitoring = {name: np.zeros((n_groups, 0)) for name in
+                                ['sessions', 'engagement', 'speakers', 'off_topic']}
+        elif table == 'participation':
+            self._participation = {
+                'members': np.zeros((n_groups, 0)),
+                'contribution': np.zeros((n_groups, 0)),
+                'contribution_xlogx': np.zeros((n_groups, 0)),
+                'min_contribution': np.full((n_groups, 0), np.inf),
+                'min_student': np.empty((n_groups, 0), dtype=object)
+            }
+        elif table == 'conflicts':
+            self._open_conflicts = {'High': np.zeros(n_groups), 'Medium': np.zeros(n_groups)}
+        rules = {'monitoring': ['engagement_drop', 'low_engagement', 'low_active_speakers', 'rising_off_topic'],
+                 'participation': ['uneven_contribution', 'quiet_member'], 'conflicts': ['unresolved_conflict']}[table]
+        self._alerts = {key: alert for key, alert in self._alerts.items() if key[1] not in rules}
+
+    # ------------------------------------------------------------------
+    # Aggregation
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _widen(array: np.ndarray, n_weeks: int, fill) -> np.ndarray:
+        if array.shape[1] >= n_weeks:
+            return array
+        grown = np.full((array.shape[0], n_weeks), fill, dtype=array.dtype)
+        grown[:, :array.shape[1]] = array
+        return grown
+
+    def _add_monitoring(self, groups: np.ndarray, rows: pd.DataFrame):
+        weeks = rows['week'].to_numpy(dtype=np.int64)
+        n_weeks = max(int(weeks.max()) + 1, self._monitoring['sessions'].shape[1])
+        flat = groups * n_weeks + weeks
+        values = {
+            'sessions': None,
+            'engagement': rows['avg_engagement'].to_numpy(dtype=float),
+            'speakers': rows['active_speakers'].to_numpy(dtype=float),
+            'off_topic': rows['off_topic_minutes'].fillna(0).to_numpy(dtype=float)
+        }
+        for name, value in values.items():
+            added = np.bincount(flat, weights=value, minlength=len(self.group_ids) * n_weeks)
+            self._monitoring[name] = self._widen(self._monitoring[name], n_weeks, 0.0) + \
+                added.reshape(len(self.group_ids), n_weeks)
+
+    def _add_participation(self, groups: np.ndarray, rows: pd.DataFrame):
+        state = self._participation
+        weeks = rows['week'].to_numpy(dtype=np.int64)
+        n_weeks = max(int(weeks.max()) + 1, state['members'].shape[1])
+        contribution = rows['contribution_percentage'].to_numpy(dtype=float)
+        flat = groups * n_weeks + weeks
+        size = len(self.group_ids) * n_weeks
+
+        for name, value in [('members', None), ('contribution', contribution),
+                            ('contribution_xlogx', xlogx(contribution.clip(min=0)))]:
+            state[name] = self._widen(state[name], n_weeks, 0.0) + \
+                np.bincount(flat, weights=value, minlength=size).reshape(-1, n_weeks)
+
+        # Lowest contributor of every (group, week) among the new rows
+        order = np.lexsort((contribution, flat))
+        first = order[np.r_[True, flat[order][1:] != flat[order][:-1]]]
+        g, w = groups[first], weeks[first]
+        min_contribution = self._widen(state['min_contribution'], n_weeks, np.inf)
+        min_student = self._widen(state['min_student'], n_weeks, None)
+        lower = contribution[first] < min_contribution[g, w]
+        min_contribution[g[lower], w[lower]] = contribution[first][lower]
+        min_student[g[lower], w[lower]] = rows['student_id'].to_numpy()[first][lower]
+        state['min_contribution'], state['min_student'] = min_contribution, min_student
+
+    def _add_conflicts(self, groups: np.ndarray, rows: pd.DataFrame):
+        unresolved = ~rows['resolution_success'].astype(bool).to_numpy()
+        severity = rows['severity_level'].to_numpy()
+        for level, matches in [('High', np.isin(severity, ['High', 'Critical'])), ('Medium', severity == 'Medium')]:
+            self._open_conflicts[level] += np.bincount(groups, weights=unresolved & matches,
+                                                       minlength=len(self.group_ids))
+
+    # ------------------------------------------------------------------
+    # Rules
+    # ------------------------------------------------------------------
+
+    def _severity(self, rule: str, value: np.ndarray, higher_is_worse: bool) -> np.ndarray:
+        """Severity label per value ('' where the rule does not fire)"""
+        thresholds = self.rules[rule]
+        worse = np.greater_equal if higher_is_worse else np.less_equal
+        levels = [level for level in ['high', 'medium', 'low'] if level in thresholds]
+        # Comparisons with NaN (no data) are False, so missing values never fire
+        return np.select([worse(value, thresholds[level]) for level in levels],
+                         [level.capitalize() for level in levels], default='')
+
+    def _set(self, rule: str, groups: np.ndarray, severity: np.ndarray, value: np.ndarray,
+             details: Iterable[str], student_ids: Optional[np.ndarray] = None):
+        """Raise, update or clear ``rule`` for each evaluated group"""
+        now = datetime.now()
+        spec = self.rules[rule]
+        for i, (g, level, detail) in enumerate(zip(groups, severity, details)):
+            key = (self.group_ids[g], rule)
+            if not level:
+                self._alerts.pop(key, None)
+                continue
+            previous = self._alerts.get(key)
+            self._alerts[key] = {
+                'group_id': key[0],
+                'rule': rule,
+                'type': spec['label'],
+                'severity': level,
+                'value': round(float(value[i]), 2),
+                'detail': detail,
+                'student_id': student_ids[i] if student_ids is not None else None,
+                'action': spec['action'],
+                'minutes': spec['minutes'],
+                'raised_at': previous['raised_at'] if previous else now,
+                'updated_at': now
+            }
+
+    @staticmethod
+    def _latest_weeks(counts: np.ndarray) -> np.ndarray:
+        """Index of each row's last week with data (-1 if none)"""
+        has_data = counts > 0
+        last = counts.shape[1] - 1 - np.argmax(has_data[:, ::-1], axis=1)
+        return np.where(has_data.any(axis=1), last, -1)
+
+    def _evaluate_monitoring(self, groups: np.ndarray):
+        sums = {name: values[groups] for name, values in self._monitoring.items()}
+        sessions = sums['sessions']
+        rows = np.arange(len(groups))
+        latest = self._latest_weeks(sessions)
+        previous = np.maximum(latest - 1, 0)
+
+        def mean(name, week):
+            n = sessions[rows, week]
+            return np.divide(sums[name][rows, week], n, out=np.full(len(groups), np.nan),
+                             where=(n > 0) & (latest >= 0))
+
+        has_previous = latest > 0
+        engagement_now, engagement_before = mean('engagement', latest), mean('engagement', previous)
+        drop = np.where(has_previous, engagement_before - engagement_now, np.nan)
+        self._set('engagement_drop', groups, self._severity('engagement_drop', drop, True), drop,
+                  [f"Engagement fell {d:.1f} points to {e:.1f}/10 in week {w}"
+                   for d, e, w in zip(drop, engagement_now, latest)])
+        self._set('low_engagement', groups, self._severity('low_engagement', engagement_now, False), engagement_now,
+                  [f"Average engagement {e:.1f}/10 in week {w}" for e, w in zip(engagement_now, latest)])
+
+        speakers = mean('speakers', latest)
+        self._set('low_active_speakers', groups, self._severity('low_active_speakers', speakers, False), speakers,
+                  [f"Only {s:.1f} active speakers per session in week {w}" for s, w in zip(speakers, latest)])
+
+        off_topic_now = mean('off_topic', latest)
+        rise = np.where(has_previous, off_topic_now - mean('off_topic', previous), np.nan)
+        self._set('rising_off_topic', groups, self._severity('rising_off_topic', rise, True), rise,
+                  [f"Off-topic time up {r:.1f} min to {o:.1f} min per session"
+                   for r, o in zip(rise, off_topic_now)])
+
+    def _evaluate_participation(self, groups: np.ndarray):
+        state = self._participation
+        rows = np.arange(len(groups))
+        members = state['members'][groups]
+        latest = self._latest_weeks(members)
+        week = np.maximum(latest, 0)
+        n = members[rows, week]
+        group_mean = np.divide(state['contribution'][groups][rows, week], n,
+                               out=np.full(len(groups), np.nan), where=(n > 1) & (latest >= 0))
+        lowest = state['min_contribution'][groups, week]
+        share = np.divide(lowest, group_mean, out=np.full(len(groups), np.nan), where=group_mean > 0)
+        students = state['min_student'][groups, week]
+
+        # Normalized entropy of the contribution shares (1 = perfectly even)
+        evenness = np.where(latest >= 0, normalized_entropy(
+            n, state['contribution'][groups][rows, week], state['contribution_xlogx'][groups][rows, week]), np.nan)
+        self._set('uneven_contribution', groups, self._severity('uneven_contribution', evenness, False), evenness,
+                  [f"Contribution evenness {e:.2f} (1 = equal shares) in week {w}"
+                   for e, w in zip(evenness, latest)])
+
+        self._set('quiet_member', groups, self._severity('quiet_member', share, False), share,
+                  [f"Lowest contributor at {s:.0%} of the group average in week {w}"
+                   for s, w in zip(share, latest)],
+                  student_ids=students)
+
+    def _evaluate_conflicts(self, groups: np.ndarray):
+        high, medium = self._open_conflicts['High'][groups], self._open_conflicts['Medium'][groups]
+        severity = np.select([high >= self.rules['unresolved_conflict']['high'],
+                              medium >= self.rules['unresolved_conflict']['medium']], ['High', 'Medium'], default='')
+        self._set('unresolved_conflict', groups, severity, high + medium,
+                  [", ".join(f"{int(n)} {level}-severity" for n, level in [(h, 'high'), (m, 'medium')] if n)
+                   + f" conflict{'s' if h + m > 1 else ''} unresolved" for h, m in zip(high, medium)])
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def sync(self, tables: Dict[str, pd.DataFrame]):
+        """Fold in rows appended since the last sync and re-evaluate the groups they touch"""
+        handlers = {
+            'monitoring': (self._add_monitoring, self._evaluate_monitoring),
+            'participation': (self._add_participation, self._evaluate_participation),
+            'conflicts': (self._add_conflicts, self._evaluate_conflicts)
+        }
+        with self._lock:
+            for table, df in tables.items():
+                add, evaluate = handlers[table]
+                rows, self._watermarks[table], reset = appended_rows(df, self._watermarks.get(table))
+                if reset:
+                    self._reset(table)
+                groups = self._index.get_indexer(rows['group_id'])
+                known = groups >= 0
+                if not known.any():
+                    continue
+                add(groups[known], rows[known])
+                evaluate(np.unique(groups[known]))
+
+    def alerts(self) -> pd.DataFrame:
+        """Open alerts, most severe first"""
+        with self._lock:
+            alerts = pd.DataFrame(list(self._alerts.values()), columns=[
+                'group_id', 'rule', 'type', 'severity', 'value', 'detail', 'student_id',
+                'action', 'minutes', 'raised_at', 'updated_at'
+            ])
+        alerts['student_id'] = alerts['student_id'].fillna('')
+        alerts['rank'] = alerts['severity'].map(SEVERITY_RANK)
+        alerts['priority'] = alerts['rule'].map({rule: i for i, rule in enumerate(self.rules)})
+        return alerts.sort_values(['rank', 'priority', 'group_id'], ascending=[False, True, True]) \
+            .drop(columns=['rank', 'priority']).reset_index(drop=True)
+
+@st.cache_resource(show_spinner=False)
+def _alert_engine(partition: Partition, group_ids: tuple) -> AlertEngine:
+    """One long-lived engine per course section and set of groups, shared across sessions"""
+    return AlertEngine(group_ids)
+
+@st.cache_data(show_spinner=False)
+def _current_alerts(version: str) -> pd.DataFrame:
+    """Evaluate alerts; ``version`` is only part of the cache key"""
+    groups_df = load_table('groups')
+    engine = _alert_engine(active_partition(), tuple(groups_df['group_id']))
+    engine.sync({name: load_table(name) for name in ALERT_TABLES})
+    return engine.alerts()
+
+def load_alerts() -> pd.DataFrame:
+    """Open alerts for the current data, re-evaluated only when it changes"""
+    return _current_alerts(data_version('groups', *ALERT_TABLES))
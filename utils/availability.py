@@ -0,0 +1,143 @@
+"""
+Schedule-compatibility bitsets for the roster's availability field
+
+``students.csv`` stores availability as free text ("Afternoon, Morning,
+Evening", optionally with days such as "Mon Morning, Wed Evening"). This
+module parses it once into a 64-bit mask over weekly two-hour slots
+(7 days x 7 blocks from 08:00 to 22:00, bit = day * 7 + block), so
+team formation, TA scheduling and meeting recommendations can compute
+pairwise and group overlap with vectorized bit operations.
+"""
+
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+DAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+BLOCK_STARTS = [8, 10, 12, 14, 16, 18, 20]
+BLOCK_HOURS = 2
+N_SLOTS = len(DAYS) * len(BLOCK_STARTS)
+
+# Free-text periods and the two-hour blocks (indices into BLOCK_STARTS) they cover
+PERIOD_BLOCKS = {
+    'morning': [0, 1],
+    'afternoon': [2, 3, 4],
+    'evening': [5, 6]
+}
+
+DAY_ALIASES = {
+    **{day.lower(): [i] for i, day in enumerate(DAYS)},
+    'monday': [0], 'tuesday': [1], 'wednesday': [2], 'thursday': [3],
+    'friday': [4], 'saturday': [5], 'sunday': [6],
+    'weekday': [0, 1, 2, 3, 4], 'weekdays': [0, 1, 2, 3, 4],
+    'weekend': [5, 6], 'weekends': [5, 6]
+}
+
+_BYTE_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+def slot_bit(day: int, block: int) -> int:
+    """Bit index of one weekly slot"""
+    return day * len(BLOCK_STARTS) + block
+
+def slot_label(bit: int) -> str:
+    """Human-readable label of one slot bit, e.g. "Mon 08:00-10:00" """
+    day, block = divmod(bit, len(BLOCK_STARTS))
+    start = BLOCK_STARTS[block]
+    return f"{DAYS[day]} {start:02d}:00-{start + BLOCK_HOURS:02d}:00"
+
+def parse_availability_text(text: str) -> int:
+    """Parse one availability string into a slot mask.
+
+    Comma-separated entries combine a period (Morning/Afternoon/Evening)
+    with optional days; an entry without days applies to every day and an
+    entry with days but no period covers the whole day.
+    """
+    mask = 0
+    for entry in str(text).split(','):
+        words = re.findall(r'[a-z]+', entry.lower())
+        days = sorted({d for word in words for d in DAY_ALIASES.get(word, [])})
+        blocks = sorted({b for word in words for b in PERIOD_BLOCKS.get(word, [])})
+        if not days and not blocks:
+            continue
+        for day in days or range(len(DAYS)):
+            for block in blocks or range(len(BLOCK_STARTS)):
+                mask |= 1 << slot_bit(day, block)
+    return mask
+
+def availability_masks(availability: pd.Series) -> np.ndarray:
+    """Slot masks (uint64) for a column of availability strings.
+
+    Each distinct string is parsed once, so the cost is independent of
+    roster size beyond one categorical mapping.
+    """
+    categorical = pd.Categorical(availability.fillna("").astype(str))
+    parsed = np.array([parse_availability_text(text) for text in categorical.categories], dtype=np.uint64)
+    return np.where(categorical.codes >= 0, parsed[np.maximum(categorical.codes, 0)], np.uint64(0))
+
+def popcount(masks: np.ndarray) -> np.ndarray:
+    """Number of set bits of every uint64 mask"""
+    masks = np.ascontiguousarray(masks, dtype=np.uint64)
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(masks)
+    as_bytes = masks.view(np.uint8).reshape(masks.shape + (8,))
+    return _BYTE_POPCOUNT[as_bytes].sum(axis=-1, dtype=np.uint8)
+
+def slot_matrix(masks: np.ndarray) -> np.ndarray:
+    """Expand masks into a boolean (n_students, N_SLOTS) matrix"""
+    bits = np.uint64(1) << np.arange(N_SLOTS, dtype=np.uint64)
+    return (np.asarray(masks, dtype=np.uint64)[:, None] & bits) != 0
+
+def pairwise_overlap(masks: np.ndarray, other: Optional[np.ndarray] = None,
+                     block_size: int = 1024) -> np.ndarray:
+    """Number of shared slots for every pair of students.
+
+    Args:
+        masks: Slot masks of the row students
+        other: Slot masks of the column students (default: ``masks``)
+        block_size: Rows processed per step, bounding temporary memory
+
+    Returns:
+        uint8 matrix of shape (len(masks), len(other))
+    """
+    masks = np.asarray(masks, dtype=np.uint64)
+    other = masks if other is None else np.asarray(other, dtype=np.uint64)
+    overlap = np.empty((len(masks), len(other)), dtype=np.uint8)
+    for start in range(0, len(masks), block_size):
+        stop = start + block_size
+        overlap[start:stop] = popcount(masks[start:stop, None] & other[None, :])
+    return overlap
+
+def group_masks(masks: np.ndarray, group_of: np.ndarray, n_groups: Optional[int] = None) -> np.ndarray:
+    """Slots shared by every member of each group (AND over members).
+
+    Students with a negative group index are ignored; empty groups get 0.
+    """
+    masks = np.asarray(masks, dtype=np.uint64)
+    group_of = np.asarray(group_of)
+    placed = group_of >= 0
+    groups = group_of[placed]
+    n_groups = int(groups.max()) + 1 if n_groups is None and len(groups) else (n_groups or 0)
+
+    shared = np.zeros(n_groups, dtype=np.uint64)
+    if len(groups):
+        order = np.argsort(groups, kind='stable')
+        sorted_groups = groups[order]
+        starts = np.nonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])[0]
+        shared[sorted_groups[starts]] = np.bitwise_and.reduceat(masks[placed][order], starts)
+    return shared
+
+def group_overlap(masks: np.ndarray, group_of: np.ndarray, n_groups: Optional[int] = None) -> np.ndarray:
+    """Number of weekly slots shared by every member of each group"""
+    return popcount(group_masks(masks, group_of, n_groups))
+
+def mask_slots(mask: int) -> List[str]:
+    """Labels of every slot set in one mask, in weekly order"""
+    mask = int(mask)
+    return [slot_label(bit) for bit in range(N_SLOTS) if mask >> bit & 1]
+
+def meeting_suggestions(masks: np.ndarray, group_of: np.ndarray, n_groups: Optional[int] = None,
+                        limit: int = 3) -> Dict[int, List[str]]:
+    """Up to ``limit`` slots every member of each group can attend"""
+    return {g: mask_slots(mask)[:limit] for g, mask in enumerate(group_masks(masks, group_of, n_groups))}
@@ -5,14 +5,20 @@ Azure OpenAI integration utility for the AI-Enhanced Teaching Assistant Dashboar
 import streamlit as st
 from openai import AzureOpenAI
 from typing import Dict, List, Optional
+from collections import OrderedDict
+import hashlib
 import json
 import time
 
+# Maximum number of cached AI responses kept per process
+RESPONSE_CACHE_SIZE = 256
+
 class AzureOpenAIClient:
     """Client for Azure OpenAI API integration"""
     
     def __init__(self):
         """Initialize Azure OpenAI client with secrets from streamlit"""
+        self._response_cache = OrderedDict()
         try:
             self.api_key = st.secrets["openai"]["AZURE_OPENAI_4O_API_KEY"]
             self.endpoint = st.secrets["openai"]["AZURE_OPENAI_4O_ENDPOINT"]
@@ -42,7 +48,8 @@ class AzureOpenAIClient:
         context_data: Optional[Dict] = None,
         max_tokens: int = 1500,
         temperature: float = 0.7,
-        retry_attempts: int = 3
+        retry_attempts: int = 3,
+        data_version: Optional[str] = None
     ) -> str:
         """
         Generate AI response using Azure OpenAI
@@ -54,6 +61,8 @@ class AzureOpenAIClient:
             max_tokens: Maximum tokens in response
             temperature: Response creativity (0-1)
             retry_attempts: Number of retry attempts on failure
+            data_version: Version key of the data behind the prompt; when given,
+                successful responses are cached until that data changes
             
         Returns:
             Generated response string
@@ -61,6 +70,14 @@ class AzureOpenAIClient:
         if not self.is_available():
             return self._fallback_response(user_prompt)
         
+        cache_key = None
+        if data_version is not None:
+            cache_key = self._cache_key(system_prompt, user_prompt, context_data,
+                                        max_tokens, temperature, data_version)
+            if cache_key in self._response_cache:
+                self._response_cache.move_to_end(cache_key)
+                return self._response_cache[cache_key]
+        
         try:
             # Prepare messages
             messages = [
@@ -87,7 +104,10 @@ class AzureOpenAIClient:
                         presence_penalty=0
                     )
                     
-                    return response.choices[0].message.content.strip()
+                    content = response.choices[0].message.content.strip()
+                    if cache_key is not None:
+                        self._remember(cache_key, content)
+                    return content
                     
                 except Exception as e:
                     if "rate_limit" in str(e).lower():
@@ -107,6 +127,18 @@ class AzureOpenAIClient:
             st.error(f"Error generating AI response: {e}")
             return self._fallback_response(user_prompt)
     
+    def _cache_key(self, *parts) -> str:
+        """Stable hash of everything that determines a response"""
+        payload = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
+    def _remember(self, cache_key: str, content: str):
+        """Store a successful response, evicting the least recently used"""
+        self._response_cache[cache_key] = content
+        self._response_cache.move_to_end(cache_key)
+        while len(self._response_cache) > RESPONSE_CACHE_SIZE:
+            self._response_cache.popitem(last=False)
+    
     def _fallback_response(self, user_prompt: str) -> str:
         """Provide fallback response when AI is unavailable"""
         return f"""
@@ -0,0 +1,92 @@
+"""
+Paginated lists of HTML cards rendered in one block per page
+
+The dashboards used to show a list of groups or students by calling
+``iterrows()`` and emitting one ``st.markdown`` per row, which costs a
+Python loop over the whole frame plus one websocket delta per card.
+``card_list`` instead fills a card template column by column for the
+rows of the current page only, joins the cards into a single HTML string
+and sends it as one element inside a fixed-height, scrollable container.
+The work per rerun is therefore bounded by the page size, not by the
+length of the list.
+"""
+
+import html
+import string
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+DEFAULT_PAGE_SIZE = 10
+
+def _template_parts(template: str) -> List[Tuple[str, Optional[str], str]]:
+    """``(literal, field, format_spec)`` pieces of a ``str.format`` template, on one line.
+
+    The template is collapsed onto a single line because a blank line would
+    end the HTML block in Markdown and print the rest of the cards as text.
+    """
+    flat = "".join(line.strip() for line in template.strip().splitlines())
+    return [(literal, field, spec or '') for literal, field, spec, _ in string.Formatter().parse(flat)]
+
+def _column_text(values: pd.Series, spec: str) -> np.ndarray:
+    """Formatted, HTML-escaped text of one column"""
+    if spec:
+        text = [format(value, spec) for value in values]
+    else:
+        text = values.astype(str).tolist()
+    return np.array([html.escape(t, quote=True) for t in text], dtype=object)
+
+def card_html(rows: pd.DataFrame, template: str) -> str:
+    """One card per row of ``rows``, concatenated into a single HTML string.
+
+    Args:
+        rows: Rows to render; every field of ``template`` must be a column
+        template: ``str.format`` template of one card, e.g.
+            ``'<div class="{css_class}"><strong>{name}</strong> {score:.1f}</div>'``
+
+    Returns:
+        HTML of all cards; field values are escaped
+    """
+    if rows.empty:
+        return ""
+    cards = np.full(len(rows), "", dtype=object)
+    for literal, field, spec in _template_parts(template):
+        cards = cards + literal
+        if field is not None:
+            cards = cards + _column_text(rows[field], spec)
+    return "".join(cards)
+
+def card_list(rows: pd.DataFrame, template: str, key: str, page_size: int = DEFAULT_PAGE_SIZE,
+              height: Optional[int] = None, empty_message: Optional[str] = None):
+    """Render ``rows`` as a paginated list of cards.
+
+    Args:
+        rows: Rows to render, already filtered and sorted
+        template: Card template, see ``card_html``
+        key: Unique widget key of the page selector
+        page_size: Cards per page
+        height: Height in pixels of the scrollable container (None to fit the page)
+        empty_message: Shown instead when there are no rows
+    """
+    if rows.empty:
+        if empty_message:
+            st.markdown(empty_message)
+        return
+
+    n_pages = -(-len(rows) // page_size)
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > n_pages:
+        # The list shrank since the page was picked
+        st.session_state[page_key] = n_pages
+    page = 1
+    if n_pages > 1:
+        page = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, step=1, key=page_key)
+
+    start = (page - 1) * page_size
+    shown = rows.iloc[start:start + page_size]
+    container = st.container(height=height) if height else st.container()
+    container.markdown(card_html(shown, template), unsafe_allow_html=True)
+    if n_pages > 1:
+        st.caption(f"Showing {start + 1}–{start + len(shown)} of {len(rows)}")
@@ -0,0 +1,68 @@
+"""
+Course and section selection for dashboard sessions
+
+``course_selector`` lets a session pick one section of one course from the
+``COURSES`` registry and records it as the active partition, which every
+loader, version key and long-lived engine then resolves against.
+``course_context`` describes the selected section from its own roster, for
+page headers and AI prompts.
+"""
+
+from typing import Dict
+
+import streamlit as st
+
+from constants import COURSES
+from .data_loader import load_table
+from .partitions import Partition, PARTITION_KEY, active_partition, available_sections, partition_key
+
+def course_selector() -> Partition:
+    """Render the sidebar course/section picker and return the selected partition.
+
+    Call it at the top of every page, before any data is loaded. The choice
+    is kept in ``st.session_state`` so it carries over between pages.
+    """
+    course, section = active_partition()
+    courses = [c for c in COURSES if available_sections(c)] or [course]
+    if course not in courses:
+        course = courses[0]
+
+    st.sidebar.markdown("### 📚 Course")
+    if len(courses) > 1:
+        course = st.sidebar.selectbox("Course:", courses, index=courses.index(course),
+                                      format_func=lambda c: COURSES[c]['name'], key="course_select")
+    sections = available_sections(course) or [section]
+    if section not in sections:
+        section = sections[0]
+    if len(sections) > 1:
+        section = st.sidebar.selectbox("Section:", sections, index=sections.index(section),
+                                       key=f"section_select_{course}")
+    else:
+        st.sidebar.caption(f"{COURSES[course]['name']} · Section {section}")
+
+    st.session_state[PARTITION_KEY] = (course, section)
+    return course, section
+
+def course_config() -> Dict:
+    """``COURSES`` entry of the active course"""
+    return COURSES[active_partition()[0]]
+
+def course_context() -> Dict:
+    """Name, size and format of the active course section, with class size read from its roster"""
+    course, section = active_partition()
+    config = course_config()
+    students_df = load_table('students')
+    n_students = len(students_df)
+    n_groups = students_df['group_id'].nunique()
+    return {
+        'course': f"{config['institution']} {config['name']} course",
+        'name': config['name'],
+        'institution': config['institution'],
+        'section': section,
+        'partition': partition_key((course, section)),
+        'class_size': f"{n_students} students in {n_groups} groups of {config['students_per_group']}",
+        'n_students': n_students,
+        'n_groups': n_groups,
+        'group_size': config['students_per_group'],
+        'weeks': config['project_duration_weeks']
+    }
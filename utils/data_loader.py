@@ -0,0 +1,46 @@
+"""
+Version-keyed table loading for the dashboard pages
+
+Tables are read from the course section partition selected in the session
+(see ``utils.partitions``), so a session only ever holds its own section.
+"""
+
+from typing import Optional
+
+import pandas as pd
+import streamlit as st
+
+from .partitions import table_path
+from .data_versions import table_version, data_version
+
+@st.cache_data(show_spinner=False)
+def _read_table(path: str, version: str) -> pd.DataFrame:
+    """Read a table file; ``version`` is only part of the cache key"""
+    return pd.read_csv(path)
+
+def load_table(name: str) -> pd.DataFrame:
+    """Load one ``DATA_PATHS`` table of the active section, re-reading it only when its content changed"""
+    return _read_table(table_path(name), table_version(name))
+
+def load_tables(*names: str):
+    """Load several tables at once, in the order given"""
+    return tuple(load_table(name) for name in names)
+
+def _row_fingerprint(df: pd.DataFrame, position: int) -> tuple:
+    return tuple(df.iloc[position].astype(str))
+
+def appended_rows(df: pd.DataFrame, watermark: Optional[tuple] = None):
+    """Rows added to an append-only table since ``watermark``.
+
+    Returns ``(rows, watermark, reset)``. The watermark records how many
+    rows were seen and the last of them; if that row is no longer in place
+    (the table was regenerated), ``reset`` is True and ``rows`` is the
+    whole table.
+    """
+    n_seen, last_row = watermark or (0, None)
+    reset = bool(n_seen) and (len(df) < n_seen or _row_fingerprint(df, n_seen - 1) != last_row)
+    start = 0 if reset else n_seen
+    new_watermark = (len(df), _row_fingerprint(df, len(df) - 1) if len(df) else None)
+    return df.iloc[start:], new_watermark, reset
+
+__all__ = ['load_table', 'load_tables', 'appended_rows', 'table_version', 'data_version']
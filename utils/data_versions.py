@@ -0,0 +1,186 @@
+"""
+Table-level data version manifest for cache invalidation
+
+The manifest (``DATA_MANIFEST_PATH``, one per course section partition)
+records, for every table in ``DATA_PATHS``, a content hash, row count,
+schema hash, mtime, size and a sample hash of the file's first and last
+blocks. Caches key on ``table_version(name)`` so regenerating one CSV only
+invalidates the loaders, aggregates and AI responses that actually read it.
+
+An entry is trusted only while the file's ``(mtime_ns, size)`` still
+matches it; any other file state is re-hashed in full. In a fresh checkout,
+where every file has a new mtime, the sample hash picks out the entries
+worth confirming, and once the full hash confirms them their mtime is
+refreshed in the manifest, so the re-hash is paid once rather than on
+every start.
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Iterable, Optional, Tuple
+
+from constants import DATA_PATHS
+from .partitions import Partition, active_partition, partition_key, table_path, manifest_path
+
+_CHUNK_SIZE = 1 << 20
+# Bytes read from each end of a file for its sample hash
+_SAMPLE_SIZE = 1 << 16
+
+# (path, mtime_ns, size) -> entry, so unchanged files are hashed once per process
+_entry_cache: Dict[tuple, Dict] = {}
+# (path, mtime_ns, size) -> version, so a manifest entry is validated once per file state
+_version_cache: Dict[tuple, str] = {}
+# Manifest path -> ((mtime_ns, size), parsed manifest)
+_manifest_cache: Dict[str, Tuple[tuple, Dict[str, Dict]]] = {}
+
+def _file_key(path) -> Optional[tuple]:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (str(path), stat.st_mtime_ns, stat.st_size)
+
+def sample_hash(path, size: int) -> str:
+    """Hash of the size and the first and last ``_SAMPLE_SIZE`` bytes of a file"""
+    sample = hashlib.sha256(str(size).encode())
+    with open(path, 'rb') as f:
+        sample.update(f.read(_SAMPLE_SIZE))
+        if size > _SAMPLE_SIZE:
+            f.seek(max(_SAMPLE_SIZE, size - _SAMPLE_SIZE))
+            sample.update(f.read(_SAMPLE_SIZE))
+    return sample.hexdigest()
+
+def compute_table_entry(path) -> Optional[Dict]:
+    """Hash one table file; returns None if the file does not exist"""
+    cache_key = _file_key(path)
+    if cache_key is None:
+        return None
+    if cache_key in _entry_cache:
+        return _entry_cache[cache_key]
+
+    content_hash = hashlib.sha256()
+    newlines = 0
+    header = b""
+    last_byte = b"\n"
+    with open(path, 'rb') as f:
+        while chunk := f.read(_CHUNK_SIZE):
+            if not header:
+                header = chunk.split(b"\n", 1)[0]
+            content_hash.update(chunk)
+            newlines += chunk.count(b"\n")
+            last_byte = chunk[-1:]
+
+    # A final line without a trailing newline is still a row
+    line_count = newlines + (0 if last_byte == b"\n" else 1)
+
+    entry = {
+        'content_hash': content_hash.hexdigest(),
+        'row_count': max(0, line_count - 1),
+        'schema_hash': hashlib.sha256(header.strip()).hexdigest(),
+        'mtime_ns': cache_key[1],
+        'size': cache_key[2],
+        'sample_hash': sample_hash(path, cache_key[2])
+    }
+    _entry_cache[cache_key] = entry
+    return entry
+
+def load_manifest(partition: Optional[Partition] = None) -> Dict[str, Dict]:
+    """Read the manifest of ``partition`` (default: the active one); an absent or unreadable manifest is empty.
+
+    The parsed manifest is reused until the file's mtime or size changes.
+    """
+    path = manifest_path(partition)
+    file_key = _file_key(path)
+    if file_key is None:
+        return {}
+    cached = _manifest_cache.get(path)
+    if cached is not None and cached[0] == file_key:
+        return cached[1]
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        manifest = {}
+    _manifest_cache[path] = (file_key, manifest)
+    return manifest
+
+def write_manifest(tables: Optional[Iterable[str]] = None, partition: Optional[Partition] = None) -> Dict[str, Dict]:
+    """Refresh manifest entries for ``tables`` (default: all) of ``partition`` and save it.
+
+    Entries for tables that were not touched are kept as they are, so a
+    partial regeneration only changes the versions it actually affected.
+    """
+    partition = partition or active_partition()
+    manifest = dict(load_manifest(partition))
+    for name in (tables if tables is not None else DATA_PATHS):
+        entry = compute_table_entry(table_path(name, partition))
+        if entry is None:
+            manifest.pop(name, None)
+        else:
+            manifest[name] = entry
+
+    _save_manifest(manifest, partition)
+    return manifest
+
+def _save_manifest(manifest: Dict[str, Dict], partition: Partition):
+    # Write then rename, so a concurrent reader never sees half a manifest
+    path = manifest_path(partition)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(dict(sorted(manifest.items())), f, indent=2)
+    os.replace(tmp_path, path)
+
+def _confirm_mtime(name: str, entry: Dict, partition: Partition):
+    """Record the new mtime of a file whose content the full hash confirmed unchanged"""
+    manifest = dict(load_manifest(partition))
+    if manifest.get(name, {}).get('content_hash') != entry['content_hash']:
+        return
+    manifest[name] = entry
+    try:
+        _save_manifest(manifest, partition)
+    except OSError:
+        # A read-only checkout just pays the re-hash again next process
+        pass
+
+def table_version(name: str, partition: Optional[Partition] = None) -> str:
+    """Short content version of one table of ``partition`` (default: the active one), used as a cache key.
+
+    The manifest entry is trusted only when its mtime and size still match
+    the file on disk; otherwise the file is re-hashed, so a CSV edited
+    without updating the manifest always gets a new version. When the
+    re-hash finds the content unchanged (a fresh checkout or a ``touch``),
+    the entry's mtime is refreshed so later processes trust it again. The
+    outcome is remembered until the file's mtime or size changes, so a
+    rerun costs one ``stat`` per table.
+    """
+    partition = partition or active_partition()
+    path = table_path(name, partition)
+    file_key = _file_key(path)
+    if file_key is None:
+        return "missing"
+    if file_key in _version_cache:
+        return _version_cache[file_key]
+
+    _, mtime_ns, size = file_key
+    entry = load_manifest(partition).get(name)
+    if not entry or entry.get('mtime_ns') != mtime_ns or entry.get('size') != size:
+        # Only a sample match is worth confirming; anything else is new content
+        confirm = bool(entry) and entry.get('size') == size and entry.get('sample_hash') == sample_hash(path, size)
+        stored_hash = entry.get('content_hash') if entry else None
+        entry = compute_table_entry(path)
+        if confirm and entry['content_hash'] == stored_hash:
+            _confirm_mtime(name, entry, partition)
+    version = entry['content_hash'][:16]
+    _version_cache[file_key] = version
+    return version
+
+def data_version(*names: str, partition: Optional[Partition] = None) -> str:
+    """Combined version key for everything derived from ``names`` in ``partition`` (default: the active one).
+
+    The key starts with the partition, so sections with identical tables
+    still get separate cache entries.
+    """
+    partition = partition or active_partition()
+    return "|".join([partition_key(partition)] +
+                    [f"{name}:{table_version(name, partition)}" for name in sorted(names)])
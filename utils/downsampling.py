@@ -0,0 +1,141 @@
+"""
+Point-budgeted time-series traces for Plotly charts
+
+A chart cannot show more points than it has pixels, yet the monitoring
+timeline used to ship every raw event to the browser. These helpers reduce
+each series to a fixed point budget before plotting, either with
+Largest-Triangle-Three-Buckets (keeps the visual shape of a line) or
+per-bucket min/max (keeps every extreme), and switch to WebGL
+(``Scattergl``) traces once a figure still carries many points. The
+payload therefore stays bounded by the budget rather than by history
+length; zooming re-queries the raw rows of the visible range, which are
+again downsampled only if they exceed the budget.
+"""
+
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.express as px
+
+# Points kept across all traces of one chart (roughly its width in pixels, x2)
+POINT_BUDGET = 4000
+# Fewest points a single trace is reduced to, however many traces share the budget
+MIN_TRACE_POINTS = 200
+# Figures with more points than this are drawn with WebGL traces
+WEBGL_THRESHOLD = 2000
+
+def _numeric(values) -> np.ndarray:
+    """Float view of numeric or datetime values (datetimes as ns since epoch)"""
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype('datetime64[ns]').astype(np.int64).astype(float)
+    return values.astype(float)
+
+def lttb_indices(x, y, n_out: int) -> np.ndarray:
+    """Indices of the points Largest-Triangle-Three-Buckets keeps.
+
+    Args:
+        x: Sorted x values (numeric or datetime)
+        y: y values
+        n_out: Number of points to keep (at least 3)
+
+    The first and last points are always kept; every bucket in between
+    contributes the point forming the largest triangle with the previously
+    kept point and the mean of the next bucket.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x, y = _numeric(x), _numeric(y)
+
+    # Interior points split into n_out - 2 buckets; the last point is a bucket of its own
+    edges = np.r_[(np.arange(n_out - 1) * (n - 2) / (n_out - 2)).astype(np.int64) + 1, n]
+    sizes = np.diff(edges)
+    mean_x = np.add.reduceat(x, edges[:-1]) / sizes
+    mean_y = np.add.reduceat(y, edges[:-1]) / sizes
+
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        area = np.abs((x[a] - mean_x[i + 1]) * (y[start:stop] - y[a]) -
+                      (x[a] - x[start:stop]) * (mean_y[i + 1] - y[a]))
+        a = start + int(np.argmax(area))
+        kept[i + 1] = a
+    return kept
+
+def minmax_indices(x, y, n_out: int) -> np.ndarray:
+    """Indices of the minimum and maximum of each of ``n_out // 2`` equal-count buckets"""
+    n = len(x)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+    y = _numeric(y)
+    buckets = np.arange(n) * (n_out // 2) // n
+    order = np.lexsort((y, buckets))
+    sorted_buckets = buckets[order]
+    first = np.r_[True, sorted_buckets[1:] != sorted_buckets[:-1]]
+    last = np.r_[sorted_buckets[1:] != sorted_buckets[:-1], True]
+    return np.unique(np.r_[0, order[first], order[last], n - 1])
+
+def downsample_indices(x, y, n_out: int, method: str = 'lttb') -> np.ndarray:
+    """Indices of at most ``n_out`` points representing a series sorted by ``x``"""
+    if method == 'lttb':
+        return lttb_indices(x, y, n_out)
+    if method == 'minmax':
+        return minmax_indices(x, y, n_out)
+    raise ValueError(f"Unknown downsampling method: {method}")
+
+def trace_budget(n_traces: int, budget: int = POINT_BUDGET) -> int:
+    """Points each of ``n_traces`` traces may keep"""
+    return max(budget // max(n_traces, 1), MIN_TRACE_POINTS)
+
+def downsample(df: pd.DataFrame, x: str, y: str, by: Optional[str] = None,
+               budget: int = POINT_BUDGET, method: str = 'lttb') -> pd.DataFrame:
+    """Rows of ``df`` kept when every ``by`` series is reduced to its share of ``budget``"""
+    df = df.dropna(subset=[y]).sort_values([by, x] if by else [x], kind='stable')
+    groups = [df] if by is None else [group for _, group in df.groupby(by, sort=False)]
+    n_out = trace_budget(len(groups), budget)
+    kept = [group.iloc[downsample_indices(group[x].to_numpy(), group[y].to_numpy(), n_out, method)]
+            for group in groups]
+    return pd.concat(kept) if kept else df
+
+def in_range(df: pd.DataFrame, x: str, x_range: Optional[Tuple]) -> pd.DataFrame:
+    """Rows whose ``x`` lies within ``x_range`` (inclusive); all rows if no range"""
+    if not x_range:
+        return df
+    low, high = (pd.Timestamp(v) for v in x_range) if np.issubdtype(df[x].dtype, np.datetime64) else x_range
+    return df[(df[x] >= low) & (df[x] <= high)]
+
+def line_trace(x, y, use_webgl: bool, **kwargs):
+    """A line trace, drawn with WebGL when ``use_webgl``"""
+    trace = go.Scattergl if use_webgl else go.Scatter
+    return trace(x=x, y=y, mode=kwargs.pop('mode', 'lines'), **kwargs)
+
+def time_series_figure(df: pd.DataFrame, x: str, y: str, color: Optional[str] = None,
+                       title: Optional[str] = None, x_range: Optional[Tuple] = None,
+                       budget: int = POINT_BUDGET, method: str = 'lttb',
+                       colors: Optional[Sequence[str]] = None) -> go.Figure:
+    """Downsampled line chart with one trace per ``color`` value, like ``px.line``.
+
+    Only rows within ``x_range`` are considered, so a zoomed chart shows
+    that range at full resolution whenever it fits the budget.
+    """
+    visible = in_range(df, x, x_range)
+    reduced = downsample(visible, x, y, by=color, budget=budget, method=method)
+    use_webgl = len(reduced) > WEBGL_THRESHOLD
+    colors = list(colors or px.colors.qualitative.Plotly)
+
+    fig = go.Figure()
+    series = [(None, reduced)] if color is None else list(reduced.groupby(color, sort=False))
+    for i, (name, group) in enumerate(series):
+        fig.add_trace(line_trace(group[x], group[y], use_webgl, name=str(name) if name is not None else y,
+                                 line=dict(color=colors[i % len(colors)]), legendgroup=str(name),
+                                 showlegend=color is not None))
+    fig.update_layout(title=title, xaxis_title=x, yaxis_title=y, legend_title_text=color or '')
+    if x_range:
+        fig.update_xaxes(range=list(x_range))
+    fig.layout.meta = {'raw_points': len(visible), 'plotted_points': len(reduced)}
+    return fig
@@ -0,0 +1,163 @@
+"""
+Participation equity (Gini, Theil, normalized entropy) per group and week
+
+Equal Participation used to judge a group by the standard deviation of one
+week's contribution percentages. ``EquityMatrix`` instead computes three
+inequality measures of contribution, speaking time, commits and edits for
+every (group, week) in one vectorized pass over ``participation.csv``: the
+rows are ranked within their cell by one lexsort per metric, and every
+statistic is assembled from ``np.bincount`` sums. The result is a dense float32 array indexed by
+(group, week, metric, measure), so any slice is a NumPy index rather than
+a groupby.
+"""
+
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from .data_loader import load_table, data_version
+
+# participation column -> display label
+EQUITY_COLUMNS = {
+    'contribution_percentage': 'Contribution',
+    'meeting_speaking_time': 'Speaking Time',
+    'code_commits': 'Commits',
+    'document_edits': 'Document Edits'
+}
+
+# measure -> (display label, True if higher means more equal)
+EQUITY_MEASURES = {
+    'gini': ('Gini', False),
+    'theil': ('Theil', False),
+    'entropy': ('Normalized Entropy', True)
+}
+
+def xlogx(x: np.ndarray) -> np.ndarray:
+    """x * ln(x) with the limit 0 at x = 0"""
+    x = np.asarray(x, dtype=float)
+    return np.where(x > 0, x * np.log(np.where(x > 0, x, 1.0)), 0.0)
+
+def normalized_entropy(count: np.ndarray, total: np.ndarray, xlogx_sum: np.ndarray) -> np.ndarray:
+    """Entropy of the shares x / sum(x), divided by its maximum ln(n).
+
+    Only needs the additive sums n, sum(x) and sum(x ln x), so callers that
+    aggregate incrementally can evaluate it without keeping the values.
+    1 means perfectly even shares; NaN where the total is zero.
+    """
+    count, total, xlogx_sum = (np.asarray(a, dtype=float) for a in (count, total, xlogx_sum))
+    safe_total = np.where(total > 0, total, 1.0)
+    entropy = np.log(safe_total) - xlogx_sum / safe_total
+    normalized = np.divide(entropy, np.log(np.maximum(count, 1)),
+                           out=np.ones_like(entropy), where=count > 1)
+    return np.where(total > 0, normalized, np.nan)
+
+def inequality(values: np.ndarray, cells: np.ndarray, n_cells: int) -> np.ndarray:
+    """Gini, Theil and normalized entropy of ``values`` within each cell.
+
+    Args:
+        values: Non-negative values, shape (n_rows, n_metrics)
+        cells: Cell index (0 .. n_cells-1) of every row
+        n_cells: Number of cells
+
+    Returns:
+        Array of shape (n_cells, n_metrics, 3) in ``EQUITY_MEASURES`` order;
+        NaN where a cell has no rows or a zero total.
+    """
+    values = np.asarray(values, dtype=float)
+    cells = np.asarray(cells, dtype=np.int64)
+    n_metrics = values.shape[1]
+    out = np.full((n_cells, n_metrics, 3), np.nan)
+    if not len(values):
+        return out
+
+    counts = np.bincount(cells, minlength=n_cells).astype(float)
+    # Rank of each row within its cell once the cell is sorted by value
+    for m in range(n_metrics):
+        x = values[:, m]
+        order = np.lexsort((x, cells))
+        sorted_cells, sorted_x = cells[order], x[order]
+        starts = np.searchsorted(sorted_cells, sorted_cells, side='left')
+        rank = np.arange(1, len(x) + 1) - starts
+
+        total = np.bincount(cells, weights=x, minlength=n_cells)
+        ranked = np.bincount(sorted_cells, weights=rank * sorted_x, minlength=n_cells)
+        x_log_x = np.bincount(cells, weights=xlogx(x), minlength=n_cells)
+
+        valid = (counts > 0) & (total > 0)
+        n, s = counts[valid], total[valid]
+        # Gini = 2 * sum(i * x_(i)) / (n * sum(x)) - (n + 1) / n
+        out[valid, m, 0] = 2 * ranked[valid] / (n * s) - (n + 1) / n
+        # Theil T = sum(x ln x) / sum(x) - ln(mean)
+        out[valid, m, 1] = x_log_x[valid] / s - np.log(s / n)
+        out[valid, m, 2] = normalized_entropy(n, s, x_log_x[valid])
+    return out
+
+class EquityMatrix:
+    """Equity measures for every (group, week), sliceable without recomputation"""
+
+    def __init__(self, participation_df: pd.DataFrame, columns: Optional[Iterable[str]] = None):
+        """
+        Args:
+            participation_df: Rows of ``participation.csv``
+            columns: Participation columns to measure (default: ``EQUITY_COLUMNS``)
+        """
+        self.metrics = list(columns or EQUITY_COLUMNS)
+        self.measures = list(EQUITY_MEASURES)
+
+        group_codes, groups = pd.factorize(participation_df['group_id'], sort=True)
+        weeks = participation_df['week'].to_numpy(dtype=np.int64)
+        self.groups = pd.Index(groups, name='group_id')
+        self.weeks = pd.Index(np.unique(weeks), name='week')
+        week_codes = self.weeks.get_indexer(weeks)
+
+        # Negative speaking times are generator noise; treat them as silence
+        values = participation_df[self.metrics].to_numpy(dtype=float).clip(min=0)
+        cells = group_codes * len(self.weeks) + week_codes
+        self.values = inequality(values, cells, len(self.groups) * len(self.weeks)) \
+            .reshape(len(self.groups), len(self.weeks), len(self.metrics), len(self.measures)) \
+            .astype(np.float32)
+
+    def _positions(self, index: pd.Index, labels) -> np.ndarray:
+        if labels is None:
+            return np.arange(len(index))
+        positions = index.get_indexer(np.atleast_1d(labels))
+        return positions[positions >= 0]
+
+    def frame(self, metric: str = 'contribution_percentage', groups=None, weeks=None) -> pd.DataFrame:
+        """Long table of one metric's measures: group_id, week, gini, theil, entropy"""
+        g = self._positions(self.groups, groups)
+        w = self._positions(self.weeks, weeks)
+        block = self.values[np.ix_(g, w)][:, :, self.metrics.index(metric)]
+        frame = pd.DataFrame(block.reshape(-1, len(self.measures)), columns=self.measures)
+        frame.insert(0, 'week', np.tile(self.weeks[w], len(g)))
+        frame.insert(0, 'group_id', np.repeat(self.groups[g], len(w)))
+        return frame.dropna(subset=self.measures, how='all').reset_index(drop=True)
+
+    def summary(self, measure: str = 'gini', weeks=None) -> pd.DataFrame:
+        """Per-metric mean of ``measure`` over groups for each week"""
+        w = self._positions(self.weeks, weeks)
+        block = self.values[:, w][..., self.measures.index(measure)]
+        with np.errstate(invalid='ignore'):
+            means = np.nanmean(block, axis=0) if len(self.groups) else np.full((len(w), len(self.metrics)), np.nan)
+        return pd.DataFrame(means, columns=self.metrics, index=self.weeks[w])
+
+    def latest(self, metric: str = 'contribution_percentage') -> pd.DataFrame:
+        """Each group's measures in its most recent week with data"""
+        block = self.values[:, :, self.metrics.index(metric)]
+        has_data = ~np.isnan(block).all(axis=2)
+        last = block.shape[1] - 1 - np.argmax(has_data[:, ::-1], axis=1)
+        frame = pd.DataFrame(block[np.arange(len(self.groups)), last], columns=self.measures,
+                             index=self.groups)
+        frame.insert(0, 'week', self.weeks[last] if len(self.weeks) else [])
+        return frame[has_data.any(axis=1)]
+
+@st.cache_data(show_spinner=False)
+def _equity(version: str) -> EquityMatrix:
+    """Compute the equity matrix; ``version`` is only part of the cache key"""
+    return EquityMatrix(load_table('participation'))
+
+def load_equity() -> EquityMatrix:
+    """Equity measures for the current participation data, recomputed only when it changes"""
+    return _equity(data_version('participation'))
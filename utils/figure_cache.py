@@ -0,0 +1,122 @@
+"""
+Serialized Plotly figure cache keyed on chart, data version and filters
+
+Every widget interaction reruns the whole page, and building Plotly
+figures (trace validation in particular) dominates that rerun on the
+larger pages. ``cached_figure`` stores each figure's JSON under
+(chart id, data version of the tables it reads, the filter values it
+depends on, a fingerprint of the builder's code) and, on a hit, re-hydrates
+it without validation, which is an order of magnitude cheaper than
+rebuilding. Charts whose inputs did not change are therefore served
+as-is while the widget that did change only rebuilds its own chart.
+
+A miss first looks for a pre-rendered snapshot of the figure (see
+``utils.snapshots``), so default-state charts survive a server restart.
+"""
+
+import hashlib
+import json
+import threading
+import types
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional
+
+import plotly.graph_objects as go
+import streamlit as st
+
+from .data_loader import data_version
+from .snapshots import is_recording, load_snapshot, save_snapshot
+
+def _from_json(spec: str) -> go.Figure:
+    # The JSON came from a validated figure, so skip validating it again
+    return go.Figure(**json.loads(spec), _validate=False)
+
+class FigureCache:
+    """Thread-safe LRU of figure JSON strings"""
+
+    def __init__(self, max_entries: int = 256):
+        """
+        Args:
+            max_entries: Figures kept before the least recently used is evicted
+        """
+        self.max_entries = max_entries
+        self._figures: "OrderedDict[tuple, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._figures)
+
+    def get(self, key: tuple) -> Optional[go.Figure]:
+        """Cached figure for ``key``, or None"""
+        with self._lock:
+            spec = self._figures.get(key)
+            if spec is None:
+                self.misses += 1
+                return None
+            self._figures.move_to_end(key)
+            self.hits += 1
+        return _from_json(spec)
+
+    def put(self, key: tuple, figure: go.Figure) -> str:
+        """Cache ``figure`` and return its JSON"""
+        spec = figure.to_json()
+        self.put_json(key, spec)
+        return spec
+
+    def put_json(self, key: tuple, spec: str):
+        with self._lock:
+            self._figures[key] = spec
+            self._figures.move_to_end(key)
+            while len(self._figures) > self.max_entries:
+                self._figures.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._figures.clear()
+
+@st.cache_resource(show_spinner=False)
+def figure_cache() -> FigureCache:
+    """Process-wide figure cache, shared across sessions"""
+    return FigureCache()
+
+def _builder_fingerprint(build: Callable) -> str:
+    """Hash of the builder's code, so editing a chart invalidates its cached figure"""
+    code = getattr(build, '__code__', None)
+    if code is None:
+        return getattr(build, '__qualname__', repr(type(build)))
+    constants = [c for c in code.co_consts if not isinstance(c, types.CodeType)]
+    return hashlib.sha1(code.co_code + repr((constants, code.co_names)).encode()).hexdigest()[:12]
+
+def cached_figure(chart_id: str, build: Callable[..., go.Figure], *args, tables: Iterable[str] = (),
+                  filters: Optional[dict] = None) -> go.Figure:
+    """Return the figure ``build(*args)`` would produce, building it only on a cache miss.
+
+    Args:
+        chart_id: Stable, unique name of the chart
+        build: Function that builds the figure
+        *args: Passed to ``build``; not part of the key
+        tables: ``DATA_PATHS`` tables the figure is derived from
+        filters: Widget values the figure depends on (JSON-serializable)
+
+    ``args`` are expected to be derived from ``tables`` and ``filters``, so
+    callers must list every table and filter the figure depends on.
+    """
+    tables = tuple(tables)
+    key = (chart_id, data_version(*tables) if tables else '',
+           json.dumps(filters or {}, sort_keys=True, default=str), _builder_fingerprint(build))
+    cache = figure_cache()
+    figure = cache.get(key)
+    spec = None
+    if figure is None:
+        spec = load_snapshot(key)
+        if spec is not None:
+            cache.put_json(key, spec)
+            figure = _from_json(spec)
+        else:
+            figure = build(*args)
+            spec = cache.put(key, figure)
+    if is_recording():
+        save_snapshot(key, spec or figure.to_json())
+    return figure
@@ -0,0 +1,234 @@
+"""
+Collaboration-network analytics over student-student interactions
+
+``interactions.csv`` records who worked with whom, for how long and how
+well. ``InteractionGraph`` keeps those edges as a sparse, undirected
+adjacency matrix in coordinate (COO) form: parallel arrays of endpoints
+and weights (duration_minutes x quality_rating / 10) that grow
+geometrically as edges are appended and are coalesced lazily so repeated
+pairs collapse into one entry. Every analytic is a sparse matrix-vector
+product built from ``np.bincount`` (degree, weighted strength, PageRank
+centrality by power iteration, cross-group traffic), so the cost is
+linear in the number of distinct pairs and millions of edges stay cheap.
+"""
+
+import threading
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from .data_loader import load_table, appended_rows, data_version
+from .partitions import Partition, active_partition
+
+# A student whose interaction strength is below this share of their group's
+# median is flagged as isolated; no interactions at all is always isolated.
+ISOLATION_RATIO = 0.5
+
+class InteractionGraph:
+    """Weighted, undirected student interaction graph with incremental edge appends"""
+
+    def __init__(self, student_ids: Iterable[str], group_ids: Iterable[str]):
+        """
+        Args:
+            student_ids: Students (graph nodes), in output order
+            group_ids: Group of every student, aligned with ``student_ids``
+        """
+        self.student_ids = pd.Index(list(student_ids), name='student_id')
+        group_codes, self.groups = pd.factorize(pd.Series(list(group_ids), dtype=object), use_na_sentinel=False)
+        self.group_of = group_codes.astype(np.int64)
+        self._lock = threading.Lock()
+        self._watermark: Optional[tuple] = None
+        self._reset()
+
+    def _reset(self):
+        self._rows = np.empty(1024, dtype=np.int64)
+        self._cols = np.empty(1024, dtype=np.int64)
+        self._weights = np.empty(1024)
+        self._interactions = np.empty(1024, dtype=np.int64)
+        self._size = 0
+        # Edges before this position are coalesced (unique pairs, rows < cols)
+        self._coalesced = 0
+
+    def __len__(self) -> int:
+        """Number of distinct interacting pairs"""
+        self._coalesce()
+        return self._size
+
+    # ------------------------------------------------------------------
+    # Edges
+    # ------------------------------------------------------------------
+
+    def add_edges(self, student1: np.ndarray, student2: np.ndarray, weights: np.ndarray) -> int:
+        """Append interactions; returns how many had two known, distinct students"""
+        a = self.student_ids.get_indexer(student1)
+        b = self.student_ids.get_indexer(student2)
+        weights = np.asarray(weights, dtype=float)
+        keep = (a >= 0) & (b >= 0) & (a != b)
+        a, b, weights = a[keep], b[keep], weights[keep]
+
+        needed = self._size + len(a)
+        if len(self._rows) < needed:
+            capacity = max(needed, 2 * len(self._rows))
+            for name in ['_rows', '_cols', '_weights', '_interactions']:
+                old = getattr(self, name)
+                grown = np.empty(capacity, dtype=old.dtype)
+                grown[:self._size] = old[:self._size]
+                setattr(self, name, grown)
+
+        # Store each pair once, smaller node first
+        self._rows[self._size:needed] = np.minimum(a, b)
+        self._cols[self._size:needed] = np.maximum(a, b)
+        self._weights[self._size:needed] = weights
+        self._interactions[self._size:needed] = 1
+        self._size = needed
+        return len(a)
+
+    def add_interactions(self, rows: pd.DataFrame) -> int:
+        """Append rows of ``interactions.csv``"""
+        weights = rows['duration_minutes'].to_numpy(dtype=float) * rows['quality_rating'].to_numpy(dtype=float) / 10
+        return self.add_edges(rows['student1_id'].to_numpy(), rows['student2_id'].to_numpy(), weights)
+
+    def _coalesce(self):
+        """Merge repeated pairs so every pair is stored once"""
+        if self._coalesced == self._size:
+            return
+        n = len(self.student_ids)
+        keys = self._rows[:self._size] * n + self._cols[:self._size]
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        starts = np.nonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])[0]
+
+        unique = sorted_keys[starts]
+        weights = np.add.reduceat(self._weights[:self._size][order], starts)
+        interactions = np.add.reduceat(self._interactions[:self._size][order], starts)
+        self._size = self._coalesced = len(unique)
+        self._rows[:self._size], self._cols[:self._size] = np.divmod(unique, n)
+        self._weights[:self._size] = weights
+        self._interactions[:self._size] = interactions
+
+    def sync(self, interactions_df: pd.DataFrame):
+        """Fold in interactions appended since the last sync (rebuilding if the table was replaced)"""
+        with self._lock:
+            rows, self._watermark, reset = appended_rows(interactions_df, self._watermark)
+            if reset:
+                self._reset()
+            if len(rows):
+                self.add_interactions(rows)
+
+    # ------------------------------------------------------------------
+    # Linear algebra
+    # ------------------------------------------------------------------
+
+    def edges(self):
+        """Coalesced COO arrays ``(rows, cols, weights, interactions)``, each pair once"""
+        self._coalesce()
+        return (self._rows[:self._size], self._cols[:self._size],
+                self._weights[:self._size], self._interactions[:self._size])
+
+    def matvec(self, x: np.ndarray, weighted: bool = True) -> np.ndarray:
+        """Adjacency matrix times ``x`` (symmetric, so both directions of every pair)"""
+        rows, cols, weights, _ = self.edges()
+        w = weights if weighted else np.ones(len(rows))
+        n = len(self.student_ids)
+        return np.bincount(rows, weights=w * x[cols], minlength=n) + \
+            np.bincount(cols, weights=w * x[rows], minlength=n)
+
+    def pagerank(self, damping: float = 0.85, tol: float = 1e-10, max_iter: int = 200) -> np.ndarray:
+        """Weighted PageRank centrality by power iteration (sums to 1).
+
+        PageRank rather than eigenvector centrality, because the network is
+        mostly disconnected team clusters and the leading eigenvector would
+        put all of its mass on a single one.
+        """
+        n = len(self.student_ids)
+        if not n:
+            return np.zeros(0)
+        strength = self.matvec(np.ones(n))
+        dangling = strength == 0
+        inverse = np.divide(1.0, strength, out=np.zeros(n), where=~dangling)
+        rank = np.full(n, 1.0 / n)
+        for _ in range(max_iter):
+            spread = self.matvec(rank * inverse) + rank[dangling].sum() / n
+            updated = damping * spread + (1 - damping) / n
+            converged = np.abs(updated - rank).sum() < tol
+            rank = updated
+            if converged:
+                break
+        return rank / rank.sum()
+
+    # ------------------------------------------------------------------
+    # Analytics
+    # ------------------------------------------------------------------
+
+    def student_metrics(self, isolation_ratio: float = ISOLATION_RATIO) -> pd.DataFrame:
+        """Degree, strength, centrality, isolation and bridging of every student"""
+        with self._lock:
+            rows, cols, weights, interactions = self.edges()
+            n = len(self.student_ids)
+            degree = np.bincount(rows, minlength=n) + np.bincount(cols, minlength=n)
+            strength = self.matvec(np.ones(n))
+            count = np.bincount(rows, weights=interactions, minlength=n) + \
+                np.bincount(cols, weights=interactions, minlength=n)
+            cross = self.group_of[rows] != self.group_of[cols]
+            cross_strength = np.bincount(rows, weights=weights * cross, minlength=n) + \
+                np.bincount(cols, weights=weights * cross, minlength=n)
+            bridged = np.bincount(rows, weights=cross, minlength=n) + np.bincount(cols, weights=cross, minlength=n)
+            centrality = self.pagerank()
+
+        metrics = pd.DataFrame({
+            'group_id': np.asarray(self.groups, dtype=object)[self.group_of],
+            'interactions': count.astype(np.int64),
+            'partners': degree,
+            'strength': strength,
+            'centrality': centrality * n,  # 1 = average student
+            'cross_group_partners': bridged.astype(np.int64),
+            'bridge_share': np.divide(cross_strength, strength, out=np.zeros(n), where=strength > 0)
+        }, index=self.student_ids)
+
+        group_median = metrics.groupby('group_id')['strength'].transform('median')
+        metrics['relative_strength'] = np.divide(strength, group_median.to_numpy(),
+                                                 out=np.zeros(n), where=group_median.to_numpy() > 0)
+        metrics['isolated'] = (degree == 0) | (metrics['relative_strength'] < isolation_ratio)
+        return metrics
+
+    def group_links(self) -> pd.DataFrame:
+        """Interaction weight between every pair of different groups that interact"""
+        with self._lock:
+            rows, cols, weights, interactions = self.edges()
+            a, b = self.group_of[rows], self.group_of[cols]
+            cross = a != b
+            low, high = np.minimum(a, b)[cross], np.maximum(a, b)[cross]
+            n_groups = len(self.groups)
+            pairs, pair_of = np.unique(low * n_groups + high, return_inverse=True)
+            weight = np.bincount(pair_of, weights=weights[cross], minlength=len(pairs))
+            count = np.bincount(pair_of, weights=interactions[cross], minlength=len(pairs))
+
+        low, high = np.divmod(pairs, n_groups)
+        groups = np.asarray(self.groups, dtype=object)
+        return pd.DataFrame({
+            'group_a': groups[low], 'group_b': groups[high],
+            'interactions': count.astype(np.int64), 'weight': weight
+        }).sort_values('weight', ascending=False).reset_index(drop=True)
+
+@st.cache_resource(show_spinner=False)
+def _interaction_graph(partition: Partition, student_ids: tuple, group_ids: tuple) -> InteractionGraph:
+    """One long-lived graph per course section and roster, shared across sessions"""
+    return InteractionGraph(student_ids, group_ids)
+
+def _synced_graph() -> InteractionGraph:
+    students_df = load_table('students')
+    graph = _interaction_graph(active_partition(), tuple(students_df['student_id']), tuple(students_df['group_id']))
+    graph.sync(load_table('interactions'))
+    return graph
+
+@st.cache_data(show_spinner=False)
+def _network_metrics(version: str) -> Dict[str, pd.DataFrame]:
+    """Analyse the graph; ``version`` is only part of the cache key"""
+    graph = _synced_graph()
+    return {'students': graph.student_metrics(), 'group_links': graph.group_links()}
+
+def load_network_metrics() -> Dict[str, pd.DataFrame]:
+    """Per-student network metrics and cross-group links, recomputed only when the data changes"""
+    return _network_metrics(data_version('students', 'interactions'))
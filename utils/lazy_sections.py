@@ -0,0 +1,24 @@
+"""
+Lazily rendered tab sections
+
+``st.tabs`` runs the body of every tab on every rerun and only hides the
+inactive ones in the browser. ``lazy_tabs`` draws the same strip of
+section labels as a horizontal selector and returns the open one, so a page
+computes and sends only that section; the expensive parts of each section
+go through ``cached_figure`` / ``st.cache_data`` so reopening it is cheap.
+"""
+
+from typing import Sequence
+
+import streamlit as st
+
+def lazy_tabs(labels: Sequence[str], key: str, default: int = 0) -> str:
+    """Render a tab strip and return the label of the open section.
+
+    Args:
+        labels: Section labels, in display order
+        key: Widget key; the open section is kept in ``st.session_state[key]``
+        default: Index of the section open on first load
+    """
+    return st.radio("Section", list(labels), index=default, key=key, horizontal=True,
+                    label_visibility="collapsed")
@@ -0,0 +1,196 @@
+"""
+Tail-follow ingestion of the monitoring CSV into an in-memory columnar buffer
+
+``MonitoringStream`` remembers the byte offset it has read up to and, on
+``poll()``, parses only the complete lines appended since then, adding them
+to per-column NumPy arrays that grow geometrically. Time windows (last
+24 hours, week, month, semester) are sliced from the buffer without
+re-reading history. If the file is replaced rather than appended to, the
+stream notices and reloads it from the start.
+"""
+
+import io
+import os
+import threading
+from datetime import timedelta
+from typing import Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from .partitions import table_path
+
+# Sidebar label -> window length (None = everything)
+TIME_WINDOWS = {
+    'Last 24 Hours': timedelta(hours=24),
+    'Last Week': timedelta(days=7),
+    'Last Month': timedelta(days=30),
+    'Full Semester': None
+}
+
+_TAIL_CHECK_BYTES = 64
+
+class MonitoringStream:
+    """Columnar buffer that follows an append-only CSV by byte offset"""
+
+    def __init__(self, path: str, time_column: str = 'timestamp'):
+        """
+        Args:
+            path: CSV file to follow
+            time_column: Column parsed as datetimes and used for the time windows
+        """
+        self.path = path
+        self.time_column = time_column
+        self._lock = threading.Lock()
+        # Incremented whenever the buffer is rebuilt, so consumers can resync
+        self.generation = -1
+        self._reset()
+
+    def _reset(self):
+        self.generation += 1
+        self._offset = 0
+        self._header = b""
+        self._tail = b""
+        self._columns: Dict[str, np.ndarray] = {}
+        self._rows = 0
+        self._time_sorted = True
+
+    def __len__(self) -> int:
+        return self._rows
+
+    # ------------------------------------------------------------------
+    # Ingestion
+    # ------------------------------------------------------------------
+
+    def _replaced(self, f, size: int) -> bool:
+        """True if the bytes already consumed are no longer what we read"""
+        if size < self._offset:
+            return True
+        f.seek(0)
+        if f.readline() != self._header:
+            return True
+        f.seek(self._offset - len(self._tail))
+        return f.read(len(self._tail)) != self._tail
+
+    def poll(self) -> int:
+        """Read lines appended since the last poll; returns the number of new rows"""
+        with self._lock:
+            try:
+                size = os.path.getsize(self.path)
+            except FileNotFoundError:
+                return 0
+
+            with open(self.path, 'rb') as f:
+                if self._offset and self._replaced(f, size):
+                    self._reset()
+                if not self._offset:
+                    f.seek(0)
+                    self._header = f.readline()
+                    self._offset = len(self._header)
+                    self._tail = self._header[-_TAIL_CHECK_BYTES:]
+                if size == self._offset:
+                    return 0
+
+                f.seek(self._offset)
+                chunk = f.read(size - self._offset)
+
+            # Leave a partially written last line for the next poll
+            end = chunk.rfind(b"\n") + 1
+            if end == 0:
+                return 0
+            chunk = chunk[:end]
+            self._offset += end
+            self._tail = (self._tail + chunk)[-_TAIL_CHECK_BYTES:]
+
+            rows = pd.read_csv(io.BytesIO(self._header + chunk))
+            self._append(rows)
+            return len(rows)
+
+    def _append(self, rows: pd.DataFrame):
+        if self.time_column in rows:
+            rows[self.time_column] = pd.to_datetime(rows[self.time_column], format='ISO8601')
+            times = rows[self.time_column].to_numpy()
+            previous_last = self._columns[self.time_column][self._rows - 1] if self._rows else None
+            self._time_sorted &= bool((np.diff(times) >= np.timedelta64(0)).all()) and \
+                (previous_last is None or len(times) == 0 or times[0] >= previous_last)
+
+        needed = self._rows + len(rows)
+        for name in rows.columns:
+            values = rows[name].to_numpy()
+            buffer = self._columns.get(name)
+            if buffer is None:
+                buffer = np.empty(max(needed, 1024), dtype=values.dtype)
+            elif buffer.dtype != values.dtype:
+                dtype = np.result_type(buffer.dtype, values.dtype) \
+                    if buffer.dtype.kind in 'biuf' and values.dtype.kind in 'biuf' else object
+                buffer = buffer.astype(dtype)
+            if len(buffer) < needed:
+                grown = np.empty(max(needed, 2 * len(buffer)), dtype=buffer.dtype)
+                grown[:self._rows] = buffer[:self._rows]
+                buffer = grown
+            buffer[self._rows:needed] = values
+            self._columns[name] = buffer
+        self._rows = needed
+
+    # ------------------------------------------------------------------
+    # Windows
+    # ------------------------------------------------------------------
+
+    def latest_time(self) -> Optional[pd.Timestamp]:
+        """Timestamp of the most recent event in the buffer"""
+        if not self._rows:
+            return None
+        times = self._columns[self.time_column][:self._rows]
+        return pd.Timestamp(times[-1] if self._time_sorted else times.max())
+
+    def window(self, span: Union[str, timedelta, None] = None, end: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        """Rows within ``span`` before ``end``.
+
+        Args:
+            span: A ``TIME_WINDOWS`` label, a timedelta, or None for everything
+            end: End of the window; defaults to the latest event, so windows
+                follow the data rather than the wall clock
+
+        The result is indexed by buffer position, which stays stable for as
+        long as ``generation`` does.
+        """
+        with self._lock:
+            if isinstance(span, str):
+                span = TIME_WINDOWS[span]
+            rows = np.arange(self._rows)
+            if span is not None and self._rows:
+                times = self._columns[self.time_column][:self._rows]
+                end = np.datetime64(end if end is not None else self.latest_time())
+                start = end - np.timedelta64(span)
+                if self._time_sorted:
+                    rows = np.arange(np.searchsorted(times, start, side='right'),
+                                     np.searchsorted(times, end, side='right'))
+                else:
+                    rows = np.nonzero((times > start) & (times <= end))[0]
+            return self._frame(rows)
+
+    def rows_since(self, position: int) -> pd.DataFrame:
+        """Rows from buffer position ``position`` onward"""
+        with self._lock:
+            return self._frame(np.arange(position, self._rows))
+
+    def _frame(self, rows: np.ndarray) -> pd.DataFrame:
+        """Rows of the buffer, indexed by their buffer position"""
+        return pd.DataFrame({name: buffer[rows] for name, buffer in self._columns.items()},
+                            index=pd.Index(rows, name='row'))
+
+@st.cache_resource(show_spinner=False)
+def _monitoring_stream(path: str) -> MonitoringStream:
+    """One long-lived stream per table file, shared across sessions"""
+    return MonitoringStream(path)
+
+def monitoring_stream(table: str = 'monitoring') -> MonitoringStream:
+    """Stream over one ``DATA_PATHS`` table of the active course section"""
+    return _monitoring_stream(table_path(table))
+
+def load_monitoring_window(time_range: str = 'Full Semester', table: str = 'monitoring') -> pd.DataFrame:
+    """Poll the monitoring stream and return the rows in ``time_range``"""
+    stream = monitoring_stream(table)
+    stream.poll()
+    return stream.window(time_range)
@@ -0,0 +1,62 @@
+"""
+Course/section partitions of the data directory
+
+Every section of every course in ``COURSES`` stores its own copy of the
+``DATA_PATHS`` tables (and its own manifest) in a partition directory, so
+a dashboard session reads, versions and caches only the section it has
+selected. The selection lives in the session state under
+``PARTITION_KEY``; code running outside a Streamlit session (the data
+generators, for example) uses the default section unless given one.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from constants import COURSES, DEFAULT_COURSE, DEFAULT_SECTION, COURSES_DIR, DATA_DIR, DATA_PATHS, DATA_MANIFEST_PATH
+
+# (course id, section id)
+Partition = Tuple[str, str]
+
+# Session-state key of the selected partition (not a widget key, so it survives page switches)
+PARTITION_KEY = 'course_partition'
+
+DEFAULT_PARTITION: Partition = (DEFAULT_COURSE, DEFAULT_SECTION)
+
+def partition_dir(partition: Partition) -> Path:
+    """Directory holding the tables of one course section"""
+    if tuple(partition) == DEFAULT_PARTITION:
+        return DATA_DIR
+    course, section = partition
+    return COURSES_DIR / course / section
+
+def partition_key(partition: Partition) -> str:
+    """Printable id of a partition, e.g. ``intro-ml/001``"""
+    return "/".join(partition)
+
+def available_sections(course: str) -> List[str]:
+    """Registered sections of ``course`` that have data"""
+    return [section for section in COURSES[course]['sections']
+            if (partition_dir((course, section)) / DATA_PATHS['students'].name).exists()]
+
+def active_partition() -> Partition:
+    """Partition selected in the current session (the default outside a session)"""
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return DEFAULT_PARTITION
+    partition = st.session_state.get(PARTITION_KEY)
+    return tuple(partition) if partition else DEFAULT_PARTITION
+
+def table_path(name: str, partition: Optional[Partition] = None) -> str:
+    """Path of one ``DATA_PATHS`` table in ``partition`` (default: the active one)"""
+    return str(partition_dir(partition or active_partition()) / DATA_PATHS[name].name)
+
+def table_paths(partition: Optional[Partition] = None) -> Dict[str, str]:
+    """Paths of every ``DATA_PATHS`` table in ``partition`` (default: the active one)"""
+    partition = partition or active_partition()
+    return {name: table_path(name, partition) for name in DATA_PATHS}
+
+def manifest_path(partition: Optional[Partition] = None) -> str:
+    """Path of the data version manifest of ``partition`` (default: the active one)"""
+    return str(partition_dir(partition or active_partition()) / DATA_MANIFEST_PATH.name)
@@ -0,0 +1,98 @@
+"""
+Declarative row filters over the dashboard tables
+
+Filter panels used to narrow a table with one boolean mask per widget,
+each step copying the frame. Pages now describe their filters as
+predicates (``isin``, ``equals``, ``between``) and ``select`` evaluates them
+in a single pass against a per-table ``TableIndex``: every filtered column
+is factorized once per data version, so a membership test is a lookup into
+a small boolean table instead of a comparison per row. The masks are
+AND-ed in place and the frame is materialized once, with only the columns
+the page reads.
+"""
+
+import threading
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from .data_loader import load_table, table_version
+
+# (column, operator, operand)
+Predicate = Tuple[str, str, Any]
+
+def isin(column: str, values: Iterable) -> Predicate:
+    """Rows whose ``column`` is one of ``values`` (none if ``values`` is empty)"""
+    return (column, 'in', tuple(values))
+
+def equals(column: str, value) -> Predicate:
+    """Rows whose ``column`` equals ``value``"""
+    return (column, 'in', (value,))
+
+def between(column: str, low, high) -> Predicate:
+    """Rows whose ``column`` lies within ``[low, high]``"""
+    return (column, 'between', (low, high))
+
+class TableIndex:
+    """Factorized columns of one table version, built on first use and shared by every query"""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self._codes: Dict[str, Tuple[np.ndarray, pd.Index]] = {}
+        self._lock = threading.Lock()
+
+    def codes(self, column: str) -> Tuple[np.ndarray, pd.Index]:
+        """Integer code of every row (-1 for missing) and the distinct values they index"""
+        with self._lock:
+            if column not in self._codes:
+                codes, uniques = pd.factorize(self.df[column])
+                self._codes[column] = (codes, pd.Index(uniques))
+            return self._codes[column]
+
+    def _member(self, column: str, values: Sequence) -> np.ndarray:
+        codes, uniques = self.codes(column)
+        # One extra, always-False slot that code -1 (missing) lands on
+        allowed = np.zeros(len(uniques) + 1, dtype=bool)
+        positions = uniques.get_indexer(pd.Index(list(values), dtype=object)) if len(values) else np.empty(0, int)
+        allowed[positions[positions >= 0]] = True
+        return allowed[codes]
+
+    def mask(self, where: Iterable[Predicate]) -> np.ndarray:
+        """Rows satisfying every predicate"""
+        mask = np.ones(len(self.df), dtype=bool)
+        for column, op, operand in where:
+            if op == 'in':
+                mask &= self._member(column, operand)
+            elif op == 'between':
+                values = self.df[column].to_numpy()
+                low, high = operand
+                mask &= (values >= low) & (values <= high)
+            else:
+                raise ValueError(f"Unknown filter operator: {op}")
+        return mask
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _table_index(name: str, version: str) -> TableIndex:
+    """Index of one table version; ``version`` is only part of the cache key"""
+    return TableIndex(load_table(name))
+
+@st.cache_data(show_spinner=False, max_entries=128)
+def _select(name: str, version: str, where: Tuple[Predicate, ...],
+            columns: Optional[Tuple[str, ...]]) -> pd.DataFrame:
+    index = _table_index(name, version)
+    return index.df.loc[index.mask(where), list(columns) if columns else index.df.columns]
+
+def select(name: str, where: Iterable[Predicate] = (), columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """Rows of a ``DATA_PATHS`` table matching every predicate.
+
+    Args:
+        name: Table name
+        where: Predicates, all of which must hold
+        columns: Columns to return (default: all)
+
+    Results are cached per table version and filter combination, so going
+    back to an earlier filter setting does not re-scan the table.
+    """
+    return _select(name, table_version(name), tuple(where), tuple(columns) if columns else None)
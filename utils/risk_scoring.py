@@ -0,0 +1,256 @@
+"""
+Group risk scoring from live monitoring, participation, conflict and tutoring data
+
+``risk_level`` in groups.csv is fixed when the data is generated. The
+``GroupRiskEngine`` instead keeps additive per-group (and per-group, per-week)
+aggregates of the event tables, so new rows are folded in with a few
+``np.bincount`` calls, and scores every group in one vectorized pass.
+Pages use ``with_live_risk`` to replace the static column with the current
+score, cached per data version.
+"""
+
+import threading
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from .data_loader import load_table, appended_rows, data_version
+from .partitions import Partition, active_partition
+
+RISK_TABLES = ['monitoring', 'participation', 'conflicts', 'tutoring']
+
+# signal -> (healthy value, critical value, weight, label). The penalty of a
+# signal ramps linearly from 0 at the healthy value to 1 at the critical one.
+RISK_SIGNALS = {
+    'engagement': (8.0, 6.0, 2.0, 'Low engagement'),
+    'engagement_trend': (0.0, -1.5, 1.0, 'Declining engagement'),
+    'participation_equality': (8.0, 5.0, 1.5, 'Unequal participation'),
+    'off_topic_minutes': (2.0, 10.0, 0.5, 'Off-topic discussion'),
+    'contribution_imbalance': (0.1, 0.5, 1.0, 'Uneven contributions'),
+    'peer_rating': (7.5, 5.0, 0.5, 'Low peer ratings'),
+    'open_conflicts': (0.0, 4.0, 2.0, 'Unresolved conflicts'),
+    'tutoring_follow_up_rate': (0.15, 0.4, 1.0, 'Frequent tutoring follow-ups'),
+    'tutoring_satisfaction': (8.0, 6.0, 0.5, 'Low tutoring satisfaction')
+}
+
+RISK_THRESHOLDS = {'High': 3.5, 'Medium': 2.5}
+
+SEVERITY_WEIGHTS = {'Low': 1, 'Medium': 2, 'High': 3, 'Critical': 4}
+
+class GroupRiskEngine:
+    """Incrementally maintained group risk scores"""
+
+    def __init__(self, group_ids: Iterable[str], recent_weeks: int = 2,
+                 signals: Optional[Dict[str, tuple]] = None):
+        """
+        Args:
+            group_ids: Groups to score, in output order
+            recent_weeks: Number of latest weeks the weekly signals average over
+            signals: Overrides for entries of ``RISK_SIGNALS``
+        """
+        self.group_ids = list(group_ids)
+        self._index = pd.Index(self.group_ids)
+        self.recent_weeks = recent_weeks
+        self.signals = {**RISK_SIGNALS, **(signals or {})}
+        self._lock = threading.Lock()
+        # table -> {aggregate: (n_groups, n_weeks) array}, and table -> {aggregate: (n_groups,) array}
+        self._weekly: Dict[str, Dict[str, np.ndarray]] = {}
+        self._totals: Dict[str, Dict[str, np.ndarray]] = {}
+        # table -> watermark of the rows already folded in
+        self._watermarks: Dict[str, tuple] = {}
+
+    # ------------------------------------------------------------------
+    # Aggregation
+    # ------------------------------------------------------------------
+
+    def _add_weekly(self, table: str, groups: np.ndarray, weeks: np.ndarray, values: Dict[str, np.ndarray]):
+        aggregates = self._weekly.setdefault(table, {})
+        n_groups = len(self.group_ids)
+        n_weeks = int(weeks.max()) + 1 if len(weeks) else 0
+        flat = groups * n_weeks + weeks
+        for name, value in values.items():
+            added = np.bincount(flat, weights=value, minlength=n_groups * n_weeks).reshape(n_groups, n_weeks)
+            current = aggregates.get(name, np.zeros((n_groups, 0)))
+            width = max(current.shape[1], n_weeks)
+            grown = np.zeros((n_groups, width))
+            grown[:, :current.shape[1]] += current
+            grown[:, :n_weeks] += added
+            aggregates[name] = grown
+
+    def _add_totals(self, table: str, groups: np.ndarray, values: Dict[str, np.ndarray]):
+        aggregates = self._totals.setdefault(table, {})
+        n_groups = len(self.group_ids)
+        for name, value in values.items():
+            added = np.bincount(groups, weights=value, minlength=n_groups)
+            aggregates[name] = aggregates.get(name, np.zeros(n_groups)) + added
+
+    def update(self, table: str, rows: pd.DataFrame):
+        """Fold new rows of one event table into the aggregates"""
+        groups = self._index.get_indexer(rows['group_id'])
+        known = groups >= 0
+        rows, groups = rows[known], groups[known]
+        if rows.empty:
+            return
+
+        if table == 'monitoring':
+            self._add_weekly(table, groups, rows['week'].to_numpy(dtype=np.int64), {
+                'sessions': np.ones(len(rows)),
+                'engagement': rows['avg_engagement'].to_numpy(dtype=float),
+                'participation_equality': rows['participation_equality'].to_numpy(dtype=float),
+                'off_topic_minutes': rows['off_topic_minutes'].fillna(0).to_numpy(dtype=float)
+            })
+        elif table == 'participation':
+            contribution = rows['contribution_percentage'].to_numpy(dtype=float)
+            self._add_weekly(table, groups, rows['week'].to_numpy(dtype=np.int64), {
+                'members': np.ones(len(rows)),
+                'contribution': contribution,
+                'contribution_sq': contribution ** 2,
+                'peer_rating': rows['peer_rating'].to_numpy(dtype=float)
+            })
+        elif table == 'conflicts':
+            severity = rows['severity_level'].map(SEVERITY_WEIGHTS).fillna(1).to_numpy(dtype=float)
+            unresolved = ~rows['resolution_success'].astype(bool).to_numpy()
+            self._add_totals(table, groups, {
+                'open_severity': severity * unresolved,
+                'follow_ups': rows['follow_up_needed'].astype(float).to_numpy()
+            })
+        elif table == 'tutoring':
+            self._add_totals(table, groups, {
+                'questions': np.ones(len(rows)),
+                'follow_ups': rows['follow_up_needed'].astype(float).to_numpy(),
+                'satisfaction': rows['student_satisfaction'].to_numpy(dtype=float)
+            })
+        else:
+            raise ValueError(f"Unknown risk table: {table}")
+
+    def sync(self, tables: Dict[str, pd.DataFrame]):
+        """Bring the aggregates up to date with full tables.
+
+        Tables are treated as append-only: if the last row folded in
+        previously is still in place, only the rows after it are added;
+        otherwise (the table was regenerated) that table is re-aggregated.
+        """
+        with self._lock:
+            for table, df in tables.items():
+                rows, self._watermarks[table], reset = appended_rows(df, self._watermarks.get(table))
+                if reset:
+                    self._weekly.pop(table, None)
+                    self._totals.pop(table, None)
+                if len(rows):
+                    self.update(table, rows)
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+
+    def _recent_mean(self, table: str, name: str, count: str, weeks: slice) -> np.ndarray:
+        aggregates = self._weekly.get(table)
+        if not aggregates:
+            return np.full(len(self.group_ids), np.nan)
+        total, n = aggregates[name][:, weeks].sum(axis=1), aggregates[count][:, weeks].sum(axis=1)
+        return np.divide(total, n, out=np.full(len(total), np.nan), where=n > 0)
+
+    def _windows(self, table: str):
+        """(recent, prior) week slices ending at the table's latest week with data"""
+        counts = self._weekly.get(table, {}).get('sessions' if table == 'monitoring' else 'members')
+        if counts is None or not counts.any():
+            return slice(0, 0), slice(0, 0)
+        latest = int(np.nonzero(counts.sum(axis=0))[0].max())
+        start = max(0, latest + 1 - self.recent_weeks)
+        return slice(start, latest + 1), slice(0, start)
+
+    def signal_values(self) -> pd.DataFrame:
+        """Current value of every risk signal per group (NaN where there is no data)"""
+        recent, prior = self._windows('monitoring')
+        engagement = self._recent_mean('monitoring', 'engagement', 'sessions', recent)
+        values = {
+            'engagement': engagement,
+            'engagement_trend': engagement - self._recent_mean('monitoring', 'engagement', 'sessions', prior),
+            'participation_equality': self._recent_mean('monitoring', 'participation_equality', 'sessions', recent),
+            'off_topic_minutes': self._recent_mean('monitoring', 'off_topic_minutes', 'sessions', recent)
+        }
+
+        recent, _ = self._windows('participation')
+        participation = self._weekly.get('participation')
+        values['contribution_imbalance'] = np.full(len(self.group_ids), np.nan)
+        if participation:
+            # Coefficient of variation of member contributions, averaged over recent weeks
+            n = participation['members'][:, recent]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean = participation['contribution'][:, recent] / n
+                std = np.sqrt(np.maximum(participation['contribution_sq'][:, recent] / n - mean ** 2, 0))
+                cv = np.where(mean > 0, std / mean, np.nan)
+            weeks_with_data = (~np.isnan(cv)).sum(axis=1)
+            np.divide(np.nansum(cv, axis=1), weeks_with_data,
+                      out=values['contribution_imbalance'], where=weeks_with_data > 0)
+        values['peer_rating'] = self._recent_mean('participation', 'peer_rating', 'members', recent)
+
+        conflicts = self._totals.get('conflicts')
+        values['open_conflicts'] = (conflicts['open_severity'] + 0.5 * conflicts['follow_ups']
+                                    if conflicts else np.zeros(len(self.group_ids)))
+
+        tutoring = self._totals.get('tutoring')
+        if tutoring:
+            questions = tutoring['questions']
+            values['tutoring_follow_up_rate'] = np.divide(tutoring['follow_ups'], questions,
+                                                          out=np.full(len(questions), np.nan), where=questions > 0)
+            values['tutoring_satisfaction'] = np.divide(tutoring['satisfaction'], questions,
+                                                        out=np.full(len(questions), np.nan), where=questions > 0)
+        else:
+            values['tutoring_follow_up_rate'] = np.full(len(self.group_ids), np.nan)
+            values['tutoring_satisfaction'] = np.full(len(self.group_ids), np.nan)
+
+        return pd.DataFrame({name: values[name] for name in self.signals}, index=pd.Index(self.group_ids, name='group_id'))
+
+    def scores(self) -> pd.DataFrame:
+        """Risk score (0-10), level and main risk factors of every group"""
+        with self._lock:
+            values = self.signal_values()
+
+        healthy = np.array([self.signals[name][0] for name in values.columns])
+        critical = np.array([self.signals[name][1] for name in values.columns])
+        weights = np.array([self.signals[name][2] for name in values.columns])
+        labels = np.array([self.signals[name][3] for name in values.columns])
+
+        # Missing signals carry no evidence of risk
+        penalties = np.nan_to_num(np.clip((values.to_numpy() - healthy) / (critical - healthy), 0, 1))
+        weighted = penalties * weights
+        risk_score = 10 * weighted.sum(axis=1) / weights.sum()
+
+        risk_level = np.select(
+            [risk_score >= RISK_THRESHOLDS['High'], risk_score >= RISK_THRESHOLDS['Medium']],
+            ['High', 'Medium'], default='Low'
+        )
+        order = np.argsort(-weighted, axis=1, kind='stable')[:, :2]
+        top = np.take_along_axis(penalties, order, axis=1) >= 0.5
+        factors = [", ".join(labels[o][t]) for o, t in zip(order, top)]
+
+        scores = values.round(3).reset_index()
+        scores.insert(1, 'risk_score', np.round(risk_score, 2))
+        scores.insert(2, 'risk_level', risk_level)
+        scores.insert(3, 'risk_factors', factors)
+        return scores
+
+@st.cache_resource(show_spinner=False)
+def _risk_engine(partition: Partition, group_ids: tuple) -> GroupRiskEngine:
+    """One long-lived engine per course section and set of groups, shared across sessions"""
+    return GroupRiskEngine(group_ids)
+
+@st.cache_data(show_spinner=False)
+def _group_risk(version: str) -> pd.DataFrame:
+    """Score groups; ``version`` is only part of the cache key"""
+    groups_df = load_table('groups')
+    engine = _risk_engine(active_partition(), tuple(groups_df['group_id']))
+    engine.sync({name: load_table(name) for name in RISK_TABLES})
+    return engine.scores()
+
+def load_group_risk() -> pd.DataFrame:
+    """Current risk scores of every group, recomputed only when the data changes"""
+    return _group_risk(data_version('groups', *RISK_TABLES))
+
+def with_live_risk(groups_df: pd.DataFrame) -> pd.DataFrame:
+    """Replace the generated ``risk_level`` column with the live risk score"""
+    risk = load_group_risk()[['group_id', 'risk_score', 'risk_level', 'risk_factors']]
+    return groups_df.drop(columns=['risk_level'], errors='ignore').merge(risk, on='group_id', how='left')
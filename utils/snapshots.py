@@ -0,0 +1,93 @@
+"""
+Pre-rendered default-state snapshots of the analysis pages
+
+Most visits to pages 1-8 look at them with every filter at its default
+value, yet the first paint in a fresh server process still builds every
+figure from the tables. ``build_snapshots`` renders each page once per
+course section in a headless session, with the widgets left alone, and
+writes every figure ``cached_figure`` serves to
+``<partition>/snapshots/`` as JSON. Afterwards a figure-cache miss checks
+that directory before building, so the default view is a file read; as
+soon as a filter changes, the figure key no longer matches a snapshot and
+the chart is computed as before.
+
+Snapshot keys include the data version of the tables a figure reads (and
+a fingerprint of its builder), so a snapshot never outlives the data or
+code it was rendered from. Metrics and HTML on these pages come from
+``st.cache_data`` aggregates and the shared stylesheet, so figures are
+the only part that needs a snapshot.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from constants import PROJECT_ROOT
+from .partitions import Partition, PARTITION_KEY, DEFAULT_PARTITION, active_partition, partition_dir
+
+# Analysis pages rendered by ``build_snapshots``
+SNAPSHOT_PAGES = sorted(str(path) for path in (PROJECT_ROOT / "pages").glob("[1-8]_*.py"))
+
+# Set while ``build_snapshots`` renders pages: every figure served is written out
+_recording = threading.Event()
+
+def snapshot_dir(partition: Optional[Partition] = None) -> Path:
+    """Directory holding the snapshots of ``partition`` (default: the active one)"""
+    return partition_dir(partition or active_partition()) / "snapshots"
+
+def _snapshot_path(key: tuple) -> Path:
+    return snapshot_dir() / (hashlib.sha1(json.dumps(key).encode()).hexdigest() + ".json")
+
+def is_recording() -> bool:
+    return _recording.is_set()
+
+def load_snapshot(key: tuple) -> Optional[str]:
+    """Figure JSON snapshotted under ``key`` for the active partition, or None"""
+    try:
+        with open(_snapshot_path(key), encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+def save_snapshot(key: tuple, spec: str):
+    """Write figure JSON under ``key`` for the active partition"""
+    path = _snapshot_path(key)
+    os.makedirs(path.parent, exist_ok=True)
+    # Write then rename, so a concurrent reader never sees half a file
+    tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(spec)
+    os.replace(tmp_path, path)
+
+def build_snapshots(partition: Optional[Partition] = None,
+                    pages: Optional[Iterable[str]] = None) -> Dict[str, List[str]]:
+    """Render ``pages`` at their default state and snapshot their figures.
+
+    Args:
+        partition: Course section to render (default: the default section)
+        pages: Page scripts to render (default: ``SNAPSHOT_PAGES``)
+
+    Returns:
+        Page path -> exception messages raised while rendering it (empty when it rendered cleanly)
+
+    Existing snapshots of the section are removed first.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    partition = tuple(partition or DEFAULT_PARTITION)
+    shutil.rmtree(snapshot_dir(partition), ignore_errors=True)
+    results = {}
+    _recording.set()
+    try:
+        for page in pages or SNAPSHOT_PAGES:
+            app = AppTest.from_file(page, default_timeout=300)
+            app.session_state[PARTITION_KEY] = partition
+            app.run()
+            results[page] = [str(e.value) for e in app.exception]
+    finally:
+        _recording.clear()
+    return results
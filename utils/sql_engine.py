@@ -0,0 +1,163 @@
+"""
+Embedded analytical SQL over the ``DATA_PATHS`` tables (DuckDB)
+
+Pages answer most questions with pandas filters, groupbys and merges over
+DataFrames that each hold a full CSV. ``SQLEngine`` exposes every table to
+an in-process DuckDB database instead, so an aggregate is one parallel,
+vectorized SQL query and only its (small) result comes back to pandas.
+
+There is one engine per course section partition. A table is a view over
+``<partition>/parquet/<table>.parquet`` when an up-to-date export exists, which DuckDB scans directly without copying; otherwise the
+CSV is loaded once per data version into a DuckDB columnar table. Either
+way the relation is re-registered only when the table's version changes,
+and a query only syncs the tables it reads. The generator scripts call
+``export_parquet`` after writing their tables, so the views are the usual
+case.
+"""
+
+import os
+import threading
+from typing import Dict, Iterable, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+import streamlit as st
+
+from constants import DATA_PATHS
+from .data_versions import table_version, data_version
+from .partitions import Partition, active_partition, partition_dir, table_paths
+
+def _duckdb():
+    """Import DuckDB on first use, so pages that do not query SQL run without it"""
+    try:
+        import duckdb
+    except ImportError as e:
+        raise ImportError("The SQL engine requires DuckDB; install it with `pip install duckdb` "
+                          "(it is listed in requirements.txt)") from e
+    return duckdb
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+def _literal(path: str) -> str:
+    return "'" + path.replace("'", "''") + "'"
+
+class SQLEngine:
+    """In-memory DuckDB database with one relation per ``DATA_PATHS`` table of a course section"""
+
+    def __init__(self, partition: Optional[Partition] = None):
+        """
+        Args:
+            partition: Course section whose tables are exposed (default: the active one)
+        """
+        self.partition = partition or active_partition()
+        self.paths = table_paths(self.partition)
+        self.parquet_dir = partition_dir(self.partition) / "parquet"
+        self._connection = _duckdb().connect(database=':memory:')
+        self._versions: Dict[str, str] = {}
+        # Table name -> 'VIEW' or 'TABLE', whichever was created for it
+        self._kinds: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def parquet_path(self, name: str) -> str:
+        return str(self.parquet_dir / f"{name}.parquet")
+
+    def _source(self, name: str) -> Optional[Tuple[str, str]]:
+        """``(kind, select)`` defining the relation for ``name``, or None if the table has no file yet"""
+        csv_path = self.paths[name]
+        if not os.path.exists(csv_path):
+            return None
+        parquet_path = self.parquet_path(name)
+        if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path):
+            return 'VIEW', f"SELECT * FROM read_parquet({_literal(parquet_path)})"
+        return 'TABLE', f"SELECT * FROM read_csv_auto({_literal(csv_path)})"
+
+    def sync(self, names: Optional[Iterable[str]] = None):
+        """(Re-)register the tables whose data version changed since the last sync"""
+        with self._lock:
+            for name in names or self.paths:
+                version = table_version(name, self.partition)
+                if self._versions.get(name) == version:
+                    continue
+                source = self._source(name)
+                if source is None:
+                    continue
+                kind, select = source
+                if name in self._kinds:
+                    self._connection.execute(f"DROP {self._kinds[name]} {_quote(name)}")
+                self._connection.execute(f"CREATE {kind} {_quote(name)} AS {select}")
+                self._kinds[name] = kind
+                self._versions[name] = version
+
+    def query(self, sql: str, params: Optional[Union[Sequence, Dict]] = None,
+              tables: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """Run parameterized SQL (``?`` or ``$name`` placeholders) and return the result.
+
+        Only ``tables`` (default: all of them) are synced before the query runs.
+        """
+        self.sync(tables)
+        # A cursor is an independent connection to the same database, safe to use from this thread
+        cursor = self._connection.cursor()
+        try:
+            return cursor.execute(sql, params).df() if params is not None else cursor.execute(sql).df()
+        finally:
+            cursor.close()
+
+    def export_parquet(self, names: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        """Write a Parquet copy of each table so later syncs scan it in place.
+
+        Returns:
+            Table name -> Parquet path, for the tables that were exported
+        """
+        os.makedirs(self.parquet_dir, exist_ok=True)
+        exported = {}
+        with self._lock:
+            for name in names or self.paths:
+                csv_path = self.paths[name]
+                if not os.path.exists(csv_path):
+                    continue
+                parquet_path = self.parquet_path(name)
+                self._connection.execute(f"COPY (SELECT * FROM read_csv_auto({_literal(csv_path)})) "
+                                         f"TO {_literal(parquet_path)} (FORMAT PARQUET)")
+                # Re-register as a view over the new file on the next sync
+                self._versions.pop(name, None)
+                exported[name] = parquet_path
+        return exported
+
+def export_parquet(names: Optional[Iterable[str]] = None,
+                   partition: Optional[Partition] = None) -> Dict[str, str]:
+    """Export Parquet copies of ``names`` (default: all) of ``partition`` for the SQL engine.
+
+    Called by the generator scripts after they write tables. Without DuckDB
+    nothing is exported and the engine falls back to the CSVs.
+    """
+    try:
+        engine = SQLEngine(partition)
+    except ImportError:
+        return {}
+    return engine.export_parquet(names)
+
+@st.cache_resource(show_spinner=False)
+def _sql_engine(partition: Partition) -> SQLEngine:
+    """One SQL engine per course section, shared across sessions"""
+    return SQLEngine(partition)
+
+def sql_engine() -> SQLEngine:
+    """SQL engine over the active course section"""
+    return _sql_engine(active_partition())
+
+@st.cache_data(show_spinner=False)
+def _run_sql(sql: str, params, tables: Tuple[str, ...], version: str) -> pd.DataFrame:
+    """Run a query; ``version`` (which includes the section) is only part of the cache key"""
+    return sql_engine().query(sql, params, tables)
+
+def run_sql(sql: str, params: Optional[Union[Sequence, Dict]] = None,
+            tables: Iterable[str] = ()) -> pd.DataFrame:
+    """Result of a parameterized query, cached until a table it reads changes.
+
+    Args:
+        sql: Query over the ``DATA_PATHS`` table names, with ``?`` or ``$name`` placeholders
+        params: Placeholder values
+        tables: Tables the query reads (default: all of them)
+    """
+    tables = tuple(tables) or tuple(DATA_PATHS)
+    return _run_sql(sql, params, tables, data_version(*tables))
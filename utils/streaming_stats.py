@@ -0,0 +1,196 @@
+"""
+Per-group rolling statistics over the monitoring stream with O(1) updates
+
+``RollingStats`` keeps, for every group and metric, a ring buffer of the
+last ``window`` sessions plus running sums and sums of squares, a fast and
+a slow EWMA. Each event updates that state in constant time (batches are
+applied vectorized across groups), and queries read only the fixed-size
+state, so the cost of a dashboard refresh does not grow with the length
+of the event history. ``rolling_monitoring_stats`` feeds it from the
+tail-following ``MonitoringStream``.
+"""
+
+import threading
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from .monitoring_stream import _monitoring_stream
+from .partitions import table_path
+
+ROLLING_METRICS = ['avg_engagement', 'participation_equality', 'meeting_duration']
+
+class RollingStats:
+    """Ring-buffer rolling mean, variance, min, max and EWMA per group"""
+
+    def __init__(
+        self,
+        metrics: Iterable[str] = ROLLING_METRICS,
+        window: int = 12,
+        alpha: float = 0.3,
+        slow_alpha: float = 0.05
+    ):
+        """
+        Args:
+            metrics: Columns tracked for every group
+            window: Number of most recent sessions the rolling statistics cover
+            alpha: Smoothing factor of the fast EWMA
+            slow_alpha: Smoothing factor of the slow EWMA used for trends
+        """
+        self.metrics: List[str] = list(metrics)
+        self.window = window
+        self.alpha = alpha
+        self.slow_alpha = slow_alpha
+        self.group_ids = pd.Index([], dtype=object)
+
+        m = len(self.metrics)
+        self._ring = np.zeros((0, m, window))
+        self._count = np.zeros(0, dtype=np.int64)
+        self._sum = np.zeros((0, m))
+        self._sumsq = np.zeros((0, m))
+        self._ewma = np.zeros((0, m))
+        self._slow = np.zeros((0, m))
+
+    def _group_index(self, group_ids: np.ndarray) -> np.ndarray:
+        """Row of every group id, adding rows for groups not seen before"""
+        new = pd.Index(pd.unique(group_ids)).difference(self.group_ids)
+        if len(new):
+            k, m = len(new), len(self.metrics)
+            self.group_ids = self.group_ids.append(new)
+            self._ring = np.concatenate([self._ring, np.zeros((k, m, self.window))])
+            self._count = np.concatenate([self._count, np.zeros(k, dtype=np.int64)])
+            self._sum = np.concatenate([self._sum, np.zeros((k, m))])
+            self._sumsq = np.concatenate([self._sumsq, np.zeros((k, m))])
+            self._ewma = np.concatenate([self._ewma, np.full((k, m), np.nan)])
+            self._slow = np.concatenate([self._slow, np.full((k, m), np.nan)])
+        return self.group_ids.get_indexer(group_ids)
+
+    def _update_distinct(self, g: np.ndarray, values: np.ndarray):
+        """Apply one event to each of the (distinct) groups ``g``"""
+        slot = self._count[g] % self.window
+        evicted = np.where((self._count[g] >= self.window)[:, None], self._ring[g, :, slot], 0.0)
+        self._sum[g] += values - evicted
+        self._sumsq[g] += values ** 2 - evicted ** 2
+        self._ring[g, :, slot] = values
+
+        for ewma, alpha in [(self._ewma, self.alpha), (self._slow, self.slow_alpha)]:
+            previous = ewma[g]
+            ewma[g] = np.where(np.isnan(previous), values, previous + alpha * (values - previous))
+
+        self._count[g] += 1
+        # Re-sum each ring once per lap so floating-point drift cannot accumulate
+        lapped = g[self._count[g] % self.window == 0]
+        self._sum[lapped] = self._ring[lapped].sum(axis=2)
+        self._sumsq[lapped] = (self._ring[lapped] ** 2).sum(axis=2)
+
+    def update(self, group_id, values) -> np.ndarray:
+        """Add one session; returns the group's fast EWMA after it"""
+        g = self._group_index(np.array([group_id], dtype=object))
+        self._update_distinct(g, np.asarray(values, dtype=float).reshape(1, -1))
+        return self._ewma[g[0]].copy()
+
+    def update_many(self, group_ids: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Add sessions in order; returns the fast EWMA after each one, shape (n, n_metrics).
+
+        Events are applied in rounds in which every group appears at most
+        once, so each round is a single vectorized update and per-group
+        order is preserved.
+        """
+        values = np.asarray(values, dtype=float)
+        trace = np.empty_like(values)
+        if not len(values):
+            return trace
+        g = self._group_index(np.asarray(group_ids, dtype=object))
+
+        order = np.argsort(g, kind='stable')
+        sorted_groups = g[order]
+        starts = np.r_[0, np.nonzero(sorted_groups[1:] != sorted_groups[:-1])[0] + 1]
+        rank = np.empty(len(g), dtype=np.int64)
+        rank[order] = np.arange(len(g)) - np.repeat(starts, np.diff(np.r_[starts, len(g)]))
+
+        by_rank = np.argsort(rank, kind='stable')
+        bounds = np.searchsorted(rank[by_rank], np.arange(rank.max() + 2))
+        for r in range(rank.max() + 1):
+            events = by_rank[bounds[r]:bounds[r + 1]]
+            self._update_distinct(g[events], values[events])
+            trace[events] = self._ewma[g[events]]
+        return trace
+
+    def snapshot(self) -> pd.DataFrame:
+        """Current rolling statistics of every group, one column per (metric, statistic)"""
+        n = np.minimum(self._count, self.window)
+        safe_n = np.maximum(n, 1)[:, None]
+        mean = self._sum / safe_n
+        variance = np.maximum(self._sumsq / safe_n - mean ** 2, 0.0)
+
+        # Only the filled part of each ring counts towards min and max
+        filled = np.arange(self.window)[None, None, :] < n[:, None, None]
+        minimum = np.where(filled, self._ring, np.inf).min(axis=2, initial=np.inf)
+        maximum = np.where(filled, self._ring, -np.inf).max(axis=2, initial=-np.inf)
+        empty = (n == 0)[:, None]
+
+        columns = {'sessions': self._count}
+        for i, metric in enumerate(self.metrics):
+            columns[f"{metric}_mean"] = np.where(empty[:, 0], np.nan, mean[:, i])
+            columns[f"{metric}_std"] = np.where(empty[:, 0], np.nan, np.sqrt(variance[:, i]))
+            columns[f"{metric}_min"] = np.where(empty[:, 0], np.nan, minimum[:, i])
+            columns[f"{metric}_max"] = np.where(empty[:, 0], np.nan, maximum[:, i])
+            columns[f"{metric}_ewma"] = self._ewma[:, i]
+            columns[f"{metric}_trend"] = self._ewma[:, i] - self._slow[:, i]
+        return pd.DataFrame(columns, index=pd.Index(self.group_ids, name='group_id'))
+
+class StreamRollingStats:
+    """``RollingStats`` kept in step with a ``MonitoringStream``"""
+
+    def __init__(self, stream, **kwargs):
+        self.stream = stream
+        self._kwargs = kwargs
+        self._lock = threading.Lock()
+        self._generation = None
+
+    def _reset(self):
+        self.stats = RollingStats(**self._kwargs)
+        self._rows = 0
+        self._trace = np.empty((0, len(self.stats.metrics)))
+        self._generation = self.stream.generation
+
+    def refresh(self) -> 'StreamRollingStats':
+        """Poll the stream and fold in only the rows appended since the last refresh"""
+        self.stream.poll()
+        with self._lock:
+            if self._generation != self.stream.generation:
+                self._reset()
+            new_rows = self.stream.rows_since(self._rows)
+            if len(new_rows):
+                trace = self.stats.update_many(new_rows['group_id'].to_numpy(),
+                                               new_rows[self.stats.metrics].to_numpy(dtype=float))
+                needed = self._rows + len(trace)
+                if len(self._trace) < needed:
+                    grown = np.empty((max(needed, 2 * len(self._trace)), trace.shape[1]))
+                    grown[:self._rows] = self._trace[:self._rows]
+                    self._trace = grown
+                self._trace[self._rows:needed] = trace
+                self._rows = needed
+        return self
+
+    def snapshot(self) -> pd.DataFrame:
+        """Rolling statistics of every group"""
+        with self._lock:
+            return self.stats.snapshot()
+
+    def ewma_trace(self, metric: str, rows: Optional[Iterable[int]] = None) -> np.ndarray:
+        """Fast EWMA of ``metric`` right after each stream row (``rows`` = buffer positions)"""
+        with self._lock:
+            column = self._trace[:self._rows, self.stats.metrics.index(metric)]
+            return column if rows is None else column[np.asarray(rows)]
+
+@st.cache_resource(show_spinner=False)
+def _stream_stats(path: str) -> StreamRollingStats:
+    """One long-lived rolling-statistics consumer per stream, shared across sessions"""
+    return StreamRollingStats(_monitoring_stream(path))
+
+def rolling_monitoring_stats(table: str = 'monitoring') -> StreamRollingStats:
+    """Rolling statistics over the active section's monitoring stream, refreshed with newly appended rows"""
+    return _stream_stats(table_path(table)).refresh()
@@ -0,0 +1,420 @@
+"""
+Team formation optimizer for partitioning the student roster into groups
+
+Teams are scored with a vectorized objective that rewards skill balance
+across groups and personality, role and major diversity within groups,
+and penalizes groups whose members share no available meeting slot. The
+partition is improved by simulated annealing over batches of two-student
+swaps, scored in constant time per swap by ``GroupState``. Independent
+seeded restarts can run in a process pool over a shared-memory copy of
+the encoded roster (``fit_parallel``).
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from constants import COURSE_CONFIG
+from .availability import availability_masks, group_masks, mask_slots, slot_matrix
+from .group_state import GroupState
+
+NUMERIC_FEATURES = ['technical_skills', 'collaboration_score', 'engagement_score']
+DIVERSITY_FEATURES = ['personality_type', 'preferred_role', 'major']
+
+DEFAULT_WEIGHTS = {
+    'skill_balance': 1.0,
+    'diversity': 1.0,
+    'availability': 1.0
+}
+
+class TeamFormationOptimizer:
+    """Simulated-annealing team formation over the student roster"""
+
+    def __init__(
+        self,
+        group_size: int = COURSE_CONFIG['students_per_group'],
+        weights: Optional[Dict[str, float]] = None,
+        seed: int = 42,
+        batch_size: int = 256
+    ):
+        """
+        Args:
+            group_size: Target number of students per group
+            weights: Objective weights for skill_balance, diversity and availability
+            seed: Seed for the initial partition and the annealing moves
+            batch_size: Number of candidate swaps scored per vectorized step
+        """
+        self.group_size = group_size
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.batch_size = batch_size
+        self.students = None
+        self.state = None
+        self.restart_scores = None
+
+    # ------------------------------------------------------------------
+    # Encoding
+    # ------------------------------------------------------------------
+
+    def _encode(self, students_df: pd.DataFrame):
+        """Build the per-student feature arrays the objective works on"""
+        self.students = students_df.reset_index(drop=True)
+        numeric = self.students[NUMERIC_FEATURES].to_numpy(dtype=float)
+        self._numeric_mean = numeric.mean(axis=0)
+        self._numeric_std = numeric.std(axis=0)
+        self._numeric_std[self._numeric_std == 0] = 1.0
+        self._z = (numeric - self._numeric_mean) / self._numeric_std
+
+        self._categories = {}
+        codes = []
+        for column in DIVERSITY_FEATURES:
+            categorical = pd.Categorical(self.students[column])
+            self._categories[column] = list(categorical.categories)
+            codes.append(categorical.codes)
+        self._codes = np.stack(codes, axis=1).astype(np.int64)
+        self._masks = availability_masks(self.students['availability'])
+
+    def _append_encoded(self, new_students: pd.DataFrame):
+        """Encode late additions with the statistics of the existing roster"""
+        new_students = new_students.reset_index(drop=True)
+        z = (new_students[NUMERIC_FEATURES].to_numpy(dtype=float) - self._numeric_mean) / self._numeric_std
+
+        codes = []
+        for column in DIVERSITY_FEATURES:
+            categories = self._categories[column]
+            for value in new_students[column]:
+                if value not in categories:
+                    categories.append(value)
+            lookup = {value: i for i, value in enumerate(categories)}
+            codes.append(new_students[column].map(lookup).to_numpy())
+
+        self.students = pd.concat([self.students, new_students], ignore_index=True)
+        self._z = np.vstack([self._z, z])
+        self._codes = np.vstack([self._codes, np.stack(codes, axis=1).astype(np.int64)])
+        self._masks = np.concatenate([self._masks, availability_masks(new_students['availability'])])
+
+    def _build_state(self, group_of: np.ndarray, n_groups: int):
+        n_categories = np.array([len(self._categories[c]) for c in DIVERSITY_FEATURES])
+        self.state = GroupState(self._z, self._codes, n_categories, slot_matrix(self._masks),
+                                group_of, n_groups, self.weights)
+
+    def _initial_groups(self, n: int):
+        """Random partition into groups whose sizes differ by at most one"""
+        n_groups = max(1, n // self.group_size)
+        group_of = np.empty(n, dtype=np.int64)
+        group_of[self.rng.permutation(n)] = np.arange(n) % n_groups
+        return group_of, n_groups
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def _anneal(self, iterations: int, start_temperature: Optional[float] = None,
+                candidates: Optional[np.ndarray] = None):
+        """Simulated annealing over batches of two-student swaps.
+
+        Every step scores ``batch_size`` proposals with one ``swap_deltas``
+        call and applies the accepted swaps that touch disjoint groups, so
+        each applied delta is exact.
+        """
+        state = self.state
+        placed = np.nonzero(state.group_of >= 0)[0]
+        if state.n_groups < 2 or len(placed) < 2:
+            return
+        candidates = placed if candidates is None else candidates
+
+        k = self.batch_size
+        steps = max(1, iterations // k)
+        if start_temperature is None:
+            start_temperature = self._typical_delta(placed)
+        end_temperature = start_temperature * 1e-3
+        cooling = (end_temperature / start_temperature) ** (1 / steps) if start_temperature > 0 else 0.0
+
+        temperature = start_temperature
+        total = state.costs.sum()
+        best_total, best_groups = total, state.group_of.copy()
+
+        for _ in range(steps):
+            a = candidates[self.rng.integers(len(candidates), size=k)]
+            b = placed[self.rng.integers(len(placed), size=k)]
+            delta, cost_a, cost_b = state.swap_deltas(a, b)
+            ga, gb = state.group_of[a], state.group_of[b]
+
+            if temperature > 0:
+                threshold = np.exp(-np.maximum(delta, 0) / temperature)
+            else:
+                threshold = np.zeros(k)
+            accept = (ga != gb) & ((delta < 0) | (self.rng.random(k) < threshold))
+
+            touched = set()
+            for i in np.nonzero(accept)[0][np.argsort(delta[accept])]:
+                if ga[i] in touched or gb[i] in touched:
+                    continue
+                touched.update((ga[i], gb[i]))
+                state.apply_swap(a[i], b[i], cost_a[i], cost_b[i])
+                total += delta[i]
+
+            if total < best_total - 1e-12:
+                best_total, best_groups = total, state.group_of.copy()
+            temperature *= cooling
+
+        if not np.array_equal(best_groups, state.group_of):
+            state.group_of = best_groups
+            state._rebuild()
+
+    def _typical_delta(self, placed: np.ndarray) -> float:
+        """Median absolute swap delta, used as the starting temperature"""
+        k = min(256, len(placed))
+        a = placed[self.rng.integers(len(placed), size=k)]
+        b = placed[self.rng.integers(len(placed), size=k)]
+        delta, _, _ = self.state.swap_deltas(a, b)
+        delta = np.abs(delta[self.state.group_of[a] != self.state.group_of[b]])
+        return float(np.median(delta)) if len(delta) else 1.0
+
+    def _default_iterations(self, n_students: int) -> int:
+        return 200 * n_students
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def fit(self, students_df: pd.DataFrame, iterations: Optional[int] = None) -> 'TeamFormationOptimizer':
+        """Partition the roster into groups of ``group_size`` students"""
+        self._encode(students_df)
+        self._build_state(*self._initial_groups(len(self.students)))
+        self._anneal(iterations or self._default_iterations(len(self.students)))
+        return self
+
+    def fit_parallel(
+        self,
+        students_df: pd.DataFrame,
+        restarts: int = 8,
+        workers: Optional[int] = None,
+        iterations: Optional[int] = None
+    ) -> 'TeamFormationOptimizer':
+        """Keep the best of several independently seeded annealing runs.
+
+        Restart ``i`` is seeded with the ``i``-th child of
+        ``SeedSequence(seed)`` and results are collected in restart order,
+        so the chosen partition depends only on ``seed`` and ``restarts``,
+        not on ``workers`` or scheduling. Per-restart scores are kept in
+        ``restart_scores``.
+
+        Args:
+            students_df: Roster to partition
+            restarts: Number of independent restarts
+            workers: Worker processes (default: one per CPU, at most ``restarts``);
+                1 runs the restarts in this process
+            iterations: Swap proposals per restart (default: 200 per student)
+        """
+        self._encode(students_df)
+        iterations = iterations or self._default_iterations(len(self.students))
+        seeds = np.random.SeedSequence(self.seed).spawn(restarts)
+        arrays = {'z': self._z, 'codes': self._codes, 'masks': self._masks}
+        options = {'group_size': self.group_size, 'weights': self.weights, 'batch_size': self.batch_size}
+
+        workers = min(restarts, workers or os.cpu_count() or 1)
+        if workers <= 1:
+            results = [_run_restart(arrays, self._categories, options, seed, iterations) for seed in seeds]
+        else:
+            results = _map_restarts(arrays, self._categories, options, seeds, iterations, workers)
+
+        best = int(np.argmin([scores['objective'] for _, scores in results]))
+        self._build_state(results[best][0], max(1, len(self.students) // self.group_size))
+        self.restart_scores = pd.DataFrame([
+            {'restart': i, 'best': i == best, **scores} for i, (_, scores) in enumerate(results)
+        ])
+        return self
+
+    def add_students(self, new_students: pd.DataFrame, iterations: Optional[int] = None) -> 'TeamFormationOptimizer':
+        """Place late additions without reshuffling the whole course.
+
+        New students fill the smallest groups (opening new groups once every
+        group is over capacity), then a short low-temperature search only
+        moves the newcomers and whoever they swap with.
+        """
+        start = len(self.students)
+        self._append_encoded(new_students)
+        new_idx = np.arange(start, len(self.students))
+
+        sizes = self.state.size.copy()
+        n_open = int(np.maximum(self.group_size + 1 - sizes, 0).sum())
+        n_groups = self.state.n_groups
+        if n_open < len(new_idx):
+            n_groups += -(-(len(new_idx) - n_open) // self.group_size)
+            sizes = np.concatenate([sizes, np.zeros(n_groups - len(sizes), dtype=np.int64)])
+
+        group_of = np.concatenate([self.state.group_of, np.full(len(new_idx), -1, dtype=np.int64)])
+        for student in new_idx:
+            target = int(np.argmin(sizes))
+            group_of[student] = target
+            sizes[target] += 1
+
+        # Categories may have grown, so rebuild the count vectors once
+        self._build_state(group_of, n_groups)
+        placed = np.nonzero(self.state.group_of >= 0)[0]
+        self._anneal(iterations or 5 * len(self.students),
+                     start_temperature=self._typical_delta(placed) * 0.1,
+                     candidates=new_idx)
+        return self
+
+    def drop_students(self, student_ids: Iterable[str], iterations: Optional[int] = None) -> 'TeamFormationOptimizer':
+        """Remove dropped students and rebalance the groups they leave short"""
+        state = self.state
+        dropped = np.nonzero(self.students['student_id'].isin(list(student_ids)).to_numpy())[0]
+        for student in dropped:
+            state.remove(student)
+
+        # Move students from the largest groups into groups left too small
+        while state.size.min() < self.group_size - 1 and state.size.max() > self.group_size:
+            short, full = int(np.argmin(state.size)), int(np.argmax(state.size))
+            donor = np.nonzero(state.group_of == full)[0][-1]
+            state.move(donor, short)
+
+        # Dissolve groups that are still too small into the remaining ones
+        small = np.nonzero((state.size < self.group_size - 1))[0]
+        if len(small) and len(small) < state.n_groups:
+            keep = np.setdiff1d(np.arange(state.n_groups), small)
+            remap = np.full(state.n_groups, -1, dtype=np.int64)
+            remap[keep] = np.arange(len(keep))
+            orphans = np.nonzero(np.isin(state.group_of, small))[0]
+            group_of = np.where(state.group_of >= 0, remap[np.maximum(state.group_of, 0)], -1)
+            sizes = np.bincount(group_of[group_of >= 0], minlength=len(keep))
+            for student in orphans:
+                target = int(np.argmin(sizes))
+                group_of[student] = target
+                sizes[target] += 1
+            self._build_state(group_of, len(keep))
+
+        placed = np.nonzero(self.state.group_of >= 0)[0]
+        self._anneal(iterations or 5 * len(placed),
+                     start_temperature=self._typical_delta(placed) * 0.1)
+        return self
+
+    def assignments(self) -> pd.DataFrame:
+        """Current partition as student_id -> group_id"""
+        placed = np.nonzero(self.state.group_of >= 0)[0]
+        placed = placed[np.argsort(self.state.group_of[placed], kind='stable')]
+        return pd.DataFrame({
+            'student_id': self.students['student_id'].to_numpy()[placed],
+            'group_id': [f"GRP{g + 1:03d}" for g in self.state.group_of[placed]]
+        })
+
+    def group_scores(self) -> pd.DataFrame:
+        """Per-group objective components for the current partition"""
+        imbalance, diversity, no_overlap = self.state.components()
+        variance = self.state.variances()
+        scores = pd.DataFrame({
+            'group_id': [f"GRP{i + 1:03d}" for i in range(self.state.n_groups)],
+            'size': self.state.size,
+            'skill_imbalance': imbalance,
+            'diversity': diversity,
+            'shared_availability': no_overlap == 0,
+            'shared_slots': (self.state.slot_counts == self.state.size[:, None]).sum(axis=1),
+            'cost': self.state.costs
+        })
+        for f, feature in enumerate(NUMERIC_FEATURES):
+            scores[f"{feature}_spread"] = np.sqrt(variance[:, f]) * self._numeric_std[f]
+        scores['meeting_slots'] = [", ".join(slots) for slots in self.meeting_slots().values()]
+        return scores[scores['size'] > 0].reset_index(drop=True)
+
+    def meeting_slots(self, limit: int = 2) -> Dict[int, list]:
+        """First ``limit`` weekly slots every member of each group can attend"""
+        shared = group_masks(self._masks, self.state.group_of, self.state.n_groups)
+        return {g: mask_slots(mask)[:limit] for g, mask in enumerate(shared)}
+
+    def scores(self) -> Dict[str, float]:
+        """Summary scores of the current partition.
+
+        ``skill_balance`` compares the spread of group means to the spread
+        of individual students (10 = identical group means, about 5 for a
+        random partition of four); ``diversity`` is the average share of
+        achievable distinct personalities, roles and majors, on 0-10.
+        """
+        state = self.state
+        active = state.size > 0
+        placed = state.group_of >= 0
+        group_means = state.sums[active] / state.size[active, None]
+        student_spread = np.maximum(self._z[placed].std(axis=0), 1e-12)
+        balance = 1 - np.minimum(1.0, group_means.std(axis=0) / student_spread)
+        _, diversity, no_overlap = state.components()
+        return {
+            'objective': float(state.costs.sum()),
+            'skill_balance': round(10 * float(balance.mean()), 2),
+            'diversity': round(10 * float(diversity[active].mean()), 2),
+            'availability_coverage': round(100 * float(1 - no_overlap[active].mean()), 1),
+            'groups': int(active.sum()),
+            'students': int(placed.sum())
+        }
+
+    @classmethod
+    def evaluate(cls, students_df: pd.DataFrame, group_column: str = 'group_id', **kwargs) -> Dict[str, float]:
+        """Score an existing partition (e.g. the roster's current groups)"""
+        optimizer = cls(**kwargs)
+        optimizer._encode(students_df)
+        labels, groups = pd.factorize(optimizer.students[group_column])
+        optimizer._build_state(labels.astype(np.int64), len(groups))
+        return optimizer.scores()
+
+def _run_restart(arrays, categories, options, seed, iterations):
+    """One seeded annealing run on pre-encoded features; returns (group_of, scores)"""
+    optimizer = TeamFormationOptimizer(seed=seed, **options)
+    optimizer._z, optimizer._codes, optimizer._masks = arrays['z'], arrays['codes'], arrays['masks']
+    optimizer._categories = categories
+    optimizer._build_state(*optimizer._initial_groups(len(optimizer._z)))
+    optimizer._anneal(iterations)
+    return optimizer.state.group_of.copy(), optimizer.scores()
+
+def _restart_worker(spec, categories, options, seed, iterations):
+    """Process-pool entry point: attach to the shared arrays and run one restart"""
+    blocks = {name: shared_memory.SharedMemory(name=block_name) for name, (block_name, _, _) in spec.items()}
+    arrays = None
+    try:
+        arrays = {
+            name: np.ndarray(shape, dtype=dtype, buffer=blocks[name].buf)
+            for name, (_, shape, dtype) in spec.items()
+        }
+        return _run_restart(arrays, categories, options, seed, iterations)
+    finally:
+        # Views must be released before the blocks can be closed
+        arrays = None
+        for block in blocks.values():
+            block.close()
+
+def _map_restarts(arrays, categories, options, seeds, iterations, workers):
+    """Run restarts in a process pool, sharing the encoded roster through shared memory"""
+    blocks = []
+    try:
+        spec = {}
+        for name, array in arrays.items():
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            blocks.append(block)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            spec[name] = (block.name, array.shape, array.dtype.str)
+
+        # Spawned workers: forking the multi-threaded Streamlit server is unsafe
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            return list(pool.map(_restart_worker, repeat(spec), repeat(categories),
+                                 repeat(options), seeds, repeat(iterations)))
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+def form_teams(students_df: pd.DataFrame, seed: int = 42, iterations: Optional[int] = None,
+               restarts: int = 1, workers: Optional[int] = None, **kwargs):
+    """Convenience wrapper: returns (assignments, scores) for the roster"""
+    optimizer = TeamFormationOptimizer(seed=seed, **kwargs)
+    if restarts > 1:
+        optimizer.fit_parallel(students_df, restarts, workers, iterations)
+    else:
+        optimizer.fit(students_df, iterations)
+    return optimizer.assignments(), optimizer.scores()
@@ -0,0 +1,37 @@
+"""
+Shared stylesheet for the app and every page
+
+Each page used to send its own ``<style>`` block, most of them repeating
+the same rules, through ``st.markdown`` on every rerun. The combined rules
+now live in ``static/theme.css``, which Streamlit serves as a static asset
+(``server.enableStaticServing`` in ``.streamlit/config.toml``), so a rerun
+only sends a one-line ``@import`` and the browser fetches and caches the
+stylesheet once. Pages use the class names only.
+"""
+
+import os
+
+import streamlit as st
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static')
+THEME_FILE = 'theme.css'
+# Relative to the page URL, so it also resolves under a server.baseUrlPath
+THEME_URL = f'app/static/{THEME_FILE}'
+
+@st.cache_resource(show_spinner=False)
+def _theme_css() -> str:
+    """Contents of the stylesheet, read once per process"""
+    with open(os.path.join(STATIC_DIR, THEME_FILE), encoding='utf-8') as f:
+        return f.read()
+
+def apply_theme():
+    """Load the shared stylesheet into the current page.
+
+    Falls back to inlining the stylesheet when static file serving is
+    disabled, e.g. when the app is started outside the project root.
+    """
+    if st.get_option('server.enableStaticServing'):
+        css = f'@import url("{THEME_URL}");'
+    else:
+        css = _theme_css()
+    st.markdown(f'<style>{css}</style>', unsafe_allow_html=True)